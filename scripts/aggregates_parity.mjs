@@ -0,0 +1,59 @@
+#!/usr/bin/env node
+/**
+ * 用前端的 TypeScript 源码计算概览聚合，供 build_aggregates.py --verify 比对
+ *
+ * 把 src/services/dataLoader.ts 和 src/utils/chartDataProcessor.ts 转译为 ES 模块
+ * （写入 node_modules/.cache/aggregates-parity/，以便解析到项目依赖的 papaparse），
+ * 用 loadGardenData 读取并清洗 CSV，再执行 OVERVIEW_AGGREGATES 中的全部函数。
+ * 依赖项目的 devDependencies（typescript）和 dependencies（papaparse），需先 npm install。
+ *
+ * 用法：
+ *     node scripts/aggregates_parity.mjs <园林CSV> <输出JSON>
+ */
+
+import { mkdirSync, readFileSync, writeFileSync } from 'node:fs';
+import { dirname, join, resolve } from 'node:path';
+import { fileURLToPath, pathToFileURL } from 'node:url';
+import ts from 'typescript';
+
+const rootDir = resolve(dirname(fileURLToPath(import.meta.url)), '..');
+const cacheDir = join(rootDir, 'node_modules', '.cache', 'aggregates-parity');
+
+const [csvPath, outputPath] = process.argv.slice(2);
+if (!csvPath || !outputPath) {
+  console.error('用法: node scripts/aggregates_parity.mjs <园林CSV> <输出JSON>');
+  process.exit(2);
+}
+
+/**
+ * 转译 TypeScript 源文件为 ES 模块并返回模块路径
+ * 源文件只从 '@/types' 导入类型，转译后不会留下路径别名
+ */
+function transpile(relativePath, outputName) {
+  const source = readFileSync(join(rootDir, relativePath), 'utf-8');
+  const { outputText } = ts.transpileModule(source, {
+    fileName: relativePath,
+    compilerOptions: {
+      module: ts.ModuleKind.ESNext,
+      target: ts.ScriptTarget.ES2022,
+    },
+  });
+  const outputFile = join(cacheDir, outputName);
+  writeFileSync(outputFile, outputText, 'utf-8');
+  return pathToFileURL(outputFile).href;
+}
+
+mkdirSync(cacheDir, { recursive: true });
+const { loadGardenData } = await import(transpile('src/services/dataLoader.ts', 'dataLoader.mjs'));
+const { OVERVIEW_AGGREGATES } = await import(
+  transpile('src/utils/chartDataProcessor.ts', 'chartDataProcessor.mjs')
+);
+
+// loadGardenData 通过 fetch 读取 CSV，这里改为读取本地文件
+globalThis.fetch = async (path) => new Response(readFileSync(path));
+
+const data = await loadGardenData(resolve(csvPath));
+const aggregates = Object.fromEntries(
+  Object.entries(OVERVIEW_AGGREGATES).map(([key, aggregate]) => [key, aggregate(data)]),
+);
+writeFileSync(outputPath, JSON.stringify(aggregates), 'utf-8');
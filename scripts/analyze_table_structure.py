@@ -3,170 +3,680 @@
 分析 archived/ylml_details.json 文件中每个对象的 content_html 字段中的表格结构
 """
 
+import argparse
 import json
 import hashlib
+import os
+import random
 import re
-from collections import defaultdict
+import sqlite3
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+
+from dataset_io import read_json, sniff_file_encoding
+
+
+# 所有类型规则合并为一个预编译模式，分支顺序即判定优先级：
+# 整数、小数（整串匹配）→ 日期（前缀匹配）→ 含选择框符号 → 其余为文本
+_VALUE_TYPE_PATTERN = re.compile(
+    r'(?P<integer>\d+\Z)'
+    r'|(?P<float>\d+\.\d+\Z)'
+    r'|(?P<date>\d{4}-\d{1,2}-\d{1,2}|\d{4}年\d{1,2}月\d{1,2}日)'
+    r'|(?P<checkbox>.*?[√□■])',
+    re.DOTALL
+)
 
 
 def detect_value_type(text):
     """检测文本的数据类型"""
-    if not text or not text.strip():
+    if not text:
         return "empty"
     
     text = text.strip()
+    if not text:
+        return "empty"
     
-    # 检测数字
-    if re.match(r'^\d+$', text):
-        return "integer"
-    if re.match(r'^\d+\.\d+$', text):
-        return "float"
-    
-    # 检测日期格式
-    if re.match(r'\d{4}-\d{1,2}-\d{1,2}', text):
-        return "date"
-    if re.match(r'\d{4}年\d{1,2}月\d{1,2}日', text):
-        return "date"
-    
-    # 检测是否包含特殊符号（可能是选择框或标记）
-    if '√' in text or '□' in text or '■' in text:
-        return "checkbox"
-    
-    # 默认为文本
-    return "text"
+    match = _VALUE_TYPE_PATTERN.match(text)
+    return match.lastgroup if match else "text"
 
 
-def extract_table_headers(table):
-    """提取表格的字段位置信息（不包含具体内容）"""
-    headers = []
-    
-    # 尝试从第一行提取表头结构
-    first_row = table.find('tr')
-    if first_row:
-        cells = first_row.find_all(['th', 'td'])
-        for i, cell in enumerate(cells):
-            # 只记录字段位置，不记录具体内容
-            headers.append(f"field_{i+1}")
-    
-    return headers
+def classify_column(texts):
+    """对一列单元格文本逐个分类，返回各类型的计数"""
+    type_counts = defaultdict(int)
+    for text in texts:
+        type_counts[detect_value_type(text)] += 1
+    return dict(type_counts)
 
 
-def analyze_table_structure(table):
-    """分析单个表格的结构"""
-    rows = table.find_all('tr')
+def merge_type_counts(target, type_counts):
+    """把逐列类型计数累加到 target（按列对齐，target 会按需扩展）"""
+    for col_idx, counts in enumerate(type_counts):
+        if col_idx >= len(target):
+            target.append({})
+        for value_type, count in counts.items():
+            target[col_idx][value_type] = target[col_idx].get(value_type, 0) + count
+
+
+def summarize_column_types(type_counts):
+    """根据类型分布确定主要类型及置信度（主要类型在非空单元格中的占比）"""
+    total = sum(type_counts.values())
+    if not total:
+        return "unknown", 0.0
+
+    non_empty = {t: n for t, n in type_counts.items() if t != "empty"}
+    if not non_empty:
+        return "empty", 1.0
+
+    main_type, count = max(sorted(non_empty.items()), key=lambda x: x[1])
+    return main_type, round(count / sum(non_empty.values()), 4)
+
+
+def summarize_fields(type_counts, col_count):
+    """按列汇总类型分布，生成报告中的字段信息"""
+    fields = []
+    for i in range(col_count):
+        counts = type_counts[i] if i < len(type_counts) else {}
+        field_type, confidence = summarize_column_types(counts)
+        fields.append({
+            'position': i + 1,
+            'type': field_type,
+            'confidence': confidence,
+            'type_distribution': dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+        })
+    return fields
+
+
+def parse_span(value):
+    """解析 colspan/rowspan 属性，缺失或非法时按1处理"""
+    try:
+        return max(int(value), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def bs4_table_rows(table):
+    """从BeautifulSoup表格中提取行：每行为 (colspan, rowspan, 文本) 列表"""
+    rows = []
+    for row in table.find_all('tr'):
+        cells = row.find_all(['th', 'td'])
+        rows.append([
+            (parse_span(cell.get('colspan', 1)), parse_span(cell.get('rowspan', 1)), cell.get_text(strip=True))
+            for cell in cells
+        ])
+    return rows
+
+
+PARSERS = ('html.parser', 'lxml', 'lxml-native')
+
+# lxml 原生路径使用的预编译XPath，语义与BeautifulSoup的递归 find_all 一致
+_XPATH_TABLES = etree.XPath('//table')
+_XPATH_ROWS = etree.XPath('.//tr')
+_XPATH_CELLS = etree.XPath('.//*[self::th or self::td]')
+_XPATH_TEXTS = etree.XPath('.//text()')
+
+
+def lxml_table_rows(table):
+    """从lxml表格元素中提取行，结果与 bs4_table_rows 相同"""
+    rows = []
+    for row in _XPATH_ROWS(table):
+        rows.append([
+            (parse_span(cell.get('colspan', 1)), parse_span(cell.get('rowspan', 1)),
+             ''.join(t.strip() for t in _XPATH_TEXTS(cell)))
+            for cell in _XPATH_CELLS(row)
+        ])
+    return rows
+
+
+def extract_tables(content_html, parser='html.parser'):
+    """解析HTML并返回其中每个表格的行数据
+
+    parser 可选 html.parser、lxml（BeautifulSoup + lxml）或 lxml-native
+    （直接使用 lxml.html 与XPath，不创建BeautifulSoup对象）。
+    """
+    if parser == 'lxml-native':
+        try:
+            document = lxml_html.document_fromstring(content_html)
+        except etree.ParserError:
+            # 仅含空白等无法构成文档的内容
+            return []
+        return [lxml_table_rows(table) for table in _XPATH_TABLES(document)]
+
+    soup = BeautifulSoup(content_html, parser)
+    return [bs4_table_rows(table) for table in soup.find_all('table')]
+
+
+def build_grid(rows):
+    """将 rowspan/colspan 展开为单元格占用矩阵
+
+    返回 (布局, 列数)。布局按行列出每个起始单元格的 [起始列, rowspan, colspan]，
+    被上方单元格跨行占用的位置会被跳过，rowspan 超出表格的部分会被截断。
+    """
+    occupied = set()
+    layout = []
+    width = 0
+    for r, cells in enumerate(rows):
+        row_layout = []
+        c = 0
+        for colspan, rowspan, _ in cells:
+            while (r, c) in occupied:
+                c += 1
+            rowspan = min(rowspan, len(rows) - r)
+            for dr in range(rowspan):
+                for dc in range(colspan):
+                    occupied.add((r + dr, c + dc))
+            row_layout.append([c, rowspan, colspan])
+            c += colspan
+        layout.append(row_layout)
+        width = max(width, c)
+    if occupied:
+        width = max(width, max(c for _, c in occupied) + 1)
+    return layout, width
+
+
+def analyze_rows(rows):
+    """根据行数据分析表格结构"""
     if not rows:
         return None
     
     # 计算行数
     row_count = len(rows)
     
-    # 计算列数（取最大列数）
-    col_count = 0
-    for row in rows:
-        cells = row.find_all(['th', 'td'])
-        # 考虑colspan属性
-        current_cols = 0
-        for cell in cells:
-            colspan = int(cell.get('colspan', 1))
-            current_cols += colspan
-        col_count = max(col_count, current_cols)
+    # 计算列数（按展开 rowspan/colspan 后的占用矩阵宽度）
+    layout, col_count = build_grid(rows)
     
-    # 提取字段名称
-    headers = extract_table_headers(table)
+    # 提取字段位置信息（只记录字段位置，不记录具体内容）
+    headers = [f"field_{i+1}" for i in range(len(rows[0]))]
     
-    # 分析数据类型（从前几行的数据中推断）
-    field_types = []
-    sample_rows = rows[1:min(4, len(rows))]  # 取前3行数据进行类型分析
-    
-    for col_idx in range(col_count):
-        col_types = []
-        for row in sample_rows:
-            cells = row.find_all(['th', 'td'])
-            if col_idx < len(cells):
-                text = cells[col_idx].get_text(strip=True)
-                col_types.append(detect_value_type(text))
-        
-        # 确定该列的主要类型
-        if col_types:
-            type_counts = defaultdict(int)
-            for t in col_types:
-                type_counts[t] += 1
-            main_type = max(type_counts.items(), key=lambda x: x[1])[0]
-            field_types.append(main_type)
-        else:
-            field_types.append("unknown")
+    # 分析数据类型：按展开后的起始列把表头以下的所有单元格收集成列，逐列分类
+    column_texts = [[] for _ in range(col_count)]
+    for cells, row_layout in zip(rows[1:], layout[1:]):
+        for (_, _, text), (col_idx, _, _) in zip(cells, row_layout):
+            column_texts[col_idx].append(text)
+    type_counts = [classify_column(texts) for texts in column_texts]
+    field_types = [summarize_column_types(counts)[0] for counts in type_counts]
     
     return {
         'row_count': row_count,
         'col_count': col_count,
         'headers': headers,
-        'field_types': field_types
+        'field_types': field_types,
+        'type_counts': type_counts,
+        'layout': layout
     }
 
 
+def analyze_table_structure(table):
+    """分析单个BeautifulSoup表格的结构"""
+    return analyze_rows(bs4_table_rows(table))
+
+
+# 结构指纹逻辑的版本号，修改 analyze_rows / create_structure_id 的输出时需递增，
+# 以使结构缓存失效
+FINGERPRINT_VERSION = 3
+
+
 def create_structure_id(structure):
     """为表格结构创建唯一标识"""
-    # 只使用行列数和字段数量创建哈希值，忽略具体内容
-    key_data = f"{structure['row_count']}_{structure['col_count']}_{len(structure['headers'])}"
-    return hashlib.md5(key_data.encode('utf-8')).hexdigest()[:8]
+    # 使用展开后的单元格占用布局创建哈希值，忽略具体内容
+    key_data = f"{structure['row_count']}_{structure['col_count']}_{json.dumps(structure['layout'])}"
+    return hashlib.md5(key_data.encode('utf-8')).hexdigest()[:12]
 
 
-def analyze_json_file(file_path):
-    """分析JSON文件中的所有表格结构"""
-    print(f"开始读取文件: {file_path}")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    print(f"文件包含 {len(data)} 个对象")
-    
-    structure_stats = defaultdict(lambda: {
+def layout_shingles(layout):
+    """把布局拆成行级特征集合，只差一两行的布局共享绝大多数特征"""
+    shingles = set()
+    seen = defaultdict(int)
+    row_tokens = [json.dumps(row_layout) for row_layout in layout]
+    for i, token in enumerate(row_tokens):
+        # 同一行模式的第k次出现作为独立特征，以保留重复行的数量信息
+        for shingle in (f"r:{token}", f"b:{row_tokens[i - 1] if i else '^'}|{token}"):
+            seen[shingle] += 1
+            shingles.add(f"{shingle}#{seen[shingle]}")
+    return shingles
+
+
+class LayoutLSHIndex:
+    """基于 MinHash + LSH 分桶的布局近似去重索引
+
+    每个布局用 num_perm 个MinHash值表示，并切分为 bands 个分段；任一分段相同
+    的布局成为候选对，只对候选对估计Jaccard相似度，整体开销与布局数近似线性。
+    """
+
+    _PRIME = (1 << 61) - 1
+
+    def __init__(self, num_perm=64, bands=16, seed=42):
+        if num_perm % bands:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, self._PRIME), rng.randrange(0, self._PRIME))
+                       for _ in range(num_perm)]
+        self.signatures = {}
+        self.buckets = defaultdict(list)
+
+    def minhash(self, shingles):
+        """计算特征集合的MinHash签名"""
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'big')
+                  for s in shingles] or [0]
+        return tuple(min((a * h + b) % self._PRIME for h in hashes) for a, b in self._perms)
+
+    def add(self, key, shingles):
+        """加入一个布局"""
+        signature = self.minhash(shingles)
+        self.signatures[key] = signature
+        for band in range(self.bands):
+            start = band * self.rows_per_band
+            self.buckets[(band, signature[start:start + self.rows_per_band])].append(key)
+
+    def similarity(self, key_a, key_b):
+        """用签名估计两个布局的Jaccard相似度"""
+        sig_a, sig_b = self.signatures[key_a], self.signatures[key_b]
+        return sum(a == b for a, b in zip(sig_a, sig_b)) / self.num_perm
+
+    def families(self, threshold=0.8):
+        """把相似度不低于 threshold 的布局合并为家族，返回成员列表的列表"""
+        parent = {key: key for key in self.signatures}
+
+        def find(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        # 同一桶内的所有成员两两比较；同一对布局可能在多个分段相遇，只估计一次
+        compared = set()
+        for members in self.buckets.values():
+            for i, key_a in enumerate(members):
+                for key_b in members[i + 1:]:
+                    if (key_a, key_b) in compared or find(key_a) == find(key_b):
+                        continue
+                    compared.add((key_a, key_b))
+                    if self.similarity(key_a, key_b) >= threshold:
+                        parent[find(key_b)] = find(key_a)
+
+        groups = defaultdict(list)
+        for key in self.signatures:
+            groups[find(key)].append(key)
+        return list(groups.values())
+
+
+def group_structure_families(structure_stats, threshold=0.8):
+    """把布局近似的结构归入家族，返回按总次数排序的家族列表
+
+    家族内各结构的逐列类型计数按列累加后再推断字段类型，同一种表格因多一两行
+    而分散到不同结构时，类型判断依据的是整个家族的全部单元格。
+    """
+    index = LayoutLSHIndex()
+    for struct_id, stats in structure_stats.items():
+        index.add(struct_id, layout_shingles(stats['structure']['layout']))
+
+    families = []
+    for members in index.families(threshold):
+        members.sort(key=lambda struct_id: structure_stats[struct_id]['count'], reverse=True)
+        type_counts = []
+        for struct_id in members:
+            merge_type_counts(type_counts, structure_stats[struct_id]['type_counts'])
+        col_count = max(structure_stats[struct_id]['structure']['col_count'] for struct_id in members)
+        families.append({
+            'family_id': f"family_{members[0]}",
+            'count': sum(structure_stats[struct_id]['count'] for struct_id in members),
+            'structure_ids': members,
+            'fields': summarize_fields(type_counts, col_count)
+        })
+    families.sort(key=lambda family: family['count'], reverse=True)
+    return families
+
+
+def iter_json_array(file_path, chunk_size=1 << 16):
+    """增量解析顶层为数组的JSON文件，逐个产出数组元素"""
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r', encoding=sniff_file_encoding(file_path)) as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{file_path} 的顶层不是JSON数组")
+        pos = 1
+        eof = False
+
+        while True:
+            # 跳过元素之间的空白和逗号
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    break
+                buffer = f.read(chunk_size)
+                pos = 0
+                eof = not buffer
+
+            if pos >= len(buffer):
+                raise ValueError(f"{file_path} 意外结束，缺少 ']'")
+            if buffer[pos] == ']':
+                return
+
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # 当前元素跨越了缓冲区边界：丢弃已消费部分，并按缓冲区大小倍增读取量，
+                # 保证大对象的重复解析开销是线性的
+                buffer = buffer[pos:]
+                pos = 0
+                more = f.read(max(chunk_size, len(buffer)))
+                eof = not more
+                buffer += more
+                continue
+
+            yield obj
+            pos = end
+            # 丢弃已消费的前缀，避免缓冲区随文件增长
+            if pos > chunk_size:
+                buffer = buffer[pos:]
+                pos = 0
+
+
+def iter_json_lines(file_path):
+    """逐行读取JSON Lines文件，每行一个对象（忽略空行）"""
+    with open(file_path, 'r', encoding=sniff_file_encoding(file_path)) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{file_path} 第 {line_no} 行不是合法的JSON: {e}") from e
+
+
+def detect_input_format(file_path):
+    """根据扩展名判断输入格式：.jsonl/.ndjson 为 JSON Lines，其余为JSON数组"""
+    if file_path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'json'
+
+
+def iter_items(file_path, input_format='auto', stream=True):
+    """按指定格式读取对象；stream 为 False 时一次性读入整个JSON数组（解析结果按文件内容哈希缓存）"""
+    if input_format == 'auto':
+        input_format = detect_input_format(file_path)
+
+    if input_format == 'jsonl':
+        return iter_json_lines(file_path)
+    if stream:
+        return iter_json_array(file_path)
+    return read_json(file_path)
+
+
+class StructureCache:
+    """以 content_html 内容哈希为键的表格结构缓存（SQLite）
+
+    每条记录保存一个对象中所有表格的结构ID与结构。FINGERPRINT_VERSION
+    与库中记录的版本不一致时清空全部条目。
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._pending_writes = 0
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS items ('
+            'content_hash TEXT, parser TEXT, structures TEXT, '
+            'PRIMARY KEY (content_hash, parser))'
+        )
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'fingerprint_version'").fetchone()
+        if row is None or row[0] != str(FINGERPRINT_VERSION):
+            if row is not None:
+                print(f"结构指纹版本已变化 ({row[0]} -> {FINGERPRINT_VERSION})，清空缓存")
+            self.conn.execute('DELETE FROM items')
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint_version', ?)",
+                (str(FINGERPRINT_VERSION),)
+            )
+        self.conn.commit()
+
+    @staticmethod
+    def content_hash(content_html):
+        """计算 content_html 的内容哈希"""
+        return hashlib.sha256(content_html.encode('utf-8')).hexdigest()
+
+    def get(self, content_hash, parser):
+        """查询缓存，未命中时返回 None"""
+        row = self.conn.execute(
+            'SELECT structures FROM items WHERE content_hash = ? AND parser = ?',
+            (content_hash, parser)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [tuple(entry) for entry in json.loads(row[0])]
+
+    def put(self, content_hash, parser, table_structures):
+        """写入一个对象的表格结构"""
+        self.conn.execute(
+            'INSERT OR REPLACE INTO items (content_hash, parser, structures) VALUES (?, ?, ?)',
+            (content_hash, parser, json.dumps(table_structures, ensure_ascii=False))
+        )
+        self._pending_writes += 1
+        if self._pending_writes >= 500:
+            self.conn.commit()
+            self._pending_writes = 0
+
+    def stats(self):
+        """返回命中统计"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0.0
+        }
+
+    def close(self):
+        """提交未写入的记录并关闭连接"""
+        self.conn.commit()
+        self.conn.close()
+
+
+def new_structure_stats():
+    """创建结构统计表"""
+    return defaultdict(lambda: {
         'count': 0,
         'structure': None,
         'examples': [],
-        'html_files': []  # 新增：记录对应的HTML文件名
+        'html_files': [],  # 新增：记录对应的HTML文件名
+        'type_counts': []  # 同一结构所有表格的逐列类型计数
     })
-    
+
+
+def analyze_content(content_html, parser='html.parser'):
+    """分析一段HTML中的全部表格，返回每个表格的 (结构ID, 结构)；无行的表格为 (None, None)"""
+    table_structures = []
+    for rows in extract_tables(content_html, parser):
+        structure = analyze_rows(rows)
+        if structure:
+            table_structures.append((create_structure_id(structure), structure))
+        else:
+            table_structures.append((None, None))
+    return table_structures
+
+
+def fold_structures(structure_stats, item_name, table_structures):
+    """将单个对象的表格结构累加到结构统计表，返回表格数量"""
+    # 获取对应的HTML文件名
+    html_filename = f"{item_name}.html"
+
+    for struct_id, structure in table_structures:
+        if structure:
+            structure_stats[struct_id]['count'] += 1
+            structure_stats[struct_id]['structure'] = structure
+            merge_type_counts(structure_stats[struct_id]['type_counts'], structure['type_counts'])
+
+            # 保存示例（最多保存3个）
+            if len(structure_stats[struct_id]['examples']) < 3:
+                structure_stats[struct_id]['examples'].append(item_name)
+
+            # 记录HTML文件名（避免重复）
+            if html_filename not in structure_stats[struct_id]['html_files']:
+                structure_stats[struct_id]['html_files'].append(html_filename)
+
+    return len(table_structures)
+
+
+def fold_item(structure_stats, item, parser='html.parser'):
+    """解析单个对象中的表格并累加到结构统计表，返回表格数量"""
+    if 'content_html' not in item or not item['content_html']:
+        return 0
+
+    return fold_structures(structure_stats, item['name'], analyze_content(item['content_html'], parser))
+
+
+def analyze_chunk(items, parser='html.parser'):
+    """子进程任务：分析一批对象，返回部分结构统计表和表格数量"""
+    structure_stats = new_structure_stats()
+    total_tables = 0
+    for item in items:
+        total_tables += fold_item(structure_stats, item, parser)
+    # defaultdict 的默认工厂是lambda，无法跨进程传递，转为普通dict
+    return dict(structure_stats), total_tables
+
+
+def lookup_cache(cache, item, parser):
+    """查询对象的缓存结构，返回 (内容哈希, 缓存结构)；对象无HTML时内容哈希为 None"""
+    if 'content_html' not in item or not item['content_html']:
+        return None, None
+    content_hash = cache.content_hash(item['content_html'])
+    return content_hash, cache.get(content_hash, parser)
+
+
+def analyze_contents(contents, parser='html.parser'):
+    """子进程任务：分析一批HTML，按顺序返回每段HTML的表格结构"""
+    return [analyze_content(content_html, parser) for content_html in contents]
+
+
+def merge_structure_stats(structure_stats, partial):
+    """按顺序合并部分统计表，结果与串行处理相同"""
+    for struct_id, stats in partial.items():
+        merged = structure_stats[struct_id]
+        merged['count'] += stats['count']
+        # 串行处理时保留的是最后一次出现的结构
+        merged['structure'] = stats['structure']
+        merge_type_counts(merged['type_counts'], stats['type_counts'])
+        merged['examples'].extend(stats['examples'][:3 - len(merged['examples'])])
+        for html_filename in stats['html_files']:
+            if html_filename not in merged['html_files']:
+                merged['html_files'].append(html_filename)
+
+
+def iter_chunks(items, chunk_size):
+    """将对象序列切分为固定大小的批次"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def analyze_json_file(file_path, input_format='auto', stream=False, workers=1, chunk_size=50,
+                      parser='html.parser', cache=None):
+    """分析JSON文件中的所有表格结构
+
+    stream 为 True 时逐个读取并处理对象，处理完即释放，内存占用不随文件增长；
+    JSON Lines 输入总是以流式方式读取。
+    workers 大于1时将对象分批交给进程池分析，再按批次顺序合并结果。
+    parser 为表格解析后端，见 extract_tables。
+    cache 为 StructureCache 时只解析内容哈希未命中的对象。
+    """
+    print(f"开始读取文件: {file_path}")
+    items = iter_items(file_path, input_format, stream)
+
+    total_items = len(items) if isinstance(items, list) else None
+    if total_items is not None:
+        print(f"文件包含 {total_items} 个对象")
+    else:
+        print("以流式模式读取对象")
+
+    structure_stats = new_structure_stats()
+
     total_tables = 0
     processed_items = 0
-    
-    for item in data:
+
+    if workers > 1:
+        print(f"使用 {workers} 个进程并行分析，每批 {chunk_size} 个对象")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # 限制在途批次数量，流式读取时内存仍保持平稳
+            pending = deque()
+            chunks = iter_chunks(items, chunk_size)
+            while True:
+                for chunk in islice(chunks, workers * 2 - len(pending)):
+                    if cache is None:
+                        pending.append((chunk, None, executor.submit(analyze_chunk, chunk, parser)))
+                        continue
+                    # 命中的对象在父进程中直接取缓存，只把未命中的HTML交给子进程
+                    lookups = [lookup_cache(cache, item, parser) for item in chunk]
+                    misses = [item['content_html'] for item, (content_hash, cached) in zip(chunk, lookups)
+                              if content_hash and cached is None]
+                    pending.append((chunk, lookups, executor.submit(analyze_contents, misses, parser)))
+                if not pending:
+                    break
+
+                chunk, lookups, future = pending.popleft()
+                if lookups is None:
+                    partial, chunk_tables = future.result()
+                    merge_structure_stats(structure_stats, partial)
+                    total_tables += chunk_tables
+                else:
+                    parsed = iter(future.result())
+                    for item, (content_hash, cached) in zip(chunk, lookups):
+                        if not content_hash:
+                            continue
+                        if cached is None:
+                            cached = next(parsed)
+                            cache.put(content_hash, parser, cached)
+                        total_tables += fold_structures(structure_stats, item['name'], cached)
+
+                processed_items += len(chunk)
+                if total_items is not None:
+                    print(f"已处理 {processed_items}/{total_items} 个对象")
+                else:
+                    print(f"已处理 {processed_items} 个对象")
+
+        print(f"处理完成，共找到 {total_tables} 个表格")
+        return structure_stats, total_tables
+
+    for item in items:
         processed_items += 1
         if processed_items % 10 == 0:
-            print(f"已处理 {processed_items}/{len(data)} 个对象")
-            
-        if 'content_html' not in item or not item['content_html']:
+            if total_items is not None:
+                print(f"已处理 {processed_items}/{total_items} 个对象")
+            else:
+                print(f"已处理 {processed_items} 个对象")
+
+        if cache is None:
+            total_tables += fold_item(structure_stats, item, parser)
             continue
-        
-        # 获取对应的HTML文件名
-        html_filename = f"{item['name']}.html"
-        
-        # 解析HTML
-        soup = BeautifulSoup(item['content_html'], 'html.parser')
-        tables = soup.find_all('table')
-        
-        for table in tables:
-            total_tables += 1
-            structure = analyze_table_structure(table)
-            
-            if structure:
-                struct_id = create_structure_id(structure)
-                structure_stats[struct_id]['count'] += 1
-                structure_stats[struct_id]['structure'] = structure
-                
-                # 保存示例（最多保存3个）
-                if len(structure_stats[struct_id]['examples']) < 3:
-                    structure_stats[struct_id]['examples'].append(item['name'])
-                
-                # 记录HTML文件名（避免重复）
-                if html_filename not in structure_stats[struct_id]['html_files']:
-                    structure_stats[struct_id]['html_files'].append(html_filename)
-    
+
+        content_hash, cached = lookup_cache(cache, item, parser)
+        if not content_hash:
+            continue
+        if cached is None:
+            cached = analyze_content(item['content_html'], parser)
+            cache.put(content_hash, parser, cached)
+        total_tables += fold_structures(structure_stats, item['name'], cached)
+
     print(f"处理完成，共找到 {total_tables} 个表格")
     return structure_stats, total_tables
 
 
-def generate_report(structure_stats, total_tables):
+def generate_report(structure_stats, total_tables, families=None):
     """生成分析报告"""
     report = {
         'summary': {
@@ -176,6 +686,13 @@ def generate_report(structure_stats, total_tables):
         },
         'structures': []
     }
+
+    family_of = {}
+    if families is not None:
+        report['summary']['structure_families'] = len(families)
+        for family in families:
+            for struct_id in family['structure_ids']:
+                family_of[struct_id] = family['family_id']
     
     # 按出现频率排序
     sorted_structures = sorted(
@@ -187,14 +704,8 @@ def generate_report(structure_stats, total_tables):
     for struct_id, stats in sorted_structures:
         structure = stats['structure']
         
-        # 创建字段信息
-        fields = []
-        for i, header in enumerate(structure['headers']):
-            field_type = structure['field_types'][i] if i < len(structure['field_types']) else 'unknown'
-            fields.append({
-                'position': i + 1,
-                'type': field_type
-            })
+        # 创建字段信息：按列汇总该结构所有表格的类型分布（家族汇总见 families[].fields）
+        fields = summarize_fields(stats['type_counts'], structure['col_count'])
         
         structure_info = {
             'structure_id': struct_id,
@@ -208,22 +719,65 @@ def generate_report(structure_stats, total_tables):
             'examples': stats['examples'],
             'html_files': stats['html_files']  # 新增：对应的HTML文件列表
         }
+        if struct_id in family_of:
+            structure_info['family_id'] = family_of[struct_id]
         
         report['structures'].append(structure_info)
+
+    if families is not None:
+        report['families'] = families
     
     return report
 
 
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='分析归档JSON中 content_html 字段的表格结构')
+    parser.add_argument('--input', default='archived/ylml_details.json',
+                        help='输入文件（默认: archived/ylml_details.json）')
+    parser.add_argument('--output', default='table_structure_analysis.json',
+                        help='报告输出路径（默认: table_structure_analysis.json）')
+    parser.add_argument('--format', choices=['auto', 'json', 'jsonl'], default='auto',
+                        help='输入格式：json 为顶层数组，jsonl 为每行一个对象（默认按扩展名判断）')
+    parser.add_argument('--stream', action='store_true',
+                        help='流式读取JSON数组，逐个对象处理，内存占用保持平稳')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help='并行分析的进程数（默认1，即串行）')
+    parser.add_argument('--chunk-size', type=int, default=50, metavar='N',
+                        help='并行模式下每批发送给子进程的对象数（默认50）')
+    parser.add_argument('--parser', choices=PARSERS, default='html.parser',
+                        help='表格解析后端（默认 html.parser；lxml-native 最快）')
+    parser.add_argument('--cache', default=None, metavar='PATH',
+                        help='结构缓存SQLite路径（默认: 输入文件所在目录/table_structure_cache.sqlite）')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='不使用结构缓存，重新解析所有对象')
+    parser.add_argument('--family-threshold', type=float, default=0.8, metavar='T',
+                        help='布局归入同一家族的最低相似度（0-1，默认0.8）')
+    return parser.parse_args()
+
+
 def main():
     """主函数"""
-    input_file = 'archived/ylml_details.json'
-    output_file = 'table_structure_analysis.json'
-    
+    args = parse_args()
+    input_file = args.input
+    output_file = args.output
+
     print(f"正在分析文件: {input_file}")
-    
+
+    cache = None
     try:
-        structure_stats, total_tables = analyze_json_file(input_file)
-        report = generate_report(structure_stats, total_tables)
+        if not args.no_cache:
+            cache_path = args.cache or os.path.join(os.path.dirname(input_file), 'table_structure_cache.sqlite')
+            cache = StructureCache(cache_path)
+            print(f"使用结构缓存: {cache_path}")
+
+        structure_stats, total_tables = analyze_json_file(
+            input_file, args.format, args.stream, args.workers, args.chunk_size, args.parser, cache
+        )
+        families = group_structure_families(structure_stats, args.family_threshold)
+        report = generate_report(structure_stats, total_tables, families)
+        if cache is not None:
+            report['summary']['cache'] = cache.stats()
         
         # 保存报告
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -232,7 +786,12 @@ def main():
         print(f"分析完成！")
         print(f"总表格数: {total_tables}")
         print(f"唯一结构数: {len(structure_stats)}")
+        print(f"结构家族数: {len(families)}")
         print(f"报告已保存到: {output_file}")
+        if cache is not None:
+            cache_stats = cache.stats()
+            print(f"缓存命中: {cache_stats['hits']}，未命中: {cache_stats['misses']} "
+                  f"(命中率 {cache_stats['hit_rate']}%)")
         
         # 打印简要统计
         print("\n结构统计:")
@@ -244,6 +803,9 @@ def main():
         print(f"错误: 找不到文件 {input_file}")
     except Exception as e:
         print(f"分析过程中出现错误: {e}")
+    finally:
+        if cache is not None:
+            cache.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+比较表格解析后端的速度与一致性
+
+对同一份归档分别使用 html.parser、BeautifulSoup + lxml 和 lxml 原生XPath
+解析全部 content_html，统计耗时，并逐个对象核对得到的结构ID序列是否一致。
+
+使用方法：
+    python scripts/benchmark_table_parsers.py [--input archived/ylml_details.json] [--repeat N]
+"""
+
+import argparse
+import sys
+import time
+
+from analyze_table_structure import PARSERS, analyze_rows, create_structure_id, extract_tables, iter_items
+
+
+def structure_ids(content_html, parser):
+    """返回对象中每个表格的结构ID（无行的表格记为 None）"""
+    ids = []
+    for rows in extract_tables(content_html, parser):
+        structure = analyze_rows(rows)
+        ids.append(create_structure_id(structure) if structure else None)
+    return ids
+
+
+def run_parser(items, parser, repeat):
+    """用指定后端处理全部对象，返回最短耗时和每个对象的结构ID"""
+    best = float('inf')
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [structure_ids(item['content_html'], parser) for item in items]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='比较表格解析后端的速度与结构ID一致性')
+    parser.add_argument('--input', default='archived/ylml_details.json',
+                        help='输入文件（默认: archived/ylml_details.json）')
+    parser.add_argument('--format', choices=['auto', 'json', 'jsonl'], default='auto',
+                        help='输入格式（默认按扩展名判断）')
+    parser.add_argument('--repeat', type=int, default=3, metavar='N',
+                        help='每个后端重复运行次数，取最短耗时（默认3）')
+    args = parser.parse_args()
+
+    items = [item for item in iter_items(args.input, args.format)
+             if item.get('content_html')]
+    total_bytes = sum(len(item['content_html'].encode('utf-8')) for item in items)
+    print(f"对象数: {len(items)}，HTML总量: {total_bytes / 1024 / 1024:.2f} MB")
+
+    timings = {}
+    outputs = {}
+    for name in PARSERS:
+        timings[name], outputs[name] = run_parser(items, name, args.repeat)
+
+    baseline = PARSERS[0]
+    print(f"\n{'后端':<14}{'耗时(秒)':>10}{'对象/秒':>12}{'加速比':>10}")
+    for name in PARSERS:
+        elapsed = timings[name]
+        rate = len(items) / elapsed if elapsed > 0 else float('inf')
+        speedup = timings[baseline] / elapsed if elapsed > 0 else float('inf')
+        print(f"{name:<14}{elapsed:>10.3f}{rate:>12.1f}{speedup:>9.2f}x")
+
+    mismatches = 0
+    for name in PARSERS[1:]:
+        for item, expected, actual in zip(items, outputs[baseline], outputs[name]):
+            if expected != actual:
+                mismatches += 1
+                print(f"不一致 [{name}] {item['name']}: {expected} != {actual}")
+
+    if mismatches:
+        print(f"\n❌ 共 {mismatches} 处结构ID与 {baseline} 不一致")
+        sys.exit(1)
+    print(f"\n✅ 所有后端的结构ID与 {baseline} 一致")
+
+
+if __name__ == '__main__':
+    main()
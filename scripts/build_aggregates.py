@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+"""
+构建期预计算概览页的全量聚合
+
+用 pandas 按 src/services/dataLoader.ts 的规则清洗 SuzhouGardenListFull.csv，
+再按 src/utils/chartDataProcessor.ts 中 OVERVIEW_AGGREGATES 的各个函数计算未筛选时的聚合
+（区县面积、年代×文保级别、区县×文保级别矩阵、年代面积 Treemap 等），
+写入一个紧凑的 aggregates.json。前端没有筛选条件时直接读取该文件，不再在浏览器中分组统计。
+
+排序、取整和百分比格式与 TypeScript 实现逐项对应：
+- Map/Set 的插入顺序对应 pandas 中的首次出现顺序，Array.sort 的稳定排序对应 Python 的 sorted
+- Math.round 为四舍五入（.5 向正无穷），toFixed 按浮点数的精确值四舍五入
+- localeCompare(…, 'zh-CN') 优先使用 PyICU 的中文排序规则，未安装时使用内置的区县拼音顺序
+
+--verify 用 node 执行 scripts/aggregates_parity.mjs（需先 npm install），
+以 TypeScript 源码计算同一份数据的聚合并与 Python 结果逐项比较。
+
+用法：
+    python build_aggregates.py                 # 生成 public/dataset/aggregates.json
+    python build_aggregates.py --verify        # 生成后与 TypeScript 结果比较
+    python build_aggregates.py --input x.csv --output y.json
+"""
+
+import sys
+import json
+import math
+import argparse
+import subprocess
+import tempfile
+from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from dataset_io import GARDEN_LIST_CSV, PUBLIC_DATASET_DIR, ROOT_DIR, read_table, sha256_file
+
+try:
+    import icu
+    ICU_AVAILABLE = True
+except ImportError:
+    ICU_AVAILABLE = False
+
+DEFAULT_INPUT = GARDEN_LIST_CSV
+DEFAULT_OUTPUT = PUBLIC_DATASET_DIR / 'aggregates.json'
+PARITY_SCRIPT = Path(__file__).resolve().parent / 'aggregates_parity.mjs'
+
+# 与 src/services/dataLoader.ts 中的 AGGREGATES_VERSION 一致
+AGGREGATES_VERSION = 1
+
+# ==================== 清洗规则（对应 dataLoader.ts） ====================
+
+# 年代分类：建造年代与关键字完全相同时归入该分类
+ERA_CATEGORIES = [
+    ('宋代及以前', ['春秋', '汉', '南朝', '南北朝', '宋']),
+    ('元代', ['元']),
+    ('明代', ['明']),
+    ('清代', ['清']),
+    ('民国', ['民国']),
+    ('现代', ['现代']),
+]
+
+# 面积区间（㎡），左闭右开
+AREA_RANGES = [
+    ('0-5000', 0, 5000),
+    ('5000-10000', 5000, 10000),
+    ('10000-15000', 10000, 15000),
+    ('15000-20000', 15000, 20000),
+    ('20000-25000', 20000, 25000),
+    ('25000以上', 25000, math.inf),
+]
+
+OWNERSHIP_MAPPING = {'私人': '私有', '私有': '私有'}
+CURRENT_USE_MAPPING = {'旅游景点': '游览服务', '游览服务': '游览服务'}
+WORLD_HERITAGE_VALUES = {'TRUE', 'YES', '是', '1'}
+
+# String.prototype.trim 去除的空白字符
+JS_WHITESPACE = ('\t\n\v\f\r \u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006'
+                 '\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff')
+
+# parseFloat 能解析的最长数值前缀（不含 Infinity）
+FLOAT_PREFIX = r'^[' + JS_WHITESPACE + r']*([+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?)'
+UNSIGNED_FLOAT_PREFIX = r'^([0-9]+\.?[0-9]*|\.[0-9]+)'
+
+# 英文字段名 -> CSV 列名（对应 GardenData 接口）
+FIELD_COLUMNS = {
+    'publicationBatch': '公布批次',
+    'name': '名称',
+    'district': '区县',
+    'address': '地址',
+    'constructionPeriod': '建造年代',
+    'managementUnit': '管理单位',
+    'protectionStatus': '保护状况',
+    'openStatus': '开放情况',
+    'description': '描述',
+}
+
+# ==================== 排序规则（对应 chartDataProcessor.ts） ====================
+
+HERITAGE_LEVEL_ORDER = ['全国', '省级', '市级', '县级', '未定级']
+ERA_ORDER = ['宋代及以前', '元代', '明代', '清代', '民国', '现代', '未知', '不详']
+AREA_RANGE_ORDER = [label for label, _, _ in AREA_RANGES] + ['未知']
+OWNERSHIP_ORDER = ['国有', '私有', '企业', '宗教产', '未知']
+PROTECTION_ORDER = ['差', '中', '好', '未知']
+OPEN_STATUS_ORDER = ['不开放', '预约开放', '开放']
+
+# 未安装 PyICU 时 zh-CN 排序使用的区县拼音（其余名称按码位排在其后）
+DISTRICT_PINYIN = {
+    '常熟市': 'chang shu shi',
+    '工业园区': 'gong ye yuan qu',
+    '姑苏区': 'gu su qu',
+    '虎丘区': 'hu qiu qu',
+    '昆山市': 'kun shan shi',
+    '太仓市': 'tai cang shi',
+    '吴江区': 'wu jiang qu',
+    '吴中区': 'wu zhong qu',
+    '相城区': 'xiang cheng qu',
+    '张家港市': 'zhang jia gang shi',
+}
+
+if ICU_AVAILABLE:
+    _ZH_COLLATOR = icu.Collator.createInstance(icu.Locale('zh_CN'))
+
+    def zh_key(text: str):
+        """localeCompare(…, 'zh-CN') 的排序键"""
+        return _ZH_COLLATOR.getSortKey(text)
+else:
+    def zh_key(text: str):
+        """localeCompare(…, 'zh-CN') 的近似排序键：已知区县按拼音，其余按码位"""
+        if text in DISTRICT_PINYIN:
+            return (0, DISTRICT_PINYIN[text])
+        return (1, text)
+
+
+def order_key(order, missing=999):
+    """按 order 中的位置排序；不在 order 中的值位置为 missing（对应 indexOf 返回 -1 的处理）"""
+    positions = {value: index for index, value in enumerate(order)}
+    return lambda value: positions.get(value, missing)
+
+
+def js_round(value: float) -> int:
+    """Math.round：四舍五入，.5 向正无穷取整"""
+    return int(math.floor(value + 0.5))
+
+
+def to_fixed(value: float, decimals: int) -> str:
+    """Number.prototype.toFixed：按浮点数的精确十进制值四舍五入"""
+    return str(Decimal(value).quantize(Decimal(1).scaleb(-decimals), rounding=ROUND_HALF_UP))
+
+
+def calculate_percentage(value: float, total: float, decimals: int = 1) -> str:
+    """占比百分数字符串（对应 calculatePercentage）"""
+    if total == 0:
+        return '0%'
+    return f"{to_fixed(value / total * 100, decimals)}%"
+
+
+def js_sum(values) -> float:
+    """按顺序逐项累加（与 reduce 的浮点结果一致，不使用成对求和）"""
+    total = 0
+    for value in values:
+        total += value
+    return total
+
+
+# ==================== 数据加载与清洗 ====================
+
+def js_trim(series: pd.Series) -> pd.Series:
+    return series.str.strip(JS_WHITESPACE)
+
+
+def clean_area(series: pd.Series) -> pd.Series:
+    """去掉数字和小数点以外的字符后取 parseFloat，无法解析时为 0"""
+    digits = series.str.replace(r'[^0-9.]', '', regex=True)
+    return pd.to_numeric(digits.str.extract(UNSIGNED_FLOAT_PREFIX, expand=False), errors='coerce').fillna(0.0)
+
+
+def clean_coordinate(series: pd.Series) -> pd.Series:
+    """parseFloat 经纬度，空值或无法解析时为 0"""
+    return pd.to_numeric(series.str.extract(FLOAT_PREFIX, expand=False), errors='coerce').fillna(0.0)
+
+
+def clean_heritage_level(series: pd.Series) -> pd.Series:
+    """空值归为“未定级”"""
+    trimmed = js_trim(series)
+    missing = (trimmed == '') | series.isin(['null', 'undefined'])
+    return trimmed.mask(missing, '未定级')
+
+
+def clean_category(series: pd.Series, mapping) -> pd.Series:
+    """去空白、空值归为“未知”，再按 mapping 归一化"""
+    trimmed = js_trim(series)
+    return trimmed.replace(mapping).mask(trimmed == '', '未知')
+
+
+def calculate_era_category(periods: pd.Series) -> pd.Series:
+    """建造年代与 ERA_CATEGORIES 的关键字精确匹配，匹配不到时为“未知”"""
+    mapping = {}
+    for label, keywords in ERA_CATEGORIES:
+        for keyword in keywords:
+            mapping.setdefault(keyword, label)
+    categories = periods.map(mapping)
+    unknown = sorted(set(periods[categories.isna() & (periods != '')]))
+    for period in unknown:
+        print(f"⚠️  未识别的建造年代: \"{period}\"")
+    return categories.fillna('未知')
+
+
+def calculate_area_range(area: pd.Series) -> pd.Series:
+    """面积所在区间，面积不大于 0 时为“未知”"""
+    conditions = [(area > 0) & (area >= low) & (area < high) for _, low, high in AREA_RANGES]
+    labels = [label for label, _, _ in AREA_RANGES]
+    return pd.Series(np.select(conditions, labels, default='未知'), index=area.index)
+
+
+def load_garden_data(csv_path: Path) -> pd.DataFrame:
+    """读取园林名录并清洗为 GardenData 字段（列名与 TypeScript 接口一致）"""
+    # 保留单元格原文，按前端的 parseFloat 等规则清洗
+    raw = read_table(csv_path)
+    raw.columns = [str(column).strip(JS_WHITESPACE) for column in raw.columns]
+    for column in ['面积（㎡）', '权属性质', '当前用途', '经度', '纬度', '文保单位级别', '世界遗产', *FIELD_COLUMNS.values()]:
+        if column not in raw.columns:
+            raw[column] = ''
+
+    df = pd.DataFrame(index=raw.index)
+    for field, column in FIELD_COLUMNS.items():
+        df[field] = js_trim(raw[column])
+    df['area'] = clean_area(raw['面积（㎡）'])
+    df['ownershipType'] = clean_category(raw['权属性质'], OWNERSHIP_MAPPING)
+    df['currentUse'] = clean_category(raw['当前用途'], CURRENT_USE_MAPPING)
+    df['longitude'] = clean_coordinate(raw['经度'])
+    df['latitude'] = clean_coordinate(raw['纬度'])
+    df['heritageLevel'] = clean_heritage_level(raw['文保单位级别'])
+    df['isWorldHeritage'] = js_trim(raw['世界遗产']).str.upper().isin(WORLD_HERITAGE_VALUES)
+    df['eraCategory'] = calculate_era_category(df['constructionPeriod'])
+    df['areaRange'] = calculate_area_range(df['area'])
+    return df.reset_index(drop=True)
+
+
+# ==================== 聚合（对应 chartDataProcessor.ts） ====================
+
+def first_seen(series: pd.Series) -> list:
+    """按首次出现的顺序去重（对应 Set 的插入顺序）"""
+    return pd.unique(series).tolist()
+
+
+def crosstab(df: pd.DataFrame, row: str, column: str, rows: list, columns: list) -> pd.DataFrame:
+    """row × column 的计数表，按给定顺序排列，缺失组合为 0"""
+    table = pd.crosstab(df[row], df[column])
+    return table.reindex(index=rows, columns=columns, fill_value=0).astype(int)
+
+
+def stacked_series(table: pd.DataFrame) -> list:
+    """计数表（行为横轴类别，列为系列）转为 [{name, data}, ...]"""
+    return [{'name': name, 'data': table[name].tolist()} for name in table.columns]
+
+
+def count_by(df: pd.DataFrame, column: str) -> list:
+    """按首次出现顺序的 [(类别, 数量), ...]"""
+    counts = df.groupby(column, sort=False).size()
+    return list(zip(counts.index.tolist(), counts.tolist()))
+
+
+def grouped_values(df: pd.DataFrame, column: str, value: str = 'area') -> list:
+    """按首次出现顺序的 [(类别, 原始顺序的取值列表), ...]"""
+    return [(name, group[value].tolist()) for name, group in df.groupby(column, sort=False)]
+
+
+def group_area_by_district(df):
+    items = [(name, js_round(js_sum(values))) for name, values in grouped_values(df, 'district')]
+    return [{'name': name, 'value': value} for name, value in sorted(items, key=lambda item: zh_key(item[0]))]
+
+
+def group_average_area(df, column, key):
+    items = [(name, js_round(js_sum(values) / len(values))) for name, values in grouped_values(df, column)]
+    return [{'name': name, 'value': value} for name, value in sorted(items, key=lambda item: key(item[0]))]
+
+
+def stacked_by(df, category, series, category_key, series_key):
+    """分层统计：categories 为 category 列的取值，每个系列为 series 列的一个取值"""
+    categories = sorted(first_seen(df[category]), key=category_key)
+    names = sorted(first_seen(df[series]), key=series_key)
+    table = crosstab(df, category, series, categories, names)
+    return categories, stacked_series(table)
+
+
+def group_by_ownership_and_open_status(df):
+    nodes = first_seen(pd.Series(df[['ownershipType', 'openStatus']].to_numpy().ravel()))
+    counts = df.groupby(['ownershipType', 'openStatus'], sort=False).size()
+    links = [{'source': source, 'target': target, 'value': int(value)}
+             for (source, target), value in counts.items()
+             if value > 0 and source and target]
+    return {'nodes': [{'name': name} for name in nodes], 'links': links}
+
+
+def heatmap_matrix(df, x, y, x_key, y_key):
+    """矩阵热力图：每个格子的计数和占该横轴类别总数的百分比"""
+    x_categories = sorted(first_seen(df[x]), key=x_key)
+    y_categories = sorted(first_seen(df[y]), key=y_key)
+    table = crosstab(df, x, y, x_categories, y_categories)
+    totals = df[x].value_counts()
+    matrix = []
+    for x_category in x_categories:
+        total = int(totals.get(x_category, 0)) or 1
+        for y_category in y_categories:
+            value = int(table.at[x_category, y_category])
+            matrix.append({
+                'xCategory': x_category,
+                'yCategory': y_category,
+                'value': value,
+                'percentage': calculate_percentage(value, total)
+            })
+    return {'xCategories': x_categories, 'yCategories': y_categories, 'matrixData': matrix}
+
+
+def sort_by_area(df: pd.DataFrame, descending: bool = False) -> pd.DataFrame:
+    """按面积稳定排序，面积相同的保持原有顺序（对应 Array.sort 的比较函数 a.area - b.area）"""
+    areas = df['area'].tolist()
+    sign = -1 if descending else 1
+    return df.iloc[sorted(range(len(areas)), key=lambda i: sign * areas[i])]
+
+
+def cumulative_area_by_open_status(df):
+    global_total = js_sum(df['area'].tolist())
+
+    def series(subset, name, color):
+        ordered = sort_by_area(subset)
+        cumulative = 0
+        data = []
+        for garden_name, area in zip(ordered['name'].tolist(), ordered['area'].tolist()):
+            cumulative += area
+            data.append({
+                'gardenName': garden_name,
+                'area': area,
+                'cumulativePercent': cumulative / global_total * 100 if global_total > 0 else 0
+            })
+        return {'name': name, 'color': color, 'data': data}
+
+    return [
+        series(df, '全部', '#5470C6'),
+        series(df[df['openStatus'] == '开放'], '开放', '#91CC75'),
+        series(df[df['openStatus'] == '不开放'], '不开放', '#EE6666'),
+    ]
+
+
+def high_level_heritage_ratio(df):
+    if len(df) == 0:
+        return 0
+    return int(df['heritageLevel'].isin(['全国', '省级']).sum()) / len(df) * 100
+
+
+def era_area_treemap(df, top_n=6):
+    total_area = js_sum(df['area'].tolist())
+    eras = df['eraCategory'].where(df['eraCategory'] != '', '未知')
+    nodes = []
+    for era in sorted(first_seen(eras), key=order_key(ERA_ORDER)):
+        gardens = df[eras == era]
+        era_total = js_sum(gardens['area'].tolist())
+        ordered = sort_by_area(gardens, descending=True)
+        top, rest = ordered.head(top_n), ordered.iloc[top_n:]
+
+        children = [{
+            'name': row.name,
+            'value': row.area,
+            'meta': {
+                'nodeType': 'garden',
+                'era': era,
+                'district': row.district,
+                'percentage': calculate_percentage(row.area, era_total) if era_total > 0 else '0%'
+            }
+        } for row in top.itertuples(index=False)]
+
+        rest_area = js_sum(rest['area'].tolist())
+        if len(rest) > 0 and rest_area > 0:
+            children.append({
+                'name': '其他',
+                'value': rest_area,
+                'meta': {
+                    'nodeType': 'others',
+                    'era': era,
+                    'count': len(rest),
+                    'percentage': calculate_percentage(rest_area, era_total) if era_total > 0 else '0%'
+                }
+            })
+
+        if era_total > 0:
+            nodes.append({
+                'name': era,
+                'value': era_total,
+                'children': children,
+                'meta': {
+                    'nodeType': 'era',
+                    'era': era,
+                    'count': len(gardens),
+                    'percentage': calculate_percentage(era_total, total_area) if total_area > 0 else '0%'
+                }
+            })
+    return nodes
+
+
+def build_aggregates(df: pd.DataFrame) -> dict:
+    """计算 OVERVIEW_AGGREGATES 中的全部聚合，键名与 TypeScript 一致"""
+    df = df.assign(protection=df['protectionStatus'].where(df['protectionStatus'] != '', '未知'))
+    heritage_key = order_key(HERITAGE_LEVEL_ORDER)
+    era_key = order_key(ERA_ORDER)
+    area_range_key = order_key(AREA_RANGE_ORDER, missing=-1)
+    ownership_positions = order_key(OWNERSHIP_ORDER)
+    ownership_key = lambda value: (ownership_positions(value), zh_key(value))
+
+    def stacked(category, series, category_key, series_key, label='categories'):
+        categories, data = stacked_by(df, category, series, category_key, series_key)
+        return {label: categories, 'series': data}
+
+    return {
+        'groupAreaByDistrict': group_area_by_district(df),
+        'groupByEraCategory': [{'name': name, 'value': value}
+                               for name, value in sorted(count_by(df, 'eraCategory'), key=lambda item: era_key(item[0]))],
+        'groupByEraCategoryAndHeritageLevel': stacked('eraCategory', 'heritageLevel', era_key, heritage_key),
+        'groupByBatchAndEraCategory': stacked('publicationBatch', 'eraCategory', None, era_key),
+        'groupByOwnershipAndOpenStatus': group_by_ownership_and_open_status(df),
+        'groupByCurrentUseAndOpenStatus': stacked('currentUse', 'openStatus', None, None),
+        'groupByDistrictAndOpenStatus': stacked('district', 'openStatus', zh_key, None),
+        'groupByAreaRangeAndOwnership': stacked('areaRange', 'ownershipType', area_range_key, ownership_key, 'intervals'),
+        'groupAverageAreaByDistrict': group_average_area(df, 'district', zh_key),
+        'groupByDistrictAndProtectionStatus': stacked('district', 'protection', zh_key, None),
+        'generateDistrictHeritageLevelMatrix': heatmap_matrix(df, 'district', 'heritageLevel', zh_key, heritage_key),
+        'generateProtectionOpenStatusMatrix': heatmap_matrix(df, 'protection', 'openStatus',
+                                                             order_key(PROTECTION_ORDER, missing=-1),
+                                                             order_key(OPEN_STATUS_ORDER, missing=-1)),
+        'calculateCumulativeAreaByOpenStatus': cumulative_area_by_open_status(df),
+        'calculateHighLevelHeritageRatio': high_level_heritage_ratio(df),
+        'buildEraAreaTreemap': era_area_treemap(df, 6),
+    }
+
+
+# ==================== 输出与校验 ====================
+
+def compact_numbers(value):
+    """整数值的浮点数写为整数（JSON 中与 JavaScript 的数字输出一致，文件更紧凑）"""
+    if isinstance(value, dict):
+        return {key: compact_numbers(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [compact_numbers(item) for item in value]
+    if isinstance(value, (float, np.floating)) and math.isfinite(value) and float(value).is_integer():
+        return int(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+
+def build_document(csv_path: Path) -> dict:
+    """清洗数据并生成 aggregates.json 的完整内容"""
+    df = load_garden_data(csv_path)
+    return {
+        'version': AGGREGATES_VERSION,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'source': {
+            'file': csv_path.name,
+            'sha256': sha256_file(csv_path),
+            'rows': len(df)
+        },
+        'aggregates': compact_numbers(build_aggregates(df))
+    }
+
+
+def compare(expected, actual, path='', tolerance=1e-9, limit=20, diffs=None):
+    """
+    递归比较两份 JSON 数据，返回差异列表 [(路径, 期望值, 实际值), ...]
+    数值按相对/绝对误差 tolerance 比较，其余值要求完全相同
+    """
+    if diffs is None:
+        diffs = []
+    if len(diffs) >= limit:
+        return diffs
+
+    numeric = (int, float)
+    if isinstance(expected, bool) or isinstance(actual, bool):
+        if expected is not actual:
+            diffs.append((path, expected, actual))
+    elif isinstance(expected, numeric) and isinstance(actual, numeric):
+        if not math.isclose(expected, actual, rel_tol=tolerance, abs_tol=tolerance):
+            diffs.append((path, expected, actual))
+    elif isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(set(expected) | set(actual)):
+            if key not in expected or key not in actual:
+                diffs.append((f"{path}.{key}", expected.get(key, '<缺失>'), actual.get(key, '<缺失>')))
+            else:
+                compare(expected[key], actual[key], f"{path}.{key}", tolerance, limit, diffs)
+    elif isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            diffs.append((f"{path}.length", len(expected), len(actual)))
+        for index, (a, b) in enumerate(zip(expected, actual)):
+            compare(a, b, f"{path}[{index}]", tolerance, limit, diffs)
+    elif expected != actual:
+        diffs.append((path, expected, actual))
+    return diffs[:limit]
+
+
+def run_typescript_aggregates(csv_path: Path) -> dict:
+    """用 node 执行 TypeScript 版本的清洗和聚合，返回各聚合结果"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = Path(tmp_dir) / 'aggregates_ts.json'
+        result = subprocess.run(
+            ['node', str(PARITY_SCRIPT), str(csv_path), str(output_path)],
+            cwd=ROOT_DIR, capture_output=True, text=True, encoding='utf-8'
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"TypeScript 聚合执行失败:\n{result.stderr.strip()}")
+        with open(output_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+def verify(document: dict, csv_path: Path) -> bool:
+    """与 TypeScript 结果逐项比较，打印差异，完全一致时返回 True"""
+    print("\n🔍 与 TypeScript 结果比较...")
+    expected = run_typescript_aggregates(csv_path)
+    actual = document['aggregates']
+
+    ok = True
+    for key in sorted(set(expected) | set(actual)):
+        if key not in actual:
+            print(f"  ❌ {key}: Python 未生成")
+            ok = False
+            continue
+        if key not in expected:
+            print(f"  ❌ {key}: OVERVIEW_AGGREGATES 中不存在")
+            ok = False
+            continue
+        diffs = compare(expected[key], actual[key], key)
+        if diffs:
+            ok = False
+            print(f"  ❌ {key}: {len(diffs)} 处差异")
+            for path, a, b in diffs[:5]:
+                print(f"      {path}: TypeScript={a!r} Python={b!r}")
+        else:
+            print(f"  ✅ {key}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='预计算概览页的全量聚合（aggregates.json）')
+    parser.add_argument('--input', type=Path, default=DEFAULT_INPUT, help='园林名录 CSV')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT, help='输出的 aggregates.json')
+    parser.add_argument('--verify', action='store_true', help='生成后与 TypeScript 的计算结果逐项比较')
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"❌ 文件不存在: {args.input}")
+        return 1
+
+    if not ICU_AVAILABLE:
+        print("⚠️  未安装 PyICU，区县按内置拼音表排序")
+
+    document = build_document(args.input)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"✅ 已生成 {args.output}")
+    print(f"   园林数量: {document['source']['rows']}")
+    print(f"   聚合数量: {len(document['aggregates'])}")
+    print(f"   文件大小: {args.output.stat().st_size / 1024:.1f} KB")
+
+    if args.verify and not verify(document, args.input):
+        print("\n❌ 与 TypeScript 结果不一致")
+        return 1
+    if args.verify:
+        print("\n✅ 与 TypeScript 结果一致")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env node
+/**
+ * 检查构建期数据产物是否与园林名录 CSV 一致，过期时重新生成
+ *
+ * 产物的 source.sha256 / source.rows 记录了生成时所用的 CSV。
+ * 与当前 public/dataset/SuzhouGardenListFull.csv 的内容哈希不一致（或产物缺失）时，
+ * 调用对应的 Python 脚本重新生成；生成失败则以非零状态退出，
+ * 避免前端继续使用过期的数据。
+ * 作为 npm 的 predev / prebuild 步骤运行；Python 解释器可用环境变量 PYTHON 指定（默认 python3）。
+ *
+ * 用法：
+ *     node scripts/check_dataset_freshness.mjs            # 过期时重新生成
+ *     node scripts/check_dataset_freshness.mjs --check    # 只检查，过期时退出码为 1
+ */
+
+import { createHash } from 'node:crypto';
+import { existsSync, readFileSync } from 'node:fs';
+import { spawnSync } from 'node:child_process';
+import { dirname, join, relative, resolve } from 'node:path';
+import { fileURLToPath } from 'node:url';
+
+const rootDir = resolve(dirname(fileURLToPath(import.meta.url)), '..');
+const datasetDir = join(rootDir, 'public', 'dataset');
+const csvPath = join(datasetDir, 'SuzhouGardenListFull.csv');
+const python = process.env.PYTHON || 'python3';
+const checkOnly = process.argv.includes('--check');
+
+// 产物文件（记录 source 的 JSON）及其生成脚本
+const ARTIFACTS = [
+  {
+    label: '列式数据包',
+    path: join(datasetDir, 'columnar', 'manifest.json'),
+    script: join(rootDir, 'scripts', 'export_columnar.py'),
+  },
+  {
+    label: '概览聚合数据',
+    path: join(datasetDir, 'aggregates.json'),
+    script: join(rootDir, 'scripts', 'build_aggregates.py'),
+  },
+];
+
+/**
+ * 产物记录的源数据与当前 CSV 不一致的原因，一致时返回 null
+ */
+function staleReason(artifact, sha256) {
+  if (!existsSync(artifact.path)) {
+    return '文件不存在';
+  }
+  let source;
+  try {
+    source = JSON.parse(readFileSync(artifact.path, 'utf-8')).source;
+  } catch (error) {
+    return `无法读取: ${error.message}`;
+  }
+  if (!source || source.sha256 !== sha256) {
+    return '源 CSV 内容已变化';
+  }
+  return null;
+}
+
+const sha256 = createHash('sha256').update(readFileSync(csvPath)).digest('hex');
+let failed = false;
+
+for (const artifact of ARTIFACTS) {
+  const reason = staleReason(artifact, sha256);
+  if (!reason) {
+    console.log(`✅ ${artifact.label}与 CSV 一致`);
+    continue;
+  }
+
+  console.warn(`⚠️  ${artifact.label}已过期（${reason}）: ${relative(rootDir, artifact.path)}`);
+  if (checkOnly) {
+    failed = true;
+    continue;
+  }
+
+  console.log(`   重新生成: ${python} ${relative(rootDir, artifact.script)}`);
+  const result = spawnSync(python, [artifact.script], { cwd: join(rootDir, 'scripts'), stdio: 'inherit' });
+  if (result.status !== 0 || staleReason(artifact, sha256)) {
+    console.error(
+      `❌ ${artifact.label}生成失败${result.error ? `: ${result.error.message}` : ''}，` +
+        `请安装 scripts/pyproject.toml 中的依赖后手动运行 ${relative(rootDir, artifact.script)}`,
+    );
+    failed = true;
+  }
+}
+
+process.exit(failed ? 1 : 0);
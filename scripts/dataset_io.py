@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+数据集读取的公共模块
+
+- 路径：按仓库根目录解析，脚本在任何工作目录下运行都能找到默认数据文件
+- 编码：只读取文件开头一段字节判断编码（BOM → UTF-8 → GB18030），整个文件只解码一次
+- 表结构：园林名录、区县统计表的列与类型，区县边界 GeoJSON 的要素属性
+- 缓存：解析结果按源文件内容哈希保存为 pickle，文件未变化时直接加载，跳过解码和解析
+
+用法示例：
+    from dataset_io import GARDEN_LIST_CSV, load_garden_list, load_districts, read_table
+    gardens = load_garden_list()                 # 按 GARDEN_LIST_SCHEMA 转换类型
+    raw = read_table(GARDEN_LIST_CSV)            # 不指定表结构时全部列保留原文
+    districts = load_districts()                 # adcode/name/center_lon/center_lat/geometry
+    gardens.attrs['source']                      # {'file', 'sha256', 'encoding', 'from_cache'}
+"""
+
+import io
+import os
+import json
+import codecs
+import pickle
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+# 前端使用的数据（随站点发布）
+PUBLIC_DATASET_DIR = ROOT_DIR / 'public' / 'dataset'
+# 原始数据与中间结果（名录、抓取的 HTML 等，不随站点发布）
+DATASET_DIR = ROOT_DIR / 'dataset'
+# 解析结果缓存放在脚本目录下，不在仓库根目录创建数据目录
+CACHE_DIR = Path(__file__).resolve().parent / '.frame_cache'
+
+GARDEN_LIST_CSV = PUBLIC_DATASET_DIR / 'SuzhouGardenListFull.csv'
+DISTRICT_STATS_CSV = PUBLIC_DATASET_DIR / 'SuzhouDistricts.csv'
+DISTRICTS_GEOJSON = PUBLIC_DATASET_DIR / 'suzhou_districts.json'
+
+# 缓存格式版本，修改解析逻辑时需递增
+CACHE_VERSION = 1
+# 判断编码时读取的字节数
+SNIFF_BYTES = 64 * 1024
+
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+FALLBACK_ENCODING = 'gb18030'  # GBK 的超集
+
+# 园林名录的列与类型：未列出的列和 str 列保留原文（空单元格为空字符串），
+# 数值列无法解析时为缺失值。面积列可能带单位，保留原文，由使用方按需解析
+GARDEN_LIST_SCHEMA = {
+    '公布批次': 'Int64',
+    '名称': 'str',
+    '区县': 'str',
+    '地址': 'str',
+    '建造年代': 'str',
+    '面积（㎡）': 'str',
+    '权属性质': 'str',
+    '管理单位': 'str',
+    '保护状况': 'str',
+    '开放情况': 'str',
+    '当前用途': 'str',
+    '描述': 'str',
+    '经度': 'float64',
+    '纬度': 'float64',
+    '文保单位级别': 'str',
+    '世界遗产': 'str',
+}
+GARDEN_LIST_REQUIRED = ('公布批次', '名称', '区县')
+
+# 区县统计表（SuzhouDistricts.csv）
+DISTRICT_STATS_SCHEMA = {
+    '地区': 'str',
+    '土地面积(平方公里)': 'float64',
+    '常住人口(万人)': 'float64',
+}
+DISTRICT_STATS_REQUIRED = ('地区',)
+
+# 区县边界（suzhou_districts.json）展开后的列；geometry 为 GeoJSON 几何对象
+DISTRICTS_SCHEMA = {
+    'adcode': 'Int64',
+    'name': 'str',
+    'center_lon': 'float64',
+    'center_lat': 'float64',
+    'geometry': 'object',
+}
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path: Path) -> str:
+    """文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sniff_encoding(prefix: bytes) -> str:
+    """
+    根据文件开头的字节判断编码：有 BOM 时按 BOM，能按 UTF-8 解码时为 UTF-8，否则为 GB18030
+    前缀末尾被截断的多字节字符不算解码失败
+    """
+    for bom, encoding in BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(prefix, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+
+def sniff_file_encoding(path: Path) -> str:
+    """读取文件开头 SNIFF_BYTES 字节判断编码"""
+    with open(path, 'rb') as f:
+        return sniff_encoding(f.read(SNIFF_BYTES))
+
+
+def decode_bytes(raw: bytes):
+    """按开头字节判断的编码解码，返回 (文本, 编码)"""
+    encoding = sniff_encoding(raw[:SNIFF_BYTES])
+    try:
+        return raw.decode(encoding), encoding
+    except UnicodeDecodeError:
+        # 开头是纯 ASCII、后面才出现 GBK 字符时，按前缀会误判为 UTF-8
+        if encoding != 'utf-8':
+            raise
+        return raw.decode(FALLBACK_ENCODING), FALLBACK_ENCODING
+
+
+def _cache_prefix(path: Path, kind: str) -> str:
+    """缓存文件名前缀：同名文件位于不同目录时互不覆盖"""
+    location = sha256_bytes(str(path.resolve()).encode('utf-8'))[:8]
+    return f"{path.stem}.{location}.{kind}"
+
+
+def load_cached(path, kind: str, parse: Callable[[str], object], cache_dir=CACHE_DIR):
+    """
+    读取文件并用 parse(文本) 解析，返回 (解析结果, 来源信息)
+    kind 区分同一文件的不同解析方式（如不同的表结构）；cache_dir 为 None 时不使用缓存。
+    文件内容变化后写入新的缓存，并删除该文件同类的旧缓存
+    """
+    path = Path(path)
+    raw = path.read_bytes()
+    file_hash = sha256_bytes(raw)
+    source = {'file': path.name, 'sha256': file_hash, 'encoding': None, 'from_cache': False}
+
+    cache_path = None
+    if cache_dir is not None:
+        cache_dir = Path(cache_dir)
+        prefix = _cache_prefix(path, kind)
+        cache_path = cache_dir / f"{prefix}.{file_hash[:16]}.pkl"
+        if cache_path.exists():
+            try:
+                with open(cache_path, 'rb') as f:
+                    cached = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                cached = {}
+            if cached.get('version') == CACHE_VERSION and cached.get('file_hash') == file_hash:
+                source.update(encoding=cached['encoding'], from_cache=True)
+                return cached['data'], source
+
+    text, encoding = decode_bytes(raw)
+    data = parse(text)
+    source['encoding'] = encoding
+
+    if cache_path is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in cache_dir.glob(f"{prefix}.*.pkl"):
+            stale.unlink(missing_ok=True)
+        tmp_path = cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': CACHE_VERSION, 'file_hash': file_hash, 'encoding': encoding, 'data': data},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    return data, source
+
+
+def schema_key(schema: Dict[str, str] = None) -> str:
+    """表结构的缓存标识：表结构变化后不会读到按旧结构解析的缓存"""
+    if not schema:
+        return 'raw'
+    return 'table-' + sha256_bytes(json.dumps(schema, ensure_ascii=False, sort_keys=True).encode('utf-8'))[:8]
+
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, str], required: Iterable[str] = ()) -> pd.DataFrame:
+    """按表结构转换列类型；缺少 required 中的列时报错，表结构中的其他列缺失时忽略"""
+    missing = [column for column in required if column not in df.columns]
+    if missing:
+        raise ValueError(f"缺少列: {', '.join(missing)}")
+    for column, dtype in schema.items():
+        if column not in df.columns or dtype in ('str', 'object'):
+            continue
+        values = pd.to_numeric(df[column].str.strip(), errors='coerce')
+        if dtype == 'Int64':
+            values = values.where(values % 1 == 0)  # 非整数视为缺失
+        df[column] = values.astype(dtype)
+    return df
+
+
+def read_table(path, schema: Dict[str, str] = None, required: Iterable[str] = (), cache_dir=CACHE_DIR) -> pd.DataFrame:
+    """
+    读取 CSV：列名去除首尾空白，所有单元格先按原文读入（空单元格为空字符串），
+    再按 schema 转换类型；不指定 schema 时全部保留原文。
+    来源信息（文件名、内容哈希、编码、是否来自缓存）记录在 df.attrs['source']
+    """
+    def parse(text):
+        df = pd.read_csv(io.StringIO(text), dtype=str, keep_default_na=False)
+        df.columns = [str(column).strip() for column in df.columns]
+        return apply_schema(df, schema or {}, required)
+
+    df, source = load_cached(path, schema_key(schema), parse, cache_dir)
+    df.attrs['source'] = source
+    return df
+
+
+def read_json(path, cache_dir=CACHE_DIR):
+    """读取 JSON 文件（自动判断编码），解析结果按内容哈希缓存"""
+    return load_cached(path, 'json', json.loads, cache_dir)[0]
+
+
+def load_garden_list(path=GARDEN_LIST_CSV, cache_dir=CACHE_DIR) -> pd.DataFrame:
+    """读取园林名录并按 GARDEN_LIST_SCHEMA 转换类型"""
+    return read_table(path, GARDEN_LIST_SCHEMA, GARDEN_LIST_REQUIRED, cache_dir)
+
+
+def load_district_stats(path=DISTRICT_STATS_CSV, cache_dir=CACHE_DIR) -> pd.DataFrame:
+    """读取区县统计表并按 DISTRICT_STATS_SCHEMA 转换类型"""
+    return read_table(path, DISTRICT_STATS_SCHEMA, DISTRICT_STATS_REQUIRED, cache_dir)
+
+
+def districts_frame(geojson: dict) -> pd.DataFrame:
+    """把区县边界 FeatureCollection 展开为 DISTRICTS_SCHEMA 的各列"""
+    rows = []
+    for feature in geojson['features']:
+        properties = feature.get('properties') or {}
+        center = properties.get('center') or [None, None]
+        rows.append([properties.get('adcode'), str(properties.get('name', '')).strip(),
+                     center[0], center[1], feature['geometry']])
+    df = pd.DataFrame(rows, columns=list(DISTRICTS_SCHEMA))
+    return df.astype({column: dtype for column, dtype in DISTRICTS_SCHEMA.items() if dtype != 'str'})
+
+
+def load_districts(path=DISTRICTS_GEOJSON, cache_dir=CACHE_DIR) -> pd.DataFrame:
+    """读取区县边界 GeoJSON，每个区县一行"""
+    df, source = load_cached(path, 'districts', lambda text: districts_frame(json.loads(text)), cache_dir)
+    df.attrs['source'] = source
+    return df
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+把区县边界 GeoJSON 转换为多级简化的共享弧段拓扑（TopoJSON）
+
+1. 坐标量化：按全部坐标的外包框把经纬度映射到 quantization x quantization 的整数网格
+2. 共享弧段：相邻区县的公共边界只存一次，在节点（与两个以上点相连的点）处切分环，
+   相同的弧段（含反向）合并，几何体以弧段编号引用（~i 表示反向使用第 i 段）
+3. 简化：对每条弧段计算 Visvalingam 有效面积，弧段端点固定不动，
+   公共边界对两侧区县只简化一次，相邻区县之间不会出现缝隙或重叠。
+   简化后如弧段之间出现交叉或环退化，则逐个恢复相关弧段被移除的顶点，直至拓扑有效
+4. 按保留比例输出多个层级，弧段坐标做差分编码
+
+输出（默认 public/dataset/topology/）：
+    suzhou_districts.low.json      # 各层级的 TopoJSON
+    suzhou_districts.medium.json
+    suzhou_districts.high.json     # 保留全部顶点（仅量化）
+    report.json                    # 各层级的顶点数、弧段数和文件大小
+
+用法：
+    python district_topology.py
+    python district_topology.py --levels low:0.1,medium:0.3,high:1 --quantization 100000
+"""
+
+import sys
+import gzip
+import json
+import heapq
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from dataset_io import DISTRICTS_GEOJSON, PUBLIC_DATASET_DIR, decode_bytes
+
+DEFAULT_INPUT = DISTRICTS_GEOJSON
+DEFAULT_OUTPUT_DIR = PUBLIC_DATASET_DIR / 'topology'
+DEFAULT_LEVELS = 'low:0.1,medium:0.3,high:1'
+DEFAULT_QUANTIZATION = 100000
+
+OBJECT_NAME = 'districts'
+REPORT_NAME = 'report.json'
+
+Point = Tuple[int, int]
+
+
+# ==================== 量化与弧段切分 ====================
+
+def iter_polygons(geometry):
+    """统一按多边形列表返回（Polygon 视为只有一个多边形的 MultiPolygon）"""
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    raise ValueError(f"不支持的几何类型: {geometry['type']}")
+
+
+def quantize_features(features, quantization: int):
+    """
+    量化全部坐标，返回 (transform, 各要素的多边形环列表)
+    环为不闭合的整数点列表，已去掉量化后重复的相邻点
+    """
+    coords = np.array([coord[:2] for feature in features
+                       for polygon in iter_polygons(feature['geometry'])
+                       for ring in polygon for coord in ring], dtype=np.float64)
+    x0, y0 = coords.min(axis=0)
+    x1, y1 = coords.max(axis=0)
+    kx = (quantization - 1) / (x1 - x0) if x1 > x0 else 1.0
+    ky = (quantization - 1) / (y1 - y0) if y1 > y0 else 1.0
+    transform = {'scale': [1 / kx, 1 / ky], 'translate': [float(x0), float(y0)]}
+
+    shapes = []
+    for feature in features:
+        polygons = []
+        for polygon in iter_polygons(feature['geometry']):
+            rings = []
+            for ring in polygon:
+                ring = np.asarray(ring, dtype=np.float64)[:, :2]
+                points = np.column_stack([np.round((ring[:, 0] - x0) * kx),
+                                          np.round((ring[:, 1] - y0) * ky)]).astype(np.int64)
+                deduped = [tuple(points[0])]
+                for point in map(tuple, points[1:]):
+                    if point != deduped[-1]:
+                        deduped.append(point)
+                if len(deduped) > 1 and deduped[0] == deduped[-1]:
+                    deduped.pop()
+                if len(deduped) >= 3:
+                    rings.append([(int(x), int(y)) for x, y in deduped])
+            if rings:
+                polygons.append(rings)
+        shapes.append(polygons)
+    return transform, shapes
+
+
+def find_junctions(shapes) -> set:
+    """节点：相邻点不恰好为两个的点（公共边界的起止点、三个及以上区县的交汇点）"""
+    neighbours: Dict[Point, set] = {}
+    for polygons in shapes:
+        for rings in polygons:
+            for ring in rings:
+                for i, point in enumerate(ring):
+                    linked = neighbours.setdefault(point, set())
+                    linked.add(ring[i - 1])
+                    linked.add(ring[(i + 1) % len(ring)])
+    return {point for point, linked in neighbours.items() if len(linked) != 2}
+
+
+def cut_ring(ring: List[Point], junctions: set) -> List[List[Point]]:
+    """在节点处把环切分为弧段（首尾为节点）；没有节点的环从最小点起作为一条闭合弧段"""
+    cuts = [i for i, point in enumerate(ring) if point in junctions]
+    if not cuts:
+        start = ring.index(min(ring))
+        rotated = ring[start:] + ring[:start]
+        return [rotated + [rotated[0]]]
+
+    rotated = ring[cuts[0]:] + ring[:cuts[0]]
+    cuts = [i - cuts[0] for i in cuts] + [len(ring)]
+    rotated.append(rotated[0])
+    return [rotated[a:b + 1] for a, b in zip(cuts[:-1], cuts[1:])]
+
+
+class ArcIndex:
+    """弧段去重：相同或反向相同的弧段只保存一次"""
+
+    def __init__(self):
+        self.arcs: List[List[Point]] = []
+        self.lookup: Dict[tuple, int] = {}
+
+    def add(self, arc: List[Point]) -> int:
+        key = tuple(arc)
+        if key in self.lookup:
+            return self.lookup[key]
+        reversed_key = key[::-1]
+        if reversed_key in self.lookup:
+            return ~self.lookup[reversed_key]
+        self.lookup[key] = len(self.arcs)
+        self.arcs.append(arc)
+        return len(self.arcs) - 1
+
+
+def build_arcs(shapes):
+    """返回 (弧段列表, 各要素的多边形 -> 环 -> 弧段编号列表)"""
+    junctions = find_junctions(shapes)
+    index = ArcIndex()
+    references = [[[[index.add(arc) for arc in cut_ring(ring, junctions)] for ring in rings]
+                   for rings in polygons] for polygons in shapes]
+    return index.arcs, references
+
+
+# ==================== Visvalingam 简化 ====================
+
+def triangle_area(a, b, c) -> float:
+    return abs((b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])) / 2
+
+
+def visvalingam_weights(arc: List[Point]) -> np.ndarray:
+    """
+    每个顶点被 Visvalingam 算法移除时的有效面积（端点为无穷大）
+    移除顺序中面积不会小于之前移除的点，保留“面积不小于阈值”的点即为该阈值下的简化结果
+    """
+    n = len(arc)
+    weights = np.full(n, np.inf)
+    if n <= 2:
+        return weights
+
+    prev = list(range(-1, n - 1))
+    nxt = list(range(1, n + 1))
+    version = [0] * n
+    heap = [(triangle_area(arc[i - 1], arc[i], arc[i + 1]), i, 0) for i in range(1, n - 1)]
+    heapq.heapify(heap)
+
+    max_area = 0.0
+    while heap:
+        area, i, v = heapq.heappop(heap)
+        if v != version[i]:
+            continue
+        max_area = max(max_area, area)
+        weights[i] = max_area
+        p, q = prev[i], nxt[i]
+        nxt[p], prev[q] = q, p
+        for j in (p, q):
+            if 0 < j < n - 1:
+                version[j] += 1
+                heapq.heappush(heap, (triangle_area(arc[prev[j]], arc[j], arc[nxt[j]]), j, version[j]))
+    return weights
+
+
+def level_threshold(weights: List[np.ndarray], retain: float) -> float:
+    """保留约 retain 比例的内部顶点所需的面积阈值"""
+    interior = np.concatenate([w[1:-1] for w in weights if len(w) > 2] or [np.empty(0)])
+    if retain >= 1 or len(interior) == 0:
+        return 0.0
+    keep = int(round(len(interior) * retain))
+    if keep <= 0:
+        return float('inf')
+    return float(np.sort(interior)[::-1][keep - 1])
+
+
+# ==================== 拓扑检查 ====================
+
+def _orientation(ax, ay, bx, by, cx, cy):
+    return np.sign((bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+
+
+def crossing_arcs(arcs: List[np.ndarray]) -> set:
+    """
+    返回与其他线段相交（不含共享端点的相接）的弧段编号
+    线段按 x 最小值排序后，每条线段只与 x 区间重叠的线段做向量化相交判断
+    """
+    segments = []
+    for arc_id, points in enumerate(arcs):
+        if len(points) >= 2:
+            ids = np.full(len(points) - 1, arc_id)
+            segments.append(np.column_stack([points[:-1], points[1:], ids]))
+    if not segments:
+        return set()
+    seg = np.concatenate(segments).astype(np.int64)
+    xmin = np.minimum(seg[:, 0], seg[:, 2])
+    order = np.argsort(xmin, kind='stable')
+    seg, xmin = seg[order], xmin[order]
+    xmax = np.maximum(seg[:, 0], seg[:, 2])
+    ymin = np.minimum(seg[:, 1], seg[:, 3])
+    ymax = np.maximum(seg[:, 1], seg[:, 3])
+
+    bad = set()
+    for i in range(len(seg)):
+        end = np.searchsorted(xmin, xmax[i], side='right')
+        j = np.arange(i + 1, end)
+        j = j[(ymin[j] <= ymax[i]) & (ymax[j] >= ymin[i])]
+        if len(j) == 0:
+            continue
+        ax, ay, bx, by = seg[i, :4]
+        cx, cy, dx, dy = seg[j, 0], seg[j, 1], seg[j, 2], seg[j, 3]
+        # 共享端点的线段（同一弧段的相邻线段、在节点相接的弧段）不算交叉
+        shared = (((cx == ax) & (cy == ay)) | ((cx == bx) & (cy == by))
+                  | ((dx == ax) & (dy == ay)) | ((dx == bx) & (dy == by)))
+        o1 = _orientation(ax, ay, bx, by, cx, cy)
+        o2 = _orientation(ax, ay, bx, by, dx, dy)
+        o3 = _orientation(cx, cy, dx, dy, ax, ay)
+        o4 = _orientation(cx, cy, dx, dy, bx, by)
+        hit = (o1 * o2 <= 0) & (o3 * o4 <= 0) & ~shared
+        # 共线但不重叠的线段方向积为 0，需再确认投影区间重叠
+        collinear = (o1 == 0) & (o2 == 0)
+        if collinear.any():
+            overlap_x = (np.maximum(cx, dx) >= min(ax, bx)) & (np.minimum(cx, dx) <= max(ax, bx))
+            overlap_y = (np.maximum(cy, dy) >= min(ay, by)) & (np.minimum(cy, dy) <= max(ay, by))
+            hit &= ~collinear | (overlap_x & overlap_y)
+        if hit.any():
+            bad.add(int(seg[i, 4]))
+            bad.update(int(k) for k in seg[j[hit], 4])
+    return bad
+
+
+def ring_points(ring_refs: List[int], arcs: List[np.ndarray]) -> np.ndarray:
+    """按弧段编号拼接出闭合环的坐标"""
+    parts = []
+    for k, ref in enumerate(ring_refs):
+        points = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+        parts.append(points if k == 0 else points[1:])
+    return np.concatenate(parts)
+
+
+def ring_area(points: np.ndarray) -> float:
+    x, y = points[:, 0].astype(np.float64), points[:, 1].astype(np.float64)
+    return float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])) / 2
+
+
+def degenerate_arcs(references, arcs: List[np.ndarray]) -> set:
+    """简化后少于 3 个不同顶点或面积为 0 的环所使用的弧段"""
+    bad = set()
+    for polygons in references:
+        for rings in polygons:
+            for ring_refs in rings:
+                points = ring_points(ring_refs, arcs)
+                if len(points) < 4 or ring_area(points) == 0:
+                    bad.update(ref if ref >= 0 else ~ref for ref in ring_refs)
+    return bad
+
+
+def simplify(arcs, weights, references, threshold: float):
+    """
+    按面积阈值简化全部弧段，并修复交叉和退化的环：
+    每轮为出问题的弧段恢复被移除的顶点中面积最大的一个，直到拓扑有效
+    返回 (简化后的弧段坐标, 修复轮数, 被修复的弧段数)
+    """
+    thresholds = np.full(len(arcs), threshold)
+    points = [np.asarray(arc, dtype=np.int64) for arc in arcs]
+    repaired = set()
+    rounds = 0
+    while True:
+        simplified = [p[w >= t] for p, w, t in zip(points, weights, thresholds)]
+        bad = crossing_arcs(simplified) | degenerate_arcs(references, simplified)
+        restorable = {}
+        for arc_id in bad:
+            removed = weights[arc_id][weights[arc_id] < thresholds[arc_id]]
+            if len(removed):
+                restorable[arc_id] = removed.max()
+        if not restorable:
+            return simplified, rounds, len(repaired)
+        rounds += 1
+        for arc_id, weight in restorable.items():
+            thresholds[arc_id] = weight
+            repaired.add(arc_id)
+
+
+# ==================== 输出 ====================
+
+def encode_arc(points: np.ndarray) -> list:
+    """差分编码：第一个点为绝对坐标，其余为与前一点的差"""
+    deltas = np.diff(points, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+    return deltas.tolist()
+
+
+def build_topology(features, transform, references, arcs: List[np.ndarray]) -> dict:
+    geometries = []
+    for feature, polygons in zip(features, references):
+        geometries.append({
+            'type': 'MultiPolygon',
+            'arcs': polygons,
+            'properties': feature.get('properties', {})
+        })
+    return {
+        'type': 'Topology',
+        'transform': transform,
+        'objects': {OBJECT_NAME: {'type': 'GeometryCollection', 'geometries': geometries}},
+        'arcs': [encode_arc(points) for points in arcs]
+    }
+
+
+def count_vertices(references, arcs: List[np.ndarray]) -> int:
+    """还原为 GeoJSON 后的顶点数（每个环闭合，首尾点各计一次）"""
+    return sum(len(ring_points(ring_refs, arcs))
+               for polygons in references for rings in polygons for ring_refs in rings)
+
+
+def dump_json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def parse_levels(text: str):
+    """解析 'low:0.1,medium:0.3,high:1' 形式的层级定义"""
+    levels = []
+    for item in text.split(','):
+        name, _, retain = item.partition(':')
+        retain = float(retain)
+        if not name or not 0 < retain <= 1:
+            raise ValueError(f"无效的层级定义: {item}")
+        levels.append((name.strip(), retain))
+    return levels
+
+
+def export_topology(input_path: Path, output_dir: Path, levels, quantization: int) -> dict:
+    """生成各层级的 TopoJSON，返回报告"""
+    source_bytes = input_path.read_bytes()
+    geojson = json.loads(decode_bytes(source_bytes)[0])
+    features = geojson['features']
+
+    transform, shapes = quantize_features(features, quantization)
+    arcs, references = build_arcs(shapes)
+    weights = [visvalingam_weights(arc) for arc in arcs]
+    shared = sum(1 for polygons in references for rings in polygons
+                 for ring_refs in rings for ref in ring_refs if ref < 0)
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'source': {
+            'file': input_path.name,
+            'bytes': len(source_bytes),
+            'gzip_bytes': len(gzip.compress(source_bytes, compresslevel=9)),
+            'minified_bytes': len(dump_json(geojson)),
+            'vertices': sum(len(ring) for feature in features
+                            for polygon in iter_polygons(feature['geometry']) for ring in polygon)
+        },
+        'quantization': quantization,
+        'arcs': len(arcs),
+        'shared_arc_references': shared,
+        'levels': []
+    }
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, retain in levels:
+        threshold = level_threshold(weights, retain)
+        simplified, rounds, repaired = simplify(arcs, weights, references, threshold)
+        data = dump_json(build_topology(features, transform, references, simplified))
+        filename = f"{input_path.stem}.{name}.json"
+        (output_dir / filename).write_bytes(data)
+        report['levels'].append({
+            'name': name,
+            'file': filename,
+            'retain': retain,
+            'vertices': count_vertices(references, simplified),
+            'arc_points': int(sum(len(points) for points in simplified)),
+            'bytes': len(data),
+            'gzip_bytes': len(gzip.compress(data, compresslevel=9)),
+            'repair_rounds': rounds,
+            'repaired_arcs': repaired
+        })
+
+    with open(output_dir / REPORT_NAME, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+def print_report(report: dict):
+    source = report['source']
+    print(f"   量化网格: {report['quantization']}，弧段: {report['arcs']}，"
+          f"反向引用的共享弧段: {report['shared_arc_references']}")
+    print(f"   {'层级':<10}{'顶点数':>8}{'字节':>10}{'gzip':>10}{'修复轮数':>8}")
+    print(f"   {'原始':<10}{source['vertices']:>8}{source['bytes']:>10}{source['gzip_bytes']:>10}{'-':>8}")
+    for level in report['levels']:
+        print(f"   {level['name']:<10}{level['vertices']:>8}{level['bytes']:>10}"
+              f"{level['gzip_bytes']:>10}{level['repair_rounds']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把区县边界 GeoJSON 转换为多级简化的共享弧段拓扑')
+    parser.add_argument('--input', type=Path, default=DEFAULT_INPUT, help='区县边界 GeoJSON')
+    parser.add_argument('--output-dir', type=Path, default=DEFAULT_OUTPUT_DIR, help='输出目录')
+    parser.add_argument('--levels', default=DEFAULT_LEVELS,
+                        help=f'层级名称与保留的顶点比例，逗号分隔（默认: {DEFAULT_LEVELS}）')
+    parser.add_argument('--quantization', type=int, default=DEFAULT_QUANTIZATION,
+                        help=f'坐标量化网格大小（默认: {DEFAULT_QUANTIZATION}）')
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"❌ 文件不存在: {args.input}")
+        return 1
+    try:
+        levels = parse_levels(args.levels)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    report = export_topology(args.input, args.output_dir, levels, args.quantization)
+    print(f"✅ 已生成 {len(levels)} 个层级到 {args.output_dir}")
+    print_report(report)
+    print(f"   报告: {args.output_dir / REPORT_NAME}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+把园林名录导出为列式二进制数据包
+
+清洗规则与 build_aggregates.py（即 dataLoader.ts）相同，按 GardenData 字段逐列存储：
+- 文本列（区县、权属性质、开放情况、文保单位级别、管理单位等）做字典编码：
+  字典写入清单，每行只存 Uint8/Uint16 编码
+- 经度、纬度、面积存为 Float64 数组，世界遗产存为 Uint8（0/1）
+- 长文本“描述”单独写入 descriptions.json，前端需要时再请求
+
+输出目录（默认 public/dataset/columnar/）：
+    manifest.json       # 行数、各列的类型/字典/在 gardens.bin 中的字节偏移
+    gardens.bin         # 所有列的二进制数据（小端序，每列按 8 字节对齐）
+    descriptions.json   # 按行排列的描述文本
+
+前端取回 gardens.bin 后直接用 new Float64Array(buffer, offset, rows) 等视图读取，不需要逐行解析文本。
+
+用法：
+    python export_columnar.py
+    python export_columnar.py --input x.csv --output-dir public/dataset/columnar
+"""
+
+import sys
+import gzip
+import json
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from build_aggregates import DEFAULT_INPUT, load_garden_data
+from dataset_io import PUBLIC_DATASET_DIR, sha256_file
+
+DEFAULT_OUTPUT_DIR = PUBLIC_DATASET_DIR / 'columnar'
+
+MANIFEST_NAME = 'manifest.json'
+DATA_NAME = 'gardens.bin'
+DESCRIPTIONS_NAME = 'descriptions.json'
+
+# 与 src/services/dataLoader.ts 中的 COLUMNAR_VERSION 一致
+COLUMNAR_VERSION = 1
+
+# 列对齐字节数（Float64Array 要求偏移为 8 的倍数）
+ALIGNMENT = 8
+
+# 字典编码的文本列（GardenData 字段名）
+DICTIONARY_COLUMNS = [
+    'publicationBatch',
+    'name',
+    'district',
+    'address',
+    'constructionPeriod',
+    'ownershipType',
+    'managementUnit',
+    'protectionStatus',
+    'openStatus',
+    'currentUse',
+    'heritageLevel',
+    'eraCategory',
+    'areaRange',
+]
+FLOAT_COLUMNS = ['area', 'longitude', 'latitude']
+BOOL_COLUMNS = ['isWorldHeritage']
+
+
+def code_dtype(size: int):
+    """按字典大小选择编码的整数类型"""
+    if size <= 0xFF:
+        return np.uint8, 'uint8'
+    if size <= 0xFFFF:
+        return np.uint16, 'uint16'
+    return np.uint32, 'uint32'
+
+
+def encode_columns(df: pd.DataFrame):
+    """
+    把各列编码为二进制数组，返回 (列描述列表, 数组列表)
+    Float64 列排在最前面，其余列依次追加，每列起始偏移按 ALIGNMENT 对齐
+    """
+    columns, arrays = [], []
+    for name in FLOAT_COLUMNS:
+        columns.append({'name': name, 'type': 'float64'})
+        arrays.append(df[name].to_numpy(dtype='<f8'))
+    for name in BOOL_COLUMNS:
+        columns.append({'name': name, 'type': 'bool'})
+        arrays.append(df[name].to_numpy(dtype=np.uint8))
+    for name in DICTIONARY_COLUMNS:
+        codes, dictionary = pd.factorize(df[name], sort=False)
+        dtype, type_name = code_dtype(len(dictionary))
+        columns.append({'name': name, 'type': 'dictionary', 'index': type_name, 'dictionary': dictionary.tolist()})
+        arrays.append(codes.astype(dtype).astype(np.dtype(dtype).newbyteorder('<')))
+    return columns, arrays
+
+
+def pack(columns, arrays) -> bytes:
+    """按对齐规则拼接数组，把偏移和字节数写回列描述"""
+    chunks, offset = [], 0
+    for column, array in zip(columns, arrays):
+        padding = -offset % ALIGNMENT
+        if padding:
+            chunks.append(b'\0' * padding)
+            offset += padding
+        data = array.tobytes()
+        column['offset'] = offset
+        column['byteLength'] = len(data)
+        chunks.append(data)
+        offset += len(data)
+    return b''.join(chunks)
+
+
+def decode(manifest: dict, data: bytes) -> pd.DataFrame:
+    """按清单读取二进制数据（与前端的读取方式相同），用于导出后校验"""
+    rows = manifest['rows']
+    frame = {}
+    for column in manifest['columns']:
+        if column['type'] == 'float64':
+            frame[column['name']] = np.frombuffer(data, dtype='<f8', count=rows, offset=column['offset'])
+        elif column['type'] == 'bool':
+            frame[column['name']] = np.frombuffer(data, dtype=np.uint8, count=rows, offset=column['offset']).astype(bool)
+        else:
+            codes = np.frombuffer(data, dtype=np.dtype(column['index']).newbyteorder('<'),
+                                  count=rows, offset=column['offset'])
+            frame[column['name']] = np.asarray(column['dictionary'], dtype=object)[codes]
+    return pd.DataFrame(frame)
+
+
+def gzip_size(data: bytes) -> int:
+    return len(gzip.compress(data, compresslevel=9))
+
+
+def export_columnar(csv_path: Path, output_dir: Path) -> dict:
+    """导出数据包并校验，返回各文件大小统计"""
+    df = load_garden_data(csv_path)
+    columns, arrays = encode_columns(df)
+    data = pack(columns, arrays)
+
+    manifest = {
+        'version': COLUMNAR_VERSION,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'source': {
+            'file': csv_path.name,
+            'sha256': sha256_file(csv_path),
+            'rows': len(df)
+        },
+        'rows': len(df),
+        'endianness': 'little',
+        'data': DATA_NAME,
+        'descriptions': DESCRIPTIONS_NAME,
+        'columns': columns
+    }
+
+    decoded = decode(manifest, data)
+    for name in decoded.columns:
+        if not (decoded[name].to_numpy() == df[name].to_numpy()).all():
+            raise ValueError(f"列 {name} 解码结果与原数据不一致")
+
+    manifest_bytes = json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    descriptions_bytes = json.dumps(df['description'].tolist(), ensure_ascii=False,
+                                    separators=(',', ':')).encode('utf-8')
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / DATA_NAME).write_bytes(data)
+    (output_dir / DESCRIPTIONS_NAME).write_bytes(descriptions_bytes)
+    # 清单最后写入：前端读到清单时数据文件已经就绪
+    (output_dir / MANIFEST_NAME).write_bytes(manifest_bytes)
+
+    csv_bytes = csv_path.read_bytes()
+    return {
+        'rows': len(df),
+        'csv': (len(csv_bytes), gzip_size(csv_bytes)),
+        'manifest': (len(manifest_bytes), gzip_size(manifest_bytes)),
+        'data': (len(data), gzip_size(data)),
+        'descriptions': (len(descriptions_bytes), gzip_size(descriptions_bytes)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导出园林名录的列式二进制数据包')
+    parser.add_argument('--input', type=Path, default=DEFAULT_INPUT, help='园林名录 CSV')
+    parser.add_argument('--output-dir', type=Path, default=DEFAULT_OUTPUT_DIR, help='输出目录')
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"❌ 文件不存在: {args.input}")
+        return 1
+
+    stats = export_columnar(args.input, args.output_dir)
+    critical = tuple(a + b for a, b in zip(stats['manifest'], stats['data']))
+
+    print(f"✅ 已导出 {stats['rows']} 条园林数据到 {args.output_dir}")
+    print(f"   {'文件':<24}{'字节':>10}{'gzip':>10}")
+    for label, (raw, packed) in [
+        (args.input.name, stats['csv']),
+        (MANIFEST_NAME, stats['manifest']),
+        (DATA_NAME, stats['data']),
+        (f"{MANIFEST_NAME} + {DATA_NAME}", critical),
+        (f"{DESCRIPTIONS_NAME}（按需加载）", stats['descriptions']),
+    ]:
+        print(f"   {label:<24}{raw:>10}{packed:>10}")
+    print(f"   首屏数据为 CSV 的 {critical[0] / stats['csv'][0]:.1%}（gzip 后 {critical[1] / stats['csv'][1]:.1%}）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+从归档的 content_html 中抽取园林字段记录
+
+每种表格结构（structure_id）第一次出现时编译一个抽取器：根据该表格中的字段标签，
+预先计算“字段 -> 值单元格坐标”的映射。之后同一结构的表格只核对编译时各字段标签
+所在的单元格，标签一致时直接按坐标取值；不一致（同一布局换用了其他标签）时
+按当前表格重新编译该结构的抽取器。全部对象在一次流式遍历中处理完毕，输出
+JSON Lines 或与 SuzhouGardenListFull.csv 列顺序一致的 CSV。
+
+使用方法：
+    python scripts/extract_table_records.py [--input archived/ylml_details.json]
+        [--output garden_records.jsonl] [--format jsonl|csv]
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+
+from analyze_table_structure import PARSERS, build_grid, create_structure_id, extract_tables, iter_items
+
+
+# 与 public/dataset/SuzhouGardenListFull.csv 一致的列顺序
+CSV_COLUMNS = [
+    '公布批次', '名称', '区县', '地址', '建造年代', '面积（㎡）', '权属性质', '管理单位',
+    '保护状况', '开放情况', '当前用途', '描述', '经度', '纬度', '文保单位级别', '世界遗产'
+]
+
+# 字段标签别名（归一化后的单元格文本 -> 标准列名）
+LABEL_ALIASES = {
+    '公布批次': ['公布批次', '批次'],
+    '名称': ['名称', '园林名称'],
+    '区县': ['区县', '所在区县', '所属区县', '行政区'],
+    '地址': ['地址', '详细地址', '园林地址'],
+    '建造年代': ['建造年代', '始建年代', '年代'],
+    '面积（㎡）': ['面积', '面积（㎡）', '面积(㎡)', '面积（平方米）', '占地面积'],
+    '权属性质': ['权属性质', '权属'],
+    '管理单位': ['管理单位'],
+    '保护状况': ['保护状况', '保存状况'],
+    '开放情况': ['开放情况', '是否开放'],
+    '当前用途': ['当前用途', '现状用途', '用途'],
+    '描述': ['描述', '简介', '园林简介', '历史沿革'],
+    '经度': ['经度'],
+    '纬度': ['纬度'],
+    '文保单位级别': ['文保单位级别', '文物保护级别', '保护级别'],
+    '世界遗产': ['世界遗产'],
+}
+
+# 需要转换为数值的字段
+NUMERIC_FIELDS = {'公布批次': int, '面积（㎡）': float, '经度': float, '纬度': float}
+
+_LABEL_INDEX = {alias: field for field, aliases in LABEL_ALIASES.items() for alias in aliases}
+_LABEL_STRIP = re.compile(r'[\s:：]+')
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+# 千分位分隔符：前面是数字、后面恰好三位数字（如 52,000、1，234,567）
+_THOUSANDS = re.compile(r'(?<=\d)[,，](?=\d{3}(?!\d))')
+
+
+def normalize_label(text):
+    """去除空白和冒号后的标签文本"""
+    return _LABEL_STRIP.sub('', text)
+
+
+def coerce_value(field, text):
+    """按字段类型转换单元格文本；数值字段去掉千分位分隔符后取第一个数字，无法转换时为 None"""
+    if field not in NUMERIC_FIELDS:
+        return text
+    match = _NUMBER.search(_THOUSANDS.sub('', text))
+    if not match:
+        return None
+    value = float(match.group())
+    return int(value) if NUMERIC_FIELDS[field] is int else value
+
+
+class TableExtractor:
+    """单个表格结构的抽取器
+
+    field_map: 字段 -> 值单元格 (行号, 行内单元格序号)
+    label_map: 字段 -> 编译时该字段标签所在的单元格，用于核对同一结构的其他表格
+    """
+
+    def __init__(self, structure_id, field_map, label_map):
+        self.structure_id = structure_id
+        self.field_map = field_map
+        self.label_map = label_map
+
+    @classmethod
+    def compile(cls, structure_id, rows, layout):
+        """根据样例表格中的字段标签计算值单元格坐标
+
+        值单元格取标签右侧相邻的单元格；若右侧没有非标签单元格，则取正下方
+        （起始列相同）的单元格。
+        """
+        # 起始坐标 -> (行号, 行内序号)，用于查找正下方的单元格
+        anchors = {}
+        for r, row_layout in enumerate(layout):
+            for i, (c, _, _) in enumerate(row_layout):
+                anchors[(r, c)] = (r, i)
+
+        def label_of(r, i):
+            return _LABEL_INDEX.get(normalize_label(rows[r][i][2]))
+
+        field_map = {}
+        label_map = {}
+        for r, row_layout in enumerate(layout):
+            for i, (c, rowspan, _) in enumerate(row_layout):
+                field = label_of(r, i)
+                if field is None or field in field_map:
+                    continue
+                if i + 1 < len(row_layout) and label_of(r, i + 1) is None:
+                    field_map[field] = (r, i + 1)
+                elif (r + rowspan, c) in anchors and label_of(*anchors[(r + rowspan, c)]) is None:
+                    field_map[field] = anchors[(r + rowspan, c)]
+                else:
+                    continue
+                label_map[field] = (r, i)
+        return cls(structure_id, field_map, label_map)
+
+    def matches(self, rows):
+        """同一结构的表格在编译时的标签坐标上是否仍是相同的字段标签"""
+        return all(_LABEL_INDEX.get(normalize_label(rows[r][i][2])) == field
+                   for field, (r, i) in self.label_map.items())
+
+    def extract(self, rows):
+        """按预先计算的坐标取出字段值"""
+        return {field: coerce_value(field, rows[r][i][2]) for field, (r, i) in self.field_map.items()}
+
+
+def table_structure_id(rows):
+    """只计算结构ID所需的布局部分，不做类型分析"""
+    layout, width = build_grid(rows)
+    structure = {'row_count': len(rows), 'col_count': width, 'layout': layout}
+    return create_structure_id(structure), layout
+
+
+def extract_records(items, parser='lxml-native', stats=None):
+    """逐个对象抽取记录；同一对象的多个表格合并为一条记录（先出现的字段优先）"""
+    extractors = {}
+    if stats is None:
+        stats = {}
+    stats.update({'items': 0, 'tables': 0, 'records': 0, 'extractors': 0, 'unmatched_tables': 0})
+
+    for item in items:
+        stats['items'] += 1
+        if not item.get('content_html'):
+            continue
+
+        record = {}
+        for rows in extract_tables(item['content_html'], parser):
+            if not rows:
+                continue
+            stats['tables'] += 1
+            structure_id, layout = table_structure_id(rows)
+            extractor = extractors.get(structure_id)
+            if extractor is None or not extractor.matches(rows):
+                # 首次出现，或同一布局的标签位置变了：按当前表格（重新）编译
+                extractor = extractors[structure_id] = TableExtractor.compile(structure_id, rows, layout)
+                stats['extractors'] += 1
+            if not extractor.field_map:
+                stats['unmatched_tables'] += 1
+                continue
+            for field, value in extractor.extract(rows).items():
+                record.setdefault(field, value)
+
+        if record:
+            record.setdefault('名称', item.get('name'))
+            stats['records'] += 1
+            yield record
+
+
+def write_jsonl(records, output_path):
+    """每行写出一条JSON记录"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def write_csv(records, output_path):
+    """按 SuzhouGardenListFull.csv 的列顺序写出CSV，缺失字段留空"""
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='从归档HTML表格中抽取园林字段记录')
+    parser.add_argument('--input', default='archived/ylml_details.json',
+                        help='输入文件（默认: archived/ylml_details.json）')
+    parser.add_argument('--input-format', choices=['auto', 'json', 'jsonl'], default='auto',
+                        help='输入格式（默认按扩展名判断）')
+    parser.add_argument('--output', default='garden_records.jsonl',
+                        help='输出文件（默认: garden_records.jsonl）')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default=None,
+                        help='输出格式（默认按输出文件扩展名判断）')
+    parser.add_argument('--parser', choices=PARSERS, default='lxml-native',
+                        help='表格解析后端（默认 lxml-native）')
+    args = parser.parse_args()
+
+    output_format = args.format or ('csv' if args.output.endswith('.csv') else 'jsonl')
+    writer = write_csv if output_format == 'csv' else write_jsonl
+
+    print(f"正在抽取: {args.input} -> {args.output} ({output_format})")
+    start = time.perf_counter()
+    stats = {}
+    try:
+        items = iter_items(args.input, args.input_format)
+        writer(extract_records(items, args.parser, stats), args.output)
+    except FileNotFoundError:
+        print(f"错误: 找不到文件 {args.input}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    print(f"处理对象: {stats['items']}，表格: {stats['tables']}")
+    print(f"编译抽取器: {stats['extractors']}，无可识别字段的表格: {stats['unmatched_tables']}")
+    print(f"输出记录: {stats['records']}，耗时 {elapsed:.2f} 秒")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+按结构相似度（SSIM）选择JPEG压缩质量
+
+对每张图片在质量区间内二分查找：找出重新编码后与原图亮度通道的SSIM
+仍不低于阈值的最低质量。SSIM用NumPy实现（7x7均匀窗口，积分图求局部均值），
+与 scikit-image 的 structural_similarity 默认参数一致。
+
+用法示例：
+    from image_quality import find_lowest_quality, ssim
+    ssim(gray_a, gray_b)                                   # 平均SSIM
+    result = find_lowest_quality(img, threshold=0.98)
+    # {'quality': 72, 'ssim': 0.9812, 'data': b'...', 'attempts': 6} 或 None（最高质量也达不到阈值）
+"""
+
+import io
+
+import numpy as np
+from PIL import Image
+
+
+def _box_mean(x: np.ndarray, size: int) -> np.ndarray:
+    """size x size 均匀窗口的局部均值（只保留完整窗口，用积分图计算）"""
+    integral = np.pad(x, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    total = (integral[size:, size:] - integral[:-size, size:]
+             - integral[size:, :-size] + integral[:-size, :-size])
+    return total / (size * size)
+
+
+class SSIMReference:
+    """
+    以一张灰度图为参照计算SSIM；参照图的局部均值和方差只计算一次，
+    与多张候选图比较时（如二分查找质量）可以复用
+    """
+
+    def __init__(self, reference: np.ndarray, window: int = 7, data_range: float = 255.0):
+        self.reference = np.asarray(reference, dtype=np.float64)
+        window = min(window, *self.reference.shape)
+        self.window = window - 1 if window % 2 == 0 else window
+        self.c1 = (0.01 * data_range) ** 2
+        self.c2 = (0.03 * data_range) ** 2
+        # 与 scikit-image 一致，使用样本方差
+        n = self.window * self.window
+        self.cov_norm = n / (n - 1) if n > 1 else 1.0
+        self.mu = _box_mean(self.reference, self.window)
+        self.var = self.cov_norm * (_box_mean(self.reference * self.reference, self.window) - self.mu * self.mu)
+
+    def compare(self, image: np.ndarray) -> float:
+        """与参照图的平均SSIM"""
+        image = np.asarray(image, dtype=np.float64)
+        if image.shape != self.reference.shape:
+            raise ValueError(f"图片尺寸不一致: {self.reference.shape} != {image.shape}")
+        mu = _box_mean(image, self.window)
+        var = self.cov_norm * (_box_mean(image * image, self.window) - mu * mu)
+        cov = self.cov_norm * (_box_mean(self.reference * image, self.window) - self.mu * mu)
+
+        numerator = (2 * self.mu * mu + self.c1) * (2 * cov + self.c2)
+        denominator = (self.mu * self.mu + mu * mu + self.c1) * (self.var + var + self.c2)
+        return float((numerator / denominator).mean())
+
+
+def ssim(a: np.ndarray, b: np.ndarray, window: int = 7, data_range: float = 255.0) -> float:
+    """两张同尺寸灰度图的平均SSIM"""
+    return SSIMReference(a, window, data_range).compare(b)
+
+
+def encode_jpeg(img: Image.Image, quality: int, icc_profile: bytes = None) -> bytes:
+    """编码为渐进式JPEG，不写入EXIF等元数据（保留ICC色彩配置）"""
+    buffer = io.BytesIO()
+    options = {'quality': quality, 'optimize': True, 'progressive': True}
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    img.save(buffer, 'JPEG', **options)
+    return buffer.getvalue()
+
+
+def luminance(img: Image.Image) -> np.ndarray:
+    """亮度通道数组"""
+    return np.asarray(img.convert('L'), dtype=np.float64)
+
+
+def find_lowest_quality(img: Image.Image, threshold: float = 0.98, min_quality: int = 40,
+                        max_quality: int = 95, icc_profile: bytes = None):
+    """
+    二分查找SSIM不低于 threshold 的最低JPEG质量
+    img 应为已按EXIF方向旋转的RGB图片；返回 {'quality', 'ssim', 'data', 'attempts'}，
+    最高质量也达不到阈值时返回 None
+    """
+    reference = SSIMReference(luminance(img))
+    attempts = 0
+
+    def trial(quality):
+        # 查找时用普通基线编码即可：渐进式和哈夫曼表优化不影响解码后的像素
+        nonlocal attempts
+        attempts += 1
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', quality=quality)
+        buffer.seek(0)
+        with Image.open(buffer) as decoded:
+            return reference.compare(luminance(decoded))
+
+    score = trial(max_quality)
+    if score < threshold:
+        return None
+    best_quality, best_score = max_quality, score
+
+    low, high = min_quality, max_quality - 1
+    while low <= high:
+        quality = (low + high) // 2
+        score = trial(quality)
+        if score >= threshold:
+            best_quality, best_score = quality, score
+            high = quality - 1
+        else:
+            low = quality + 1
+
+    return {
+        'quality': best_quality,
+        'ssim': round(best_score, 5),
+        'data': encode_jpeg(img, best_quality, icc_profile),
+        'attempts': attempts
+    }
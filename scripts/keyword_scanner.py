@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多关键字单遍扫描（Aho-Corasick自动机）
+由全部关键字一次性构建自动机，对每段文本只扫描一遍即可找出所有关键字的
+全部出现位置（包括相互包含、重叠的关键字），扫描开销与关键字数量无关
+
+用法示例：
+    from keyword_scanner import KeywordAutomaton
+    automaton = KeywordAutomaton({'全国重点文物保护单位': '全国', '文物保护单位': '文物保护单位'})
+    automaton.find_all('1961年列为全国重点文物保护单位')
+    # [(7, '全国重点文物保护单位', '全国'), (11, '文物保护单位', '文物保护单位')]
+"""
+
+from collections import deque
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick自动机
+    keywords 为 {关键字: 附带值} 字典，或关键字序列（附带值即关键字本身）
+    """
+
+    def __init__(self, keywords):
+        if not isinstance(keywords, dict):
+            keywords = {keyword: keyword for keyword in keywords}
+        self.keywords = [keyword for keyword in keywords if keyword]
+        self.values = [keywords[keyword] for keyword in self.keywords]
+
+        # 字典树：goto[状态][字符] -> 下一状态；outputs[状态] 为在该状态结束的关键字编号
+        self.goto = [{}]
+        self.outputs = [[]]
+        for keyword_id, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.outputs.append([])
+                state = next_state
+            self.outputs[state].append(keyword_id)
+
+        # 按广度优先计算失配指针，并把失配状态的输出并入当前状态
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+                queue.append(next_state)
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def iter_matches(self, text):
+        """
+        逐个产出 (起始位置, 关键字, 附带值)，按结束位置先后排列
+        """
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword_id in outputs[state]:
+                keyword = self.keywords[keyword_id]
+                yield end - len(keyword) + 1, keyword, self.values[keyword_id]
+
+    def find_all(self, text):
+        """
+        返回文本中所有关键字出现的列表，按起始位置升序
+        """
+        if not isinstance(text, str):
+            return []
+        return sorted(self.iter_matches(text), key=lambda hit: (hit[0], -len(hit[1])))
+
+    def scan(self, texts):
+        """
+        扫描多段文本，返回与输入等长的命中列表；非字符串（如NaN）的命中为空
+        """
+        return [self.find_all(text) for text in texts]
+
+def resolve_by_precedence(hits, precedence):
+    """
+    按优先级从命中中选出结果：返回 precedence 中最靠前且被命中的附带值，没有则返回 None
+    """
+    found = {value for _, _, value in hits}
+    for value in precedence:
+        if value in found:
+            return value
+    return None
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+基于LLM的HTML表格到JSON批量转换
+
+从归档中逐个取出 content_html 里的表格，异步并发地请求兼容OpenAI Chat
+Completions接口的模型，把表格转换为园林字段记录，并用 jsonschema 校验。
+
+- 并发数有上限（--concurrency），请求速率由令牌桶限制（--rate / --burst）
+- 网络错误、限流、服务端错误及校验失败按指数退避重试
+- 响应按“结构ID + 表格内容哈希”缓存在磁盘上，相同表格不会重复请求；
+  同一批次中并发出现的相同表格也只请求一次
+
+使用方法：
+    python scripts/llm_extract_tables.py [--input archived/ylml_details.json] [--base-url URL]
+
+可以配合本地桩服务器测试（模拟Chat Completions接口，不消耗额度）：
+    python scripts/llm_stub_server.py --port 8765
+    python scripts/llm_extract_tables.py --base-url http://127.0.0.1:8765/v1 --api-key stub
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import jsonschema
+import openai
+from lxml import etree, html as lxml_html
+from openai import AsyncOpenAI
+from tqdm import tqdm
+
+from analyze_table_structure import iter_items, lxml_table_rows
+from extract_table_records import CSV_COLUMNS, NUMERIC_FIELDS, table_structure_id
+
+
+# 模型返回的JSON需要满足的结构：只允许标准列名，值为字符串、数值或null
+RECORD_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        column: {'type': ['number', 'null'] if column in NUMERIC_FIELDS else ['string', 'null']}
+        for column in CSV_COLUMNS
+    },
+    'additionalProperties': False,
+}
+
+SYSTEM_PROMPT = (
+    "你是苏州园林名录的数据抽取助手。用户会给出一个HTML表格，请从中抽取园林信息，"
+    "只输出一个JSON对象，不要输出任何解释。可用字段：" + "、".join(CSV_COLUMNS) + "。"
+    "表格中没有的字段请省略；面积、经度、纬度、公布批次输出为数字，其余字段输出为字符串。"
+)
+
+# 可以重试的错误：网络问题、超时、限流与服务端错误
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class ResponseValidationError(Exception):
+    """模型响应不是合法JSON或不满足 RECORD_SCHEMA"""
+
+
+class TokenBucket:
+    """异步令牌桶：平均每秒 rate 个请求，最多突发 capacity 个"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """取得一个令牌，不足时等待"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ResponseCache:
+    """按“结构ID + 表格内容哈希”保存已校验的模型响应，每条一个JSON文件"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(structure_id, table_html):
+        """缓存键"""
+        content_hash = hashlib.sha256(table_html.encode('utf-8')).hexdigest()[:16]
+        return f"{structure_id}_{content_hash}"
+
+    def get(self, key):
+        """读取缓存，不存在时返回 None"""
+        path = self.cache_dir / f"{key}.json"
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def put(self, key, record):
+        """写入缓存（先写临时文件再改名，避免中断时留下半个文件）"""
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def iter_table_jobs(items):
+    """逐个产出 (对象名, 表格序号, 结构ID, 表格HTML)"""
+    for item in items:
+        if not item.get('content_html'):
+            continue
+        try:
+            document = lxml_html.document_fromstring(item['content_html'])
+        except etree.ParserError:
+            continue
+        for index, table in enumerate(document.iter('table')):
+            rows = lxml_table_rows(table)
+            if not rows:
+                continue
+            structure_id, _ = table_structure_id(rows)
+            table_html = lxml_html.tostring(table, encoding='unicode')
+            yield item['name'], index, structure_id, table_html
+
+
+def parse_response(content):
+    """解析并校验模型输出"""
+    try:
+        record = json.loads(content)
+        jsonschema.validate(record, RECORD_SCHEMA)
+    except (TypeError, json.JSONDecodeError, jsonschema.ValidationError) as e:
+        raise ResponseValidationError(str(e)) from e
+    return record
+
+
+class LLMTableExtractor:
+    """带并发上限、限流、重试和响应缓存的异步抽取客户端"""
+
+    def __init__(self, client, model, cache, concurrency=8, rate=5.0, burst=10,
+                 max_retries=5, backoff=1.0):
+        self.client = client
+        self.model = model
+        self.cache = cache
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._inflight = {}
+        self.stats = {
+            'tables': 0,
+            'requests': 0,
+            'cache_hits': 0,
+            'deduplicated': 0,
+            'retries': 0,
+            'failed': 0,
+        }
+
+    async def request(self, table_html):
+        """请求模型并校验结果，可重试的错误按指数退避（带随机抖动）重试"""
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            self.stats['requests'] += 1
+            try:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {'role': 'system', 'content': SYSTEM_PROMPT},
+                        {'role': 'user', 'content': table_html},
+                    ],
+                    response_format={'type': 'json_object'},
+                    temperature=0,
+                )
+                return parse_response(response.choices[0].message.content)
+            except (*RETRYABLE_ERRORS, ResponseValidationError):
+                if attempt == self.max_retries:
+                    raise
+                self.stats['retries'] += 1
+                await asyncio.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+
+    async def extract(self, structure_id, table_html):
+        """返回表格对应的记录：先查磁盘缓存，再合并同一时刻的相同请求"""
+        key = self.cache.key(structure_id, table_html)
+        record = self.cache.get(key)
+        if record is not None:
+            self.stats['cache_hits'] += 1
+            return record
+
+        if key in self._inflight:
+            self.stats['deduplicated'] += 1
+            return await self._inflight[key]
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            record = await self.request(table_html)
+            self.cache.put(key, record)
+            future.set_result(record)
+            return record
+        except Exception as e:
+            future.set_exception(e)
+            # 标记异常已被取回，避免没有等待者时产生警告
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def run(self, jobs, output_path):
+        """以固定数量的工作协程处理全部表格，结果按完成顺序写入JSON Lines"""
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        progress = tqdm(desc='抽取表格', unit='表')
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            async def worker():
+                while True:
+                    job = await queue.get()
+                    if job is None:
+                        queue.task_done()
+                        return
+                    name, index, structure_id, table_html = job
+                    try:
+                        record = await self.extract(structure_id, table_html)
+                        f.write(json.dumps({
+                            'name': name,
+                            'table_index': index,
+                            'structure_id': structure_id,
+                            'record': record,
+                        }, ensure_ascii=False) + '\n')
+                    except Exception as e:
+                        self.stats['failed'] += 1
+                        tqdm.write(f"抽取失败: {name} 表格{index + 1} - {e}")
+                    finally:
+                        progress.update(1)
+                        queue.task_done()
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            for job in jobs:
+                self.stats['tables'] += 1
+                await queue.put(job)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
+        progress.close()
+        return self.stats
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='使用LLM把归档中的HTML表格批量转换为JSON记录')
+    parser.add_argument('--input', default='archived/ylml_details.json',
+                        help='输入文件（默认: archived/ylml_details.json）')
+    parser.add_argument('--input-format', choices=['auto', 'json', 'jsonl'], default='auto',
+                        help='输入格式（默认按扩展名判断）')
+    parser.add_argument('--output', default='llm_records.jsonl',
+                        help='输出文件（默认: llm_records.jsonl）')
+    parser.add_argument('--cache-dir', default='archived/llm_cache',
+                        help='响应缓存目录（默认: archived/llm_cache）')
+    parser.add_argument('--base-url', default=os.environ.get('OPENAI_BASE_URL'),
+                        help='Chat Completions接口地址（默认读取 OPENAI_BASE_URL）')
+    parser.add_argument('--api-key', default=os.environ.get('OPENAI_API_KEY'),
+                        help='API Key（默认读取 OPENAI_API_KEY）')
+    parser.add_argument('--model', default=os.environ.get('OPENAI_MODEL', 'gpt-4o-mini'),
+                        help='模型名称（默认读取 OPENAI_MODEL，否则 gpt-4o-mini）')
+    parser.add_argument('--concurrency', type=int, default=8, metavar='N',
+                        help='同时进行的请求数上限（默认8）')
+    parser.add_argument('--rate', type=float, default=5.0, metavar='R',
+                        help='平均每秒请求数（默认5）')
+    parser.add_argument('--burst', type=int, default=10, metavar='N',
+                        help='令牌桶容量，即允许的突发请求数（默认10）')
+    parser.add_argument('--max-retries', type=int, default=5, metavar='N',
+                        help='单个表格的最大重试次数（默认5）')
+    parser.add_argument('--timeout', type=float, default=60.0, metavar='S',
+                        help='单次请求超时秒数（默认60）')
+    args = parser.parse_args()
+
+    if not args.api_key:
+        print("错误: 未提供API Key，请设置 OPENAI_API_KEY 或使用 --api-key")
+        sys.exit(1)
+
+    # 重试由本脚本统一控制，关闭客户端自带的重试
+    client = AsyncOpenAI(api_key=args.api_key, base_url=args.base_url,
+                         timeout=args.timeout, max_retries=0)
+    extractor = LLMTableExtractor(
+        client, args.model, ResponseCache(args.cache_dir),
+        concurrency=args.concurrency, rate=args.rate, burst=args.burst,
+        max_retries=args.max_retries
+    )
+
+    print(f"正在处理: {args.input} -> {args.output}")
+    try:
+        jobs = iter_table_jobs(iter_items(args.input, args.input_format))
+        stats = asyncio.run(extractor.run(jobs, args.output))
+    except FileNotFoundError:
+        print(f"错误: 找不到文件 {args.input}")
+        sys.exit(1)
+
+    print(f"表格总数: {stats['tables']}")
+    print(f"缓存命中: {stats['cache_hits']}，合并的重复请求: {stats['deduplicated']}")
+    print(f"实际请求: {stats['requests']}（其中重试 {stats['retries']} 次）")
+    print(f"失败: {stats['failed']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+模拟OpenAI Chat Completions接口的本地桩服务器
+
+用于在不消耗额度的情况下测试 llm_extract_tables.py：收到的最后一条用户
+消息被当作HTML表格，用 extract_table_records 中的坐标抽取器生成确定性的
+JSON回复。可以按比例注入限流/服务端错误和非法JSON，以验证重试逻辑。
+
+使用方法：
+    python scripts/llm_stub_server.py [--port 8765] [--error-rate 0.1] [--invalid-rate 0.05] [--latency 0.2]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lxml import etree, html as lxml_html
+
+from analyze_table_structure import lxml_table_rows
+from extract_table_records import TableExtractor, table_structure_id
+
+
+def table_to_record(table_html):
+    """用坐标抽取器把表格转换为记录，模拟模型输出"""
+    try:
+        table = lxml_html.fragment_fromstring(table_html)
+    except etree.ParserError:
+        return {}
+    rows = lxml_table_rows(table)
+    if not rows:
+        return {}
+    structure_id, layout = table_structure_id(rows)
+    return TableExtractor.compile(structure_id, rows, layout).extract(rows)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """处理 POST /v1/chat/completions"""
+
+    server_version = 'LLMStub/0.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip('/') not in ('/v1/chat/completions', '/chat/completions'):
+            self.send_json(404, {'error': {'message': f'未知路径: {self.path}', 'type': 'invalid_request_error'}})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length))
+            messages = request['messages']
+        except (json.JSONDecodeError, KeyError) as e:
+            self.send_json(400, {'error': {'message': f'请求格式错误: {e}', 'type': 'invalid_request_error'}})
+            return
+
+        with self.server.lock:
+            self.server.request_count += 1
+            roll = self.server.rng.random()
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        # 按比例注入错误：一半返回429限流，一半返回500服务端错误
+        if roll < self.server.error_rate:
+            if roll < self.server.error_rate / 2:
+                self.send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_error'}})
+            else:
+                self.send_json(500, {'error': {'message': 'Internal error', 'type': 'server_error'}})
+            return
+
+        user_messages = [m['content'] for m in messages if m.get('role') == 'user']
+        if roll < self.server.error_rate + self.server.invalid_rate:
+            content = '这不是JSON'
+        else:
+            content = json.dumps(table_to_record(user_messages[-1] if user_messages else ''), ensure_ascii=False)
+
+        prompt_tokens = sum(len(m.get('content', '')) for m in messages)
+        self.send_json(200, {
+            'id': f'chatcmpl-{uuid.uuid4().hex}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'stub'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': len(content),
+                'total_tokens': prompt_tokens + len(content),
+            },
+        })
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='模拟OpenAI Chat Completions接口的本地桩服务器')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址（默认 127.0.0.1）')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口（默认 8765，0 表示由系统分配空闲端口）')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='返回429/500错误的请求比例（默认0）')
+    parser.add_argument('--invalid-rate', type=float, default=0.0,
+                        help='返回非法JSON内容的请求比例（默认0）')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='每个请求的模拟延迟秒数（默认0）')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子（默认0）')
+    parser.add_argument('--verbose', action='store_true', help='打印每个请求的访问日志')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.error_rate = args.error_rate
+    server.invalid_rate = args.invalid_rate
+    server.latency = args.latency
+    server.verbose = args.verbose
+    server.rng = random.Random(args.seed)
+    server.lock = threading.Lock()
+    server.request_count = 0
+
+    host, port = server.server_address[:2]
+    print(f"桩服务器已启动: http://{host}:{port}/v1", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n共收到 {server.request_count} 个请求")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文保单位名称的n-gram倒排索引
+对名录中每个名称（以及括号、顿号分隔出的子名称，如“苏州园林（拙政园、留园）”
+中的“拙政园”“留园”）提取汉字二元组和三元组建立倒排表。
+查询只遍历查询名称的n-gram所对应的倒排表，开销与候选数量相关，与名录规模无关；
+结果按相似度得分排序。query_batch 对一组名称一次性完成倒排表合并、计分和排序
+
+用法示例：
+    from name_index import NameIndex
+    index = NameIndex.from_dataframe(heritage_df)              # 默认使用 名称 列
+    index.query('拙政园', cutoff=0.5)                           # [(位置下标, 匹配的名称, 得分), ...]
+    index.query_batch(['拙政园', '留园'], cutoff=0.5)            # 每个名称一个结果列表
+"""
+
+import re
+from collections import defaultdict
+from itertools import chain
+
+import numpy as np
+
+# 拆分组合名称的分隔符
+ALIAS_SEPARATORS = re.compile(r'[（）()【】\[\]、，,；;/\s]+')
+
+METRICS = ('jaccard', 'containment')
+
+def name_grams(name, sizes=(2, 3)):
+    """
+    提取名称的n-gram集合；名称短于最小n时以整个名称作为唯一元素
+    """
+    grams = set()
+    for n in sizes:
+        grams.update(name[i:i + n] for i in range(len(name) - n + 1))
+    if not grams and name:
+        grams.add(name)
+    return grams
+
+def split_aliases(name):
+    """
+    返回名称本身以及其中由括号、顿号等分隔出的子名称（去重，保持顺序）
+    """
+    aliases = [name]
+    for part in ALIAS_SEPARATORS.split(name):
+        if len(part) >= 2 and part not in aliases:
+            aliases.append(part)
+    return aliases
+
+class NameIndex:
+    """
+    名称n-gram倒排索引
+    positions 为名称在原始输入中的位置下标；空名称不进入索引
+    """
+
+    def __init__(self, names, sizes=(2, 3)):
+        self.sizes = tuple(sizes)
+        self.alias_positions = []
+        self.alias_names = []
+        self.alias_sizes = []
+        self.exact = defaultdict(list)
+        self.postings = defaultdict(list)
+
+        for position, name in enumerate(names):
+            if not isinstance(name, str) or not name.strip():
+                continue
+            for alias in split_aliases(name.strip()):
+                alias_id = len(self.alias_names)
+                grams = name_grams(alias, self.sizes)
+                self.alias_positions.append(position)
+                self.alias_names.append(alias)
+                self.alias_sizes.append(len(grams))
+                self.exact[alias].append(alias_id)
+                for gram in grams:
+                    self.postings[gram].append(alias_id)
+
+    @classmethod
+    def from_dataframe(cls, df, name_col='名称', sizes=(2, 3)):
+        """
+        从DataFrame的名称列构建索引
+        """
+        return cls(df[name_col].tolist(), sizes)
+
+    def __len__(self):
+        return len(self.alias_names)
+
+    def _gram_arrays(self):
+        """倒排表的扁平表示：(n-gram -> 编号, 各编号倒排表的起始偏移, 依次排列的名称编号)"""
+        arrays = getattr(self, '_postings_csr', None)
+        if arrays is None:
+            gram_ids = {gram: i for i, gram in enumerate(self.postings)}
+            lengths = [len(alias_ids) for alias_ids in self.postings.values()]
+            offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+            alias_ids = np.fromiter(chain.from_iterable(self.postings.values()), dtype=np.int64, count=offsets[-1])
+            arrays = self._postings_csr = (gram_ids, offsets, alias_ids)
+        return arrays
+
+    def query(self, name, cutoff=0.5, limit=5, metric='jaccard'):
+        """
+        查询与 name 相似的名称，返回 [(位置下标, 匹配的名称或子名称, 得分), ...]
+        得分降序，每个位置下标只保留得分最高的一项，得分低于 cutoff 的结果被丢弃
+        metric 为 jaccard（交集/并集）或 containment（交集/查询n-gram数）；完全相同的名称得分为1
+        """
+        return self.query_batch([name], cutoff, limit, metric)[0]
+
+    def query_batch(self, names, cutoff=0.5, limit=5, metric='jaccard'):
+        """
+        批量查询，返回与 names 等长的列表，每项与 query 的结果格式相同
+        只有提取n-gram在Python中逐个名称进行；展开倒排表、统计共有n-gram数、计分、
+        每个位置取最高分和排序都对全部名称一次性用数组完成。
+        同一位置得分相同时优先完全相同的名称，其次是先登记的子名称
+        """
+        if metric not in METRICS:
+            raise ValueError(f"未知的相似度度量: {metric}")
+        gram_index, offsets, posting_ids = self._gram_arrays()
+        results = [[] for _ in names]
+
+        query_sizes = np.zeros(len(names))
+        gram_query, gram_ids, exact_query, exact_alias = [], [], [], []
+        for q, name in enumerate(names):
+            if not isinstance(name, str) or not name.strip():
+                continue
+            name = name.strip()
+            grams = name_grams(name, self.sizes)
+            query_sizes[q] = len(grams)
+            for gram in grams:
+                gram_id = gram_index.get(gram)
+                if gram_id is not None:
+                    gram_query.append(q)
+                    gram_ids.append(gram_id)
+            for alias_id in self.exact.get(name, ()):
+                exact_query.append(q)
+                exact_alias.append(alias_id)
+
+        # 展开倒排表为 (查询, 名称) 对，同一对出现的次数即共有的n-gram数
+        gram_ids = np.asarray(gram_ids, dtype=np.int64)
+        lengths = offsets[gram_ids + 1] - offsets[gram_ids]
+        within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        pair_alias = posting_ids[np.repeat(offsets[gram_ids], lengths) + within]
+        pair_query = np.repeat(np.asarray(gram_query, dtype=np.int64), lengths)
+        codes, overlap = np.unique(pair_query * len(self.alias_names) + pair_alias, return_counts=True)
+        query_ids, alias_ids = np.divmod(codes, len(self.alias_names))
+
+        alias_sizes = np.asarray(self.alias_sizes, dtype=np.int64)
+        if metric == 'jaccard':
+            scores = overlap / (query_sizes[query_ids] + alias_sizes[alias_ids] - overlap)
+        else:
+            scores = overlap / query_sizes[query_ids]
+        keep = scores >= cutoff
+
+        # 完全相同的名称得分为1
+        query_ids = np.concatenate([np.asarray(exact_query, dtype=np.int64), query_ids[keep]])
+        alias_ids = np.concatenate([np.asarray(exact_alias, dtype=np.int64), alias_ids[keep]])
+        scores = np.concatenate([np.ones(len(exact_query)), scores[keep]])
+        inexact = np.arange(len(query_ids)) >= len(exact_query)
+        positions = np.asarray(self.alias_positions, dtype=np.int64)[alias_ids]
+
+        # 每个 (查询, 位置) 只保留得分最高的一项
+        order = np.lexsort((alias_ids, inexact, -scores, positions, query_ids))
+        query_ids, alias_ids, scores, positions = (query_ids[order], alias_ids[order],
+                                                   scores[order], positions[order])
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (query_ids[1:] != query_ids[:-1]) | (positions[1:] != positions[:-1])
+        query_ids, alias_ids, scores, positions = (query_ids[first], alias_ids[first],
+                                                   scores[first], positions[first])
+
+        # 按得分降序、位置升序，每个查询取前 limit 项
+        order = np.lexsort((positions, -scores, query_ids))
+        query_ids, alias_ids, scores, positions = (query_ids[order], alias_ids[order],
+                                                   scores[order], positions[order])
+        rank = np.arange(len(query_ids)) - np.searchsorted(query_ids, query_ids)
+        top = rank < limit
+        for q, position, alias_id, score in zip(query_ids[top].tolist(), positions[top].tolist(),
+                                                alias_ids[top].tolist(), scores[top].tolist()):
+            results[q].append((position, self.alias_names[alias_id], round(score, 4)))
+        return results
@@ -7,48 +7,159 @@
 2. 将所有PNG格式转换为JPG格式
 3. 统一文件扩展名为小写 .jpg
 4. 生成详细的处理报告
+5. 可选：为每张图片生成多种宽度的缩略图（JPG + WebP），供前端按需加载
+6. 生成图片清单 manifest.json（每个园林的文件名、像素尺寸、字节数、内容哈希及已有的缩略图宽度），
+   再次运行时文件未变化的文件夹直接跳过
+7. 可选：用感知哈希（dHash/pHash）查找同一文件夹内及不同园林之间的重复图片（只读，不修改文件）
+8. 可选：压缩优化，对每张图片二分查找SSIM不低于阈值的最低JPEG质量，按EXIF方向旋转、
+   去除元数据并保存为渐进式JPEG，只有结果更小时才替换原图
+
+缩略图与原图放在同一目录，命名为 <原图序号>@<宽度>w.<格式>，例如：
+    01.jpg -> 01@320w.jpg, 01@320w.webp, 01@800w.jpg, 01@800w.webp, ...
+只生成小于原图宽度的缩略图（不放大，更大的宽度直接使用原图）；缩略图比原图新时跳过
 
 使用方法：
     python scripts/normalize_images.py [--dry-run] [--backup]
+    python scripts/normalize_images.py --list-backups
+    python scripts/normalize_images.py --restore SNAPSHOT_ID [--garden 留园]
+    python scripts/normalize_images.py --prune-backups N
+    python scripts/normalize_images.py --find-duplicates [--hash dhash] [--max-distance 6]
 
 参数：
     --dry-run    仅预览操作，不实际修改文件
-    --backup     在处理前备份原始文件到 backup/ 目录
+    --backup     在处理前为图片目录创建快照（backup/images_backup/<快照ID>），
+                 内容未变化的文件硬链接到上一个快照，只复制变化的文件
     --quality N  JPG压缩质量 (1-100, 默认85)
+    --jobs N     并行处理的进程数 (默认1，0表示使用全部CPU核心)
+    --derivatives        生成缩略图
+    --force              忽略清单，重新处理所有文件夹
+    --list-backups       列出所有快照
+    --restore ID         从快照恢复图片（恢复前会先为当前状态创建快照）
+    --prune-backups N    只保留最近 N 个快照
+    --find-duplicates    查找重复图片并生成报告
+    --optimize           按SSIM阈值压缩优化图片
+    --ssim X             压缩优化的SSIM阈值 (默认0.98)
+    --widths 320,800,1600  缩略图宽度列表
 """
 
 import os
+import re
 import sys
-import shutil
+import json
+import math
+import hashlib
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import List, Tuple, Dict
 
+from snapshot_store import SnapshotStore
+
 try:
-    from PIL import Image
+    from PIL import Image, ImageOps
     PIL_AVAILABLE = True
 except ImportError:
     PIL_AVAILABLE = False
     print("⚠️  警告: 未安装 Pillow 库，将无法进行格式转换")
     print("   请运行: pip install Pillow")
 
+# 重复图片检测和压缩优化需要 NumPy
+try:
+    from perceptual_hash import MultiIndexHash, group_pairs, image_hash, load_for_hash
+    from image_quality import find_lowest_quality
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 缩略图默认宽度与输出格式
+DERIVATIVE_WIDTHS = (320, 800, 1600)
+DERIVATIVE_FORMATS = {'.jpg': 'JPEG', '.webp': 'WEBP'}
+# 缩略图文件名：01@320w.jpg / 01@320w.webp
+DERIVATIVE_PATTERN = re.compile(r'^(\d+)@(\d+)w\.(jpg|webp)$')
+
+
+# 图片清单，位于图片目录下，前端据此得知每个园林有哪些图片
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+
+def derivative_name(stem: str, width: int, suffix: str) -> str:
+    """缩略图文件名"""
+    return f"{stem}@{width}w{suffix}"
+
+
+def is_backup_file(path: Path) -> bool:
+    """需要备份的文件：缩略图可以重新生成，不备份"""
+    return not DERIVATIVE_PATTERN.match(path.name)
+
+
+def folder_signature(folder_path: Path) -> str:
+    """文件夹签名：所有文件的文件名、大小和修改时间的哈希，只需列目录，不读取文件内容"""
+    entries = sorted(
+        (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+        for entry in os.scandir(folder_path) if entry.is_file()
+    )
+    return hashlib.sha1(json.dumps(entries, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    """文件内容哈希（SHA-256 的前16位十六进制）"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def display_size(img: 'Image.Image') -> Tuple[int, int]:
+    """已打开图片按EXIF方向校正后的显示尺寸 (宽, 高)"""
+    # EXIF方向为5-8时图片需要旋转90度，宽高互换
+    if img.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+        return img.height, img.width
+    return img.width, img.height
+
+
+def image_size(path: Path) -> Tuple[int, int]:
+    """按EXIF方向校正后的显示尺寸 (宽, 高)，只读取文件头，不解码"""
+    with Image.open(path) as img:
+        return display_size(img)
+
 
 class ImageNormalizer:
     """图片标准化处理器"""
 
-    def __init__(self, base_dir: Path, dry_run: bool = False, backup: bool = False, quality: int = 85):
+    def __init__(self, base_dir: Path, dry_run: bool = False, backup: bool = False, quality: int = 85,
+                 backup_stamp: str = None, derivatives: bool = False, widths: Tuple[int, ...] = DERIVATIVE_WIDTHS,
+                 force: bool = False, optimize: bool = False, ssim_threshold: float = 0.98,
+                 min_quality: int = 40):
         self.base_dir = base_dir
         self.dry_run = dry_run
         self.backup = backup
         self.quality = quality
+        self.derivatives = derivatives
+        self.widths = tuple(sorted(set(widths)))
+        self.force = force
+        self.optimize = optimize
+        self.ssim_threshold = ssim_threshold
+        self.min_quality = min_quality
+        self.manifest_path = base_dir / MANIFEST_NAME
+        # 同一次运行只创建一个快照，以运行开始时间为快照ID
+        self.backup_stamp = backup_stamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+        # 子进程中只记录日志不打印，由主进程按文件夹顺序统一输出
+        self.echo = True
         self.stats = {
             'total_folders': 0,
             'total_images': 0,
             'renamed': 0,
             'converted': 0,
             'skipped': 0,
-            'errors': 0
+            'unchanged': 0,
+            'errors': 0,
+            'derivatives_created': 0,
+            'derivatives_skipped': 0,
+            'optimized': 0,
+            'bytes_saved': 0
         }
         self.log_messages: List[str] = []
 
@@ -57,7 +168,12 @@ class ImageNormalizer:
         timestamp = datetime.now().strftime('%H:%M:%S')
         log_entry = f"[{timestamp}] {level}: {message}"
         self.log_messages.append(log_entry)
+        if self.echo:
+            self.print_log_entry(log_entry, level)
 
+    @staticmethod
+    def print_log_entry(log_entry: str, level: str = 'INFO'):
+        """按级别着色打印一条日志"""
         # 根据级别设置颜色
         colors = {
             'INFO': '\033[0m',      # 默认
@@ -71,23 +187,23 @@ class ImageNormalizer:
 
         print(f"{color}{log_entry}{reset}")
 
-    def backup_folder(self, folder_path: Path) -> bool:
-        """备份文件夹"""
-        if not self.backup:
-            return True
-
-        backup_dir = self.base_dir.parent / 'backup' / 'images_backup' / datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_target = backup_dir / folder_path.name
+    def snapshot_store(self) -> SnapshotStore:
+        """图片目录的快照备份库"""
+        return SnapshotStore(self.base_dir.parent / 'backup' / 'images_backup', include=is_backup_file)
 
+    def create_snapshot(self, folders: List[Path]) -> bool:
+        """在处理前为所有园林文件夹创建一个快照"""
         try:
-            backup_target.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copytree(folder_path, backup_target)
-            self.log(f"已备份: {folder_path.name} -> {backup_target}", 'DEBUG')
-            return True
+            snapshot = self.snapshot_store().create(self.base_dir, folders, self.backup_stamp)
         except Exception as e:
-            self.log(f"备份失败: {folder_path.name} - {e}", 'ERROR')
+            self.log(f"创建快照失败: {e}", 'ERROR')
             return False
 
+        stats = snapshot['stats']
+        self.log(f"已创建快照: {snapshot['id']}（{stats['files']} 个文件，硬链接 {stats['linked']} 个，"
+                 f"复制 {stats['copied']} 个 / {stats['copied_bytes'] / 1024 / 1024:.1f} MB）", 'SUCCESS')
+        return True
+
     def convert_png_to_jpg(self, png_path: Path, jpg_path: Path) -> bool:
         """将PNG转换为JPG"""
         if not PIL_AVAILABLE:
@@ -122,19 +238,106 @@ class ImageNormalizer:
             self.log(f"转换失败: {png_path.name} - {e}", 'ERROR')
             return False
 
+    def derivative_widths(self, source: Path) -> List[int]:
+        """原图需要的缩略图宽度：只取小于原图宽度的"""
+        width, _ = image_size(source)
+        return [w for w in self.widths if w < width]
+
+    def stale_derivatives(self, source: Path, widths: List[int], force: bool = False) -> List[Tuple[int, str]]:
+        """返回需要（重新）生成的缩略图 [(宽度, 扩展名), ...]，已存在且比原图新的跳过"""
+        source_mtime = source.stat().st_mtime
+        stale = []
+        for width in widths:
+            for suffix in DERIVATIVE_FORMATS:
+                target = source.with_name(derivative_name(source.stem, width, suffix))
+                if force or not target.exists() or target.stat().st_mtime < source_mtime:
+                    stale.append((width, suffix))
+        return stale
+
+    def write_derivatives(self, source: Path, targets: List[Tuple[int, str]]):
+        """
+        为一张原图生成缩略图
+        使用JPEG草稿模式按最大目标宽度直接以缩小的比例解码，只解码一次，
+        再依次缩放出各个宽度。目标宽度是旋转后的显示宽度，草稿尺寸按存储方向换算
+        """
+        with Image.open(source) as img:
+            largest = max(width for width, _ in targets)
+            display_width, _ = display_size(img)
+            if display_width > largest:
+                scale = largest / display_width
+                img.draft('RGB', (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+            # 按EXIF方向旋转，缩略图不保留EXIF
+            img = ImageOps.exif_transpose(img)
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            resized = {}
+            for width, suffix in sorted(targets, reverse=True):
+                if width not in resized:
+                    if img.width > width:
+                        resized[width] = img.resize((width, max(1, round(img.height * width / img.width))),
+                                                    Image.LANCZOS)
+                    else:
+                        resized[width] = img
+                target = source.with_name(derivative_name(source.stem, width, suffix))
+                tmp_target = target.with_name(f"tmp_{target.name}")
+                if DERIVATIVE_FORMATS[suffix] == 'JPEG':
+                    resized[width].save(tmp_target, 'JPEG', quality=self.quality, optimize=True, progressive=True)
+                else:
+                    resized[width].save(tmp_target, 'WEBP', quality=self.quality, method=4)
+                os.replace(tmp_target, target)
+
+    def generate_derivatives(self, folder_path: Path, changed: set, folder_stats: Dict):
+        """
+        为文件夹中的 NN.jpg 生成缩略图
+        changed 为本次被重命名或转换过的原图文件名：重命名会保留旧的修改时间，
+        这些原图的缩略图无论新旧都重新生成。原图已不存在或宽度不再需要的缩略图会被删除
+        """
+        sources = sorted(f for f in folder_path.iterdir() if f.is_file() and re.fullmatch(r'\d+\.jpg', f.name))
+        expected = set()
+
+        for source in sources:
+            try:
+                widths = self.derivative_widths(source)
+                expected.update(derivative_name(source.stem, width, suffix)
+                                for width in widths for suffix in DERIVATIVE_FORMATS)
+                stale = self.stale_derivatives(source, widths, force=source.name in changed)
+                skipped = len(widths) * len(DERIVATIVE_FORMATS) - len(stale)
+                if stale and not self.dry_run:
+                    self.write_derivatives(source, stale)
+                folder_stats['derivatives_created'] += len(stale)
+                folder_stats['derivatives_skipped'] += skipped
+                self.stats['derivatives_created'] += len(stale)
+                self.stats['derivatives_skipped'] += skipped
+            except Exception as e:
+                self.log(f"生成缩略图失败: {folder_path.name}/{source.name} - {e}", 'ERROR')
+                self.stats['errors'] += 1
+
+        for f in sorted(folder_path.iterdir()):
+            if DERIVATIVE_PATTERN.match(f.name) and f.name not in expected:
+                if not self.dry_run:
+                    f.unlink()
+                self.log(f"删除多余的缩略图: {folder_path.name}/{f.name}", 'DEBUG')
+
     def normalize_folder(self, folder_path: Path) -> Dict:
         """标准化单个文件夹中的图片"""
         folder_stats = {
             'folder_name': folder_path.name,
             'images_found': 0,
             'images_processed': 0,
-            'operations': []
+            'operations': [],
+            'derivatives_created': 0,
+            'derivatives_skipped': 0,
+            'optimized': 0,
+            'bytes_saved': 0,
+            'optimizations': []
         }
 
-        # 获取所有图片文件
+        # 获取所有图片文件（不包括生成的缩略图）
         image_extensions = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
         image_files = [f for f in folder_path.iterdir()
-                      if f.is_file() and f.suffix in image_extensions]
+                      if f.is_file() and f.suffix in image_extensions
+                      and not DERIVATIVE_PATTERN.match(f.name)]
 
         # 按名称排序（保持原有顺序）
         image_files.sort(key=lambda x: x.name.lower())
@@ -146,12 +349,6 @@ class ImageNormalizer:
             self.stats['skipped'] += 1
             return folder_stats
 
-        # 备份（如果需要）
-        if self.backup and not self.dry_run:
-            if not self.backup_folder(folder_path):
-                self.stats['errors'] += 1
-                return folder_stats
-
         # 处理每个图片
         for index, old_file in enumerate(image_files, start=1):
             new_name = f"{index:02d}.jpg"
@@ -221,8 +418,244 @@ class ImageNormalizer:
 
         return folder_stats
 
-    def process_all(self) -> List[Dict]:
-        """处理所有文件夹"""
+    def load_manifest(self) -> Dict:
+        """读取上次运行生成的清单，不存在、无法解析或版本不符时返回空清单"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {'version': MANIFEST_VERSION, 'gardens': {}}
+
+    def save_manifest(self, previous: Dict, results: List[Dict]):
+        """按本次结果写入清单；内容没有变化时不改写文件"""
+        gardens = {result['folder_name']: result['manifest'] for result in results if result.get('manifest')}
+        if gardens == previous.get('gardens') and self.manifest_path.exists():
+            return
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'gardens': gardens
+        }
+        tmp_path = self.manifest_path.with_name(f"tmp_{MANIFEST_NAME}")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # 前端会直接加载清单，写成紧凑格式
+            json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.manifest_path)
+        self.log(f"图片清单已更新: {self.manifest_path}", 'SUCCESS')
+
+    def build_manifest_entry(self, folder_path: Path, signature_valid: bool = True,
+                             optimized_hashes: Dict[str, float] = None) -> Dict:
+        """
+        生成单个文件夹的清单条目
+        signature_valid 为 False（处理中出现错误）时不记录签名，下次运行会重新处理该文件夹；
+        内容哈希在 optimized_hashes 中的图片记录压缩优化时使用的SSIM阈值
+        """
+        optimized_hashes = optimized_hashes or {}
+        names = {f.name for f in folder_path.iterdir() if f.is_file()}
+        images = []
+        for name in sorted(n for n in names if re.fullmatch(r'\d+\.jpg', n)):
+            path = folder_path / name
+            width, height = image_size(path)
+            stem = name[:-len('.jpg')]
+            digest = file_hash(path)
+            image = {
+                'file': name,
+                'width': width,
+                'height': height,
+                'bytes': path.stat().st_size,
+                'hash': digest,
+                # 同时具有 JPG 和 WebP 版本的缩略图宽度
+                'derivatives': sorted(
+                    int(match.group(2)) for match in map(DERIVATIVE_PATTERN.match, names)
+                    if match and match.group(1) == stem and match.group(3) == 'jpg'
+                    and derivative_name(stem, int(match.group(2)), '.webp') in names
+                )
+            }
+            if digest in optimized_hashes:
+                image['optimized'] = optimized_hashes[digest]
+            images.append(image)
+        return {
+            'signature': folder_signature(folder_path) if signature_valid else None,
+            'derivative_widths': list(self.widths) if self.derivatives else None,
+            'images': images
+        }
+
+    def is_unchanged(self, folder_path: Path, entry: Dict) -> bool:
+        """
+        清单中记录的签名与当前文件一致，且（需要缩略图时）按相同宽度生成过缩略图、
+        （需要压缩优化时）所有图片都已优化过
+        """
+        if self.force or not entry or not entry.get('signature'):
+            return False
+        if self.derivatives and entry.get('derivative_widths') != list(self.widths):
+            return False
+        if self.optimize and not all(image.get('optimized') for image in entry.get('images', [])):
+            return False
+        return entry['signature'] == folder_signature(folder_path)
+
+    def optimize_image(self, path: Path) -> Dict:
+        """
+        压缩优化单张图片：按EXIF方向旋转后二分查找SSIM不低于阈值的最低质量，
+        重新编码为不含EXIF等元数据的渐进式JPEG（保留ICC色彩配置），只有更小时才替换
+        """
+        old_bytes = path.stat().st_size
+        with Image.open(path) as img:
+            icc_profile = img.info.get('icc_profile')
+            img = ImageOps.exif_transpose(img)
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+        result = find_lowest_quality(img, self.ssim_threshold, self.min_quality, icc_profile=icc_profile)
+
+        record = {'file': path.name, 'old_bytes': old_bytes, 'new_bytes': old_bytes,
+                  'quality': None, 'ssim': None, 'replaced': False}
+        if result is None:
+            return record
+        record.update(quality=result['quality'], ssim=result['ssim'])
+        if len(result['data']) < old_bytes:
+            record.update(new_bytes=len(result['data']), replaced=True)
+            if not self.dry_run:
+                tmp_path = path.with_name(f"tmp_{path.name}")
+                with open(tmp_path, 'wb') as f:
+                    f.write(result['data'])
+                os.replace(tmp_path, path)
+        return record
+
+    def optimize_folder(self, folder_path: Path, optimized_hashes: Dict[str, float], folder_stats: Dict):
+        """
+        压缩优化文件夹中的 NN.jpg
+        optimized_hashes 为已经优化过的文件内容哈希（来自清单），这些文件不再重复优化，
+        否则每次都以有损结果为参照再次压缩，画质会逐次下降。
+        本次处理过的文件（无论是否替换）的新哈希会加入 optimized_hashes
+        """
+        sources = sorted(f for f in folder_path.iterdir() if f.is_file() and re.fullmatch(r'\d+\.jpg', f.name))
+        for source in sources:
+            try:
+                if file_hash(source) in optimized_hashes:
+                    continue
+                record = self.optimize_image(source)
+                folder_stats['optimizations'].append(record)
+                if record['replaced']:
+                    saved = record['old_bytes'] - record['new_bytes']
+                    folder_stats['optimized'] += 1
+                    folder_stats['bytes_saved'] += saved
+                    self.stats['optimized'] += 1
+                    self.stats['bytes_saved'] += saved
+                if not self.dry_run:
+                    optimized_hashes[file_hash(source)] = self.ssim_threshold
+            except Exception as e:
+                self.log(f"压缩优化失败: {folder_path.name}/{source.name} - {e}", 'ERROR')
+                self.stats['errors'] += 1
+
+    def process_folder(self, folder_path: Path, previous_entry: Dict = None) -> Dict:
+        """
+        处理单个文件夹：标准化命名，按需压缩优化、生成缩略图，最后生成清单条目（预览模式不生成）
+        previous_entry 为上次运行的清单条目，用于识别已经压缩优化过的图片
+        """
+        errors_before = self.stats['errors']
+        result = self.normalize_folder(folder_path)
+
+        optimized_hashes = {image['hash']: image['optimized']
+                            for image in (previous_entry or {}).get('images', []) if image.get('optimized')}
+        if self.optimize and PIL_AVAILABLE:
+            self.optimize_folder(folder_path, optimized_hashes, result)
+
+        # 生成缩略图
+        if self.derivatives and (PIL_AVAILABLE or self.dry_run):
+            changed = {op['new_name'] for op in result['operations'] if op['action'] != 'keep'}
+            changed.update(record['file'] for record in result['optimizations'] if record['replaced'])
+            self.generate_derivatives(folder_path, changed, result)
+
+        if not self.dry_run:
+            result['manifest'] = self.build_manifest_entry(
+                folder_path, self.stats['errors'] == errors_before, optimized_hashes)
+        return result
+
+    def unchanged_result(self, folder_path: Path, entry: Dict) -> Dict:
+        """跳过的未变化文件夹的处理结果，沿用清单条目"""
+        self.log("  ⊙ 未变化，跳过", 'DEBUG')
+        self.stats['unchanged'] += 1
+        return {
+            'folder_name': folder_path.name,
+            'images_found': len(entry['images']),
+            'images_processed': 0,
+            'operations': [],
+            'derivatives_created': 0,
+            'derivatives_skipped': 0,
+            'optimized': 0,
+            'bytes_saved': 0,
+            'optimizations': [],
+            'unchanged': True,
+            'manifest': entry
+        }
+
+    def worker_options(self) -> Dict:
+        """构造子进程中处理器所需的参数"""
+        return {
+            'base_dir': self.base_dir,
+            'dry_run': self.dry_run,
+            'quality': self.quality,
+            'derivatives': self.derivatives,
+            'widths': self.widths,
+            'force': self.force,
+            'optimize': self.optimize,
+            'ssim_threshold': self.ssim_threshold,
+            'min_quality': self.min_quality
+        }
+
+    def merge_worker_output(self, folder_stats: Dict, log_messages: List[str]):
+        """合并子进程的统计和日志，日志按原级别补打印"""
+        for key, value in folder_stats.items():
+            if key not in ('total_folders', 'total_images'):
+                self.stats[key] += value
+        for log_entry in log_messages:
+            self.log_messages.append(log_entry)
+            level = log_entry.split('] ', 1)[-1].split(':', 1)[0]
+            self.print_log_entry(log_entry, level)
+
+    def iter_folder_results(self, folders: List[Path], jobs: int = 1, manifest: Dict = None):
+        """
+        按文件夹顺序逐个产出处理结果，清单中未变化的文件夹直接跳过
+        jobs > 1 时每个需要处理的文件夹交给进程池中的一个进程处理，统计和日志按文件夹顺序合并，
+        因此报告内容与串行处理一致（时间戳除外）
+        """
+        gardens = (manifest or {}).get('gardens', {})
+        unchanged = {folder: gardens[folder.name] for folder in folders
+                     if self.is_unchanged(folder, gardens.get(folder.name))}
+        pending = [folder for folder in folders if folder not in unchanged]
+
+        # 有文件夹需要处理时，先为整个图片目录创建一个快照；快照失败则不做任何修改
+        if self.backup and not self.dry_run and pending:
+            if not self.create_snapshot(folders):
+                self.stats['errors'] += 1
+                return
+
+        if jobs <= 1 or len(pending) <= 1:
+            for i, folder in enumerate(folders, 1):
+                self.log(f"[{i}/{len(folders)}] 处理: {folder.name}", 'INFO')
+                if folder in unchanged:
+                    yield self.unchanged_result(folder, unchanged[folder])
+                else:
+                    yield self.process_folder(folder, gardens.get(folder.name))
+            return
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {folder: executor.submit(_process_folder_job, self.worker_options(), folder,
+                                               gardens.get(folder.name))
+                       for folder in pending}
+            for i, folder in enumerate(folders, 1):
+                self.log(f"[{i}/{len(folders)}] 处理: {folder.name}", 'INFO')
+                if folder in unchanged:
+                    yield self.unchanged_result(folder, unchanged[folder])
+                    continue
+                result, folder_stats, log_messages = futures[folder].result()
+                self.merge_worker_output(folder_stats, log_messages)
+                yield result
+
+    def process_all(self, jobs: int = 1) -> List[Dict]:
+        """处理所有文件夹，jobs 为并行进程数"""
         if not self.base_dir.exists():
             self.log(f"目录不存在: {self.base_dir}", 'ERROR')
             return []
@@ -234,27 +667,46 @@ class ImageNormalizer:
         self.log(f"模式: {'预览模式 (不修改文件)' if self.dry_run else '实际处理'}", 'INFO')
         self.log(f"备份: {'是' if self.backup else '否'}", 'INFO')
         self.log(f"JPG质量: {self.quality}", 'INFO')
+        self.log(f"并行进程数: {jobs}", 'INFO')
+        if self.derivatives:
+            self.log(f"缩略图宽度: {', '.join(map(str, self.widths))} (JPG + WebP)", 'INFO')
+        if self.optimize:
+            self.log(f"压缩优化: SSIM ≥ {self.ssim_threshold}，最低质量 {self.min_quality}", 'INFO')
         self.log("=" * 80, 'INFO')
 
         # 获取所有园林文件夹
         folders = sorted([d for d in self.base_dir.iterdir() if d.is_dir()])
+        manifest = self.load_manifest()
         self.stats['total_folders'] = len(folders)
 
         self.log(f"\n找到 {len(folders)} 个园林文件夹\n", 'INFO')
 
         # 处理每个文件夹
         all_results = []
-        for i, folder in enumerate(folders, 1):
-            self.log(f"[{i}/{len(folders)}] 处理: {folder.name}", 'INFO')
-            result = self.normalize_folder(folder)
+        for result in self.iter_folder_results(folders, jobs, manifest):
             all_results.append(result)
             self.stats['total_images'] += result['images_found']
 
             # 显示处理结果
+            if result.get('unchanged'):
+                continue
             if result['images_processed'] > 0:
                 self.log(f"  ✓ 处理了 {result['images_processed']}/{result['images_found']} 张图片", 'SUCCESS')
             elif result['images_found'] == 0:
-                self.log(f"  ⊘ 无图片", 'WARNING')
+                self.log("  ⊘ 无图片", 'WARNING')
+            if result['optimized'] > 0:
+                self.log(f"  ✓ 压缩优化了 {result['optimized']} 张图片，节省 "
+                         f"{result['bytes_saved'] / 1024:.1f} KB", 'SUCCESS')
+            if result['derivatives_created'] > 0:
+                self.log(f"  ✓ 生成了 {result['derivatives_created']} 张缩略图", 'SUCCESS')
+
+        # 更新图片清单（预览模式不写入）
+        if not self.dry_run:
+            try:
+                self.save_manifest(manifest, all_results)
+            except Exception as e:
+                self.log(f"保存图片清单失败: {e}", 'ERROR')
+                self.stats['errors'] += 1
 
         return all_results
 
@@ -267,7 +719,14 @@ class ImageNormalizer:
         self.log(f"找到的图片总数: {self.stats['total_images']}", 'INFO')
         self.log(f"重命名的图片: {self.stats['renamed']}", 'SUCCESS')
         self.log(f"转换的图片 (PNG→JPG): {self.stats['converted']}", 'SUCCESS')
+        if self.optimize:
+            self.log(f"压缩优化的图片: {self.stats['optimized']}，"
+                     f"节省 {self.stats['bytes_saved'] / 1024 / 1024:.2f} MB", 'SUCCESS')
+        if self.derivatives:
+            self.log(f"生成的缩略图: {self.stats['derivatives_created']}", 'SUCCESS')
+            self.log(f"已是最新的缩略图: {self.stats['derivatives_skipped']}", 'INFO')
         self.log(f"跳过的文件夹: {self.stats['skipped']}", 'WARNING')
+        self.log(f"未变化的文件夹: {self.stats['unchanged']}", 'INFO')
         self.log(f"错误数量: {self.stats['errors']}", 'ERROR' if self.stats['errors'] > 0 else 'INFO')
 
         if self.dry_run:
@@ -297,9 +756,20 @@ class ImageNormalizer:
                     f.write(f"文件夹: {result['folder_name']}\n")
                     f.write(f"  找到图片: {result['images_found']} 张\n")
                     f.write(f"  处理图片: {result['images_processed']} 张\n")
+                    if result.get('unchanged'):
+                        f.write("  未变化，已跳过\n")
+                    if self.optimize and not result.get('unchanged'):
+                        f.write(f"  压缩优化: {result['optimized']} 张，节省 {result['bytes_saved']} 字节\n")
+                        for record in result['optimizations']:
+                            if record['replaced']:
+                                f.write(f"    {record['file']}: {record['old_bytes']} -> {record['new_bytes']} 字节"
+                                        f" (质量 {record['quality']}, SSIM {record['ssim']})\n")
+                    if self.derivatives:
+                        f.write(f"  生成缩略图: {result['derivatives_created']} 张"
+                                f"（跳过 {result['derivatives_skipped']} 张）\n")
 
                     if result['operations']:
-                        f.write(f"  操作详情:\n")
+                        f.write("  操作详情:\n")
                         for op in result['operations']:
                             if op['action'] == 'keep':
                                 continue  # 跳过未修改的文件
@@ -316,6 +786,176 @@ class ImageNormalizer:
         except Exception as e:
             self.log(f"保存报告失败: {e}", 'ERROR')
 
+    def list_source_images(self) -> List[Path]:
+        """所有园林文件夹中的原图（不包括缩略图），按文件夹和文件名排序"""
+        image_extensions = {'.jpg', '.jpeg', '.png'}
+        return [
+            f for folder in sorted(d for d in self.base_dir.iterdir() if d.is_dir())
+            for f in sorted(folder.iterdir(), key=lambda x: x.name.lower())
+            if f.is_file() and f.suffix.lower() in image_extensions and not DERIVATIVE_PATTERN.match(f.name)
+        ]
+
+    def find_duplicates(self, method: str = 'dhash', max_distance: int = 6, jobs: int = 1) -> Dict:
+        """
+        用感知哈希查找重复图片
+        每张图片计算64位哈希后放入多重索引哈希表，只比较同一分段桶中的候选，
+        汉明距离不超过 max_distance 的图片视为重复，相似关系可传递，合并为重复组。
+        每组建议保留像素最多（其次字节数最大）的一张
+        """
+        self.log("=" * 80, 'INFO')
+        self.log("苏州园林重复图片检测", 'INFO')
+        self.log("=" * 80, 'INFO')
+        self.log(f"处理目录: {self.base_dir}", 'INFO')
+        self.log(f"哈希方法: {method}，最大汉明距离: {max_distance}", 'INFO')
+
+        paths = self.list_source_images()
+        if jobs > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                hashed = list(executor.map(_hash_image_job, paths, [method] * len(paths), chunksize=16))
+        else:
+            hashed = [_hash_image_job(path, method) for path in paths]
+
+        images = []
+        for path, (value, error) in zip(paths, hashed):
+            if error:
+                self.log(f"计算哈希失败: {path.parent.name}/{path.name} - {error}", 'ERROR')
+                self.stats['errors'] += 1
+                continue
+            width, height = image_size(path)
+            images.append({
+                'path': path.relative_to(self.base_dir).as_posix(),
+                'folder': path.parent.name,
+                'hash': f"{value:016x}",
+                'width': width,
+                'height': height,
+                'bytes': path.stat().st_size,
+                'value': value
+            })
+        self.log(f"已计算 {len(images)} 张图片的哈希", 'INFO')
+
+        index = MultiIndexHash([image['value'] for image in images], radius=max_distance)
+        pairs = index.pairs()
+        distances = {(i, j): d for i, j, d in pairs}
+
+        groups = []
+        for members in group_pairs(pairs, len(images)):
+            keep = max(members, key=lambda i: (images[i]['width'] * images[i]['height'], images[i]['bytes']))
+            folders = sorted({images[i]['folder'] for i in members})
+            groups.append({
+                'cross_folder': len(folders) > 1,
+                'folders': folders,
+                'keep': images[keep]['path'],
+                'reclaimable_bytes': sum(images[i]['bytes'] for i in members if i != keep),
+                'max_distance': max(distances[(i, j)] for i in members for j in members if (i, j) in distances),
+                'members': [
+                    {key: images[i][key] for key in ('path', 'hash', 'width', 'height', 'bytes')}
+                    for i in members
+                ]
+            })
+
+        summary = {
+            'images': len(images),
+            'candidate_pairs': len(pairs),
+            'groups': len(groups),
+            'within_folder_groups': sum(not g['cross_folder'] for g in groups),
+            'cross_folder_groups': sum(g['cross_folder'] for g in groups),
+            'duplicate_images': sum(len(g['members']) - 1 for g in groups),
+            'reclaimable_bytes': sum(g['reclaimable_bytes'] for g in groups)
+        }
+
+        for group in groups:
+            scope = '跨园林' if group['cross_folder'] else '同一园林'
+            self.log(f"[{scope}] 保留 {group['keep']}，重复: "
+                     f"{', '.join(m['path'] for m in group['members'] if m['path'] != group['keep'])}", 'WARNING')
+        self.log("=" * 80, 'INFO')
+        self.log(f"重复组: {summary['groups']}（同一园林 {summary['within_folder_groups']}，"
+                 f"跨园林 {summary['cross_folder_groups']}）", 'INFO')
+        self.log(f"可删除的重复图片: {summary['duplicate_images']} 张，"
+                 f"{summary['reclaimable_bytes'] / 1024 / 1024:.1f} MB", 'INFO')
+
+        return {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'base_dir': str(self.base_dir),
+            'method': method,
+            'max_distance': max_distance,
+            'summary': summary,
+            'groups': groups
+        }
+
+    def save_duplicate_report(self, report: Dict, output_path: Path):
+        """保存重复图片报告（JSON）"""
+        try:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.log(f"\n重复图片报告已保存到: {output_path}", 'SUCCESS')
+        except Exception as e:
+            self.log(f"保存报告失败: {e}", 'ERROR')
+
+
+def _hash_image_job(path: Path, method: str) -> Tuple[int, str]:
+    """计算单张图片的感知哈希，返回 (哈希, 错误信息)"""
+    try:
+        return image_hash(load_for_hash(path), method), None
+    except Exception as e:
+        return 0, str(e)
+
+
+def _process_folder_job(options: Dict, folder_path: Path,
+                        previous_entry: Dict = None) -> Tuple[Dict, Dict, List[str]]:
+    """子进程入口：处理单个文件夹，返回处理结果以及该文件夹产生的统计和日志"""
+    normalizer = ImageNormalizer(**options)
+    normalizer.echo = False
+    result = normalizer.process_folder(folder_path, previous_entry)
+    return result, normalizer.stats, normalizer.log_messages
+
+
+def manage_backups(args, normalizer: ImageNormalizer):
+    """执行 --list-backups / --restore / --prune-backups"""
+    store = normalizer.snapshot_store()
+
+    if args.list_backups:
+        snapshots = store.list_snapshots()
+        if not snapshots:
+            print("没有快照")
+        for snapshot in snapshots:
+            stats = snapshot['stats']
+            folders = len({rel_path.split('/', 1)[0] for rel_path in snapshot['files']})
+            print(f"{snapshot['id']}  {snapshot['created_at']}  {folders} 个文件夹  {stats['files']} 个文件  "
+                  f"新增 {stats['copied_bytes'] / 1024 / 1024:.1f} MB")
+        if snapshots:
+            print(f"\n快照总占用: {store.disk_usage(store.root) / 1024 / 1024:.1f} MB")
+
+    if args.restore:
+        try:
+            snapshot = store.get(args.restore)
+        except KeyError:
+            print(f"❌ 错误: 快照不存在: {args.restore}")
+            sys.exit(1)
+        missing = set(args.garden or []) - {rel_path.split('/', 1)[0] for rel_path in snapshot['files']}
+        if missing:
+            print(f"❌ 错误: 快照中没有这些园林: {'、'.join(sorted(missing))}")
+            sys.exit(1)
+        target = '、'.join(args.garden) if args.garden else '全部园林'
+        response = input(f"\n将从快照 {args.restore} 恢复{target}，当前文件会被覆盖。是否继续？(y/N): ")
+        if response.lower() != 'y':
+            print("操作已取消。")
+            sys.exit(0)
+        folders = sorted(d for d in normalizer.base_dir.iterdir() if d.is_dir())
+        if not normalizer.create_snapshot(folders):
+            sys.exit(1)
+        stats = store.restore(args.restore, normalizer.base_dir, args.garden)
+        print(f"已恢复 {stats['folders']} 个文件夹，{stats['restored']} 个文件，删除 {stats['removed']} 个文件")
+        print("   恢复的文件修改时间为当前时间，下次运行会重新处理这些文件夹并更新缩略图")
+
+    if args.prune_backups is not None:
+        if args.prune_backups < 0:
+            print("❌ 错误: 保留数量不能为负数")
+            sys.exit(1)
+        removed = store.prune(args.prune_backups)
+        for snapshot_id in removed:
+            print(f"已删除快照: {snapshot_id}")
+        print(f"共删除 {len(removed)} 个快照，保留 {len(store.list_snapshots())} 个")
+
 
 def main():
     """主函数"""
@@ -332,6 +972,26 @@ def main():
 
   # 实际处理（不备份，高质量）
   python scripts/normalize_images.py --quality 95
+
+  # 使用4个进程并行处理
+  python scripts/normalize_images.py --jobs 4
+
+  # 忽略图片清单，重新处理所有文件夹
+  python scripts/normalize_images.py --force
+
+  # 同时生成 320/800/1600 宽度的缩略图（JPG + WebP）
+  python scripts/normalize_images.py --derivatives --widths 320,800,1600
+
+  # 查看快照、从快照恢复（可只恢复部分园林）、只保留最近5个快照
+  python scripts/normalize_images.py --list-backups
+  python scripts/normalize_images.py --restore 20250101_120000 --garden 留园
+  python scripts/normalize_images.py --prune-backups 5
+
+  # 压缩优化：每张图片取SSIM不低于0.98的最低质量，只在更小时替换
+  python scripts/normalize_images.py --optimize --ssim 0.98 --backup
+
+  # 查找重复图片（只读），dHash 汉明距离不超过6视为重复
+  python scripts/normalize_images.py --find-duplicates --hash dhash --max-distance 6
         """
     )
 
@@ -341,11 +1001,53 @@ def main():
                        help='在处理前备份原始文件')
     parser.add_argument('--quality', type=int, default=85, choices=range(1, 101),
                        help='JPG压缩质量 (1-100, 默认85)', metavar='N')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                       help='并行处理的进程数 (默认1，0表示使用全部CPU核心)')
+    parser.add_argument('--derivatives', action='store_true',
+                       help='为每张图片生成多种宽度的缩略图（JPG + WebP）')
+    parser.add_argument('--widths', type=str, default=','.join(map(str, DERIVATIVE_WIDTHS)),
+                       help='缩略图宽度列表，逗号分隔（默认: 320,800,1600）')
+    parser.add_argument('--force', action='store_true',
+                       help='忽略图片清单，重新处理所有文件夹')
+    parser.add_argument('--list-backups', action='store_true',
+                       help='列出所有快照')
+    parser.add_argument('--restore', type=str, metavar='SNAPSHOT_ID',
+                       help='从快照恢复图片（恢复前会先为当前状态创建快照）')
+    parser.add_argument('--garden', action='append', metavar='NAME',
+                       help='与 --restore 一起使用，只恢复指定园林（可重复）')
+    parser.add_argument('--prune-backups', type=int, metavar='N',
+                       help='只保留最近 N 个快照，删除更早的快照')
+    parser.add_argument('--optimize', action='store_true',
+                       help='压缩优化：二分查找SSIM不低于阈值的最低JPEG质量，只在更小时替换原图')
+    parser.add_argument('--ssim', type=float, default=0.98, metavar='X',
+                       help='压缩优化的SSIM阈值 (0-1, 默认0.98)')
+    parser.add_argument('--min-quality', type=int, default=40, choices=range(1, 96), metavar='N',
+                       help='压缩优化时尝试的最低JPG质量 (1-95, 默认40)')
+    parser.add_argument('--find-duplicates', action='store_true',
+                       help='用感知哈希查找重复图片并生成报告（不修改文件）')
+    parser.add_argument('--hash', choices=['dhash', 'phash'], default='dhash',
+                       help='感知哈希方法（默认: dhash）')
+    parser.add_argument('--max-distance', type=int, default=6, metavar='N',
+                       help='视为重复的最大汉明距离（64位哈希，默认6）')
     parser.add_argument('--dir', type=str, default='public/dataset/images',
                        help='图片目录路径（默认: public/dataset/images）')
 
     args = parser.parse_args()
 
+    try:
+        widths = tuple(int(w) for w in args.widths.split(',') if w.strip())
+        if not widths or min(widths) <= 0:
+            raise ValueError
+    except ValueError:
+        parser.error(f"无效的缩略图宽度列表: {args.widths}")
+
+    if not 0 < args.ssim <= 1:
+        parser.error(f"SSIM阈值应在 (0, 1] 之间: {args.ssim}")
+    if args.optimize and not NUMPY_AVAILABLE:
+        print("\n❌ 错误: 压缩优化需要 NumPy")
+        print("   请运行: pip install numpy\n")
+        sys.exit(1)
+
     # 检查Pillow库
     if not PIL_AVAILABLE and not args.dry_run:
         print("\n❌ 错误: 未安装 Pillow 库，无法进行格式转换")
@@ -357,6 +1059,27 @@ def main():
     project_root = script_dir.parent
     images_dir = project_root / args.dir
 
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    report_dir = project_root / 'logs'
+
+    # 重复图片检测（只读），执行后直接退出
+    if args.find_duplicates:
+        if not (PIL_AVAILABLE and NUMPY_AVAILABLE):
+            print("\n❌ 错误: 重复图片检测需要 Pillow 和 NumPy")
+            print("   请运行: pip install Pillow numpy\n")
+            sys.exit(1)
+        normalizer = ImageNormalizer(base_dir=images_dir)
+        report = normalizer.find_duplicates(args.hash, args.max_distance, jobs)
+        report_dir.mkdir(exist_ok=True)
+        normalizer.save_duplicate_report(
+            report, report_dir / f"image_duplicates_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        return
+
+    # 快照管理命令，执行后直接退出
+    if args.list_backups or args.restore or args.prune_backups is not None:
+        manage_backups(args, ImageNormalizer(base_dir=images_dir))
+        return
+
     # 确认操作
     if not args.dry_run:
         print("\n⚠️  警告: 此操作将修改图片文件！")
@@ -375,14 +1098,19 @@ def main():
         base_dir=images_dir,
         dry_run=args.dry_run,
         backup=args.backup,
-        quality=args.quality
+        quality=args.quality,
+        derivatives=args.derivatives,
+        widths=widths,
+        force=args.force,
+        optimize=args.optimize,
+        ssim_threshold=args.ssim,
+        min_quality=args.min_quality
     )
 
-    results = normalizer.process_all()
+    results = normalizer.process_all(jobs)
     normalizer.print_summary(results)
 
     # 保存报告
-    report_dir = project_root / 'logs'
     report_dir.mkdir(exist_ok=True)
     report_file = report_dir / f"image_normalization_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
     normalizer.save_report(results, report_file)
@@ -4,29 +4,18 @@
 整理HTML文件按公布批次分类
 """
 
-import csv
-import os
 import shutil
-from pathlib import Path
+
+from dataset_io import DATASET_DIR, ROOT_DIR, read_table
 
 def organize_html_files():
-    # 项目根目录
-    project_root = Path("/home/leo/Workspace/SuzhouGardenVis")
-    csv_file = project_root / "dataset" / "SuzhouGardenList.csv"
-    html_dir = project_root / "html"
-    
-    # 读取CSV文件，建立园林名称到公布批次的映射
-    garden_to_batch = {}
+    # 路径相对于项目根目录
+    csv_file = DATASET_DIR / "SuzhouGardenList.csv"
+    html_dir = ROOT_DIR / "html"
     
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        next(reader)  # 跳过标题行
-        
-        for row in reader:
-            if len(row) >= 2:
-                batch = row[0].strip()
-                name = row[1].strip()
-                garden_to_batch[name] = batch
+    # 读取CSV文件，建立园林名称到公布批次的映射（批次保留原文）
+    gardens = read_table(csv_file, required=('公布批次', '名称'))
+    garden_to_batch = dict(zip(gardens['名称'].str.strip(), gardens['公布批次'].str.strip()))
     
     print(f"从CSV文件中读取了 {len(garden_to_batch)} 个园林信息")
     
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+图片感知哈希与近似重复检测
+
+dHash（相邻像素亮度差）和 pHash（低频DCT系数与中位数比较）都把图片压缩为
+64位整数，缩放、重新压缩后的同一张照片哈希值的汉明距离很小。
+多重索引哈希把64位分成 radius + 1 段，按鸽巢原理，距离不超过 radius 的两个哈希
+至少有一段完全相同，因此只需比较同一分段桶中的哈希，无需两两比较全部图片。
+
+用法示例：
+    from perceptual_hash import image_hash, MultiIndexHash, group_pairs
+    hashes = [image_hash(Image.open(path), 'dhash') for path in paths]
+    pairs = MultiIndexHash(hashes, radius=6).pairs()     # [(i, j, 距离), ...]
+    groups = group_pairs(pairs, len(hashes))             # [[i, j, ...], ...]
+"""
+
+import numpy as np
+from PIL import Image, ImageOps
+
+HASH_BITS = 64
+
+# 每个字节中1的个数，用于批量计算汉明距离
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _bits_to_int(bits) -> int:
+    """布尔数组（高位在前）转换为整数"""
+    value = 0
+    for bit in np.asarray(bits).ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def _grayscale(img: Image.Image, size) -> np.ndarray:
+    """转为灰度并缩放到 size (宽, 高)，返回浮点数组"""
+    return np.asarray(img.convert('L').resize(size, Image.LANCZOS), dtype=np.float64)
+
+
+def dhash(img: Image.Image, hash_size: int = 8) -> int:
+    """差值哈希：缩放到 (hash_size+1) x hash_size，比较每行相邻像素的亮度"""
+    pixels = _grayscale(img, (hash_size + 1, hash_size))
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """n 点 DCT-II 变换矩阵（正交归一化）"""
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+def phash(img: Image.Image, hash_size: int = 8, highfreq_factor: int = 4) -> int:
+    """感知哈希：32x32 灰度图做二维DCT，取左上角 8x8 低频系数与其中位数比较"""
+    size = hash_size * highfreq_factor
+    pixels = _grayscale(img, (size, size))
+    dct = _dct_matrix(size)
+    low = (dct @ pixels @ dct.T)[:hash_size, :hash_size]
+    # 直流分量只反映平均亮度，不参与中位数计算
+    median = np.median(low.ravel()[1:])
+    return _bits_to_int(low > median)
+
+
+HASH_FUNCTIONS = {'dhash': dhash, 'phash': phash}
+
+
+def load_for_hash(path, size: int = 64) -> Image.Image:
+    """
+    读取用于计算哈希的小图：JPEG使用草稿模式按缩小的比例解码，再按EXIF方向旋转
+    """
+    with Image.open(path) as img:
+        img.draft('L', (size, size))
+        img = ImageOps.exif_transpose(img)
+        return img.convert('L')
+
+
+def image_hash(img: Image.Image, method: str = 'dhash') -> int:
+    """按 method（dhash / phash）计算64位哈希"""
+    if method not in HASH_FUNCTIONS:
+        raise ValueError(f"未知的哈希方法: {method}")
+    return HASH_FUNCTIONS[method](img)
+
+
+def hamming(a: int, b: int) -> int:
+    """两个哈希的汉明距离"""
+    return bin(a ^ b).count('1')
+
+
+def hamming_array(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """两组 uint64 哈希逐个计算汉明距离"""
+    xor = np.bitwise_xor(a.astype(np.uint64), b.astype(np.uint64))
+    return _POPCOUNT[xor.view(np.uint8).reshape(-1, 8)].sum(axis=1).astype(np.int64)
+
+
+class MultiIndexHash:
+    """
+    多重索引哈希表
+    把 bits 位哈希分成 radius + 1 段，每段建立一个“段值 -> 哈希下标”的桶，
+    同一桶中的哈希才是候选，再用完整的汉明距离过滤
+    """
+
+    def __init__(self, hashes, radius: int = 6, bits: int = HASH_BITS):
+        self.hashes = np.array([int(h) for h in hashes], dtype=np.uint64)
+        self.radius = radius
+        self.bits = bits
+
+        segments = min(radius + 1, bits)
+        bounds = np.linspace(0, bits, segments + 1).astype(int)
+        self.segments = list(zip(bounds[:-1], bounds[1:]))
+        self.tables = []
+        for start, end in self.segments:
+            keys = self._segment(self.hashes, start, end)
+            table = {}
+            for index, key in enumerate(keys.tolist()):
+                table.setdefault(key, []).append(index)
+            self.tables.append(table)
+
+    @staticmethod
+    def _segment(hashes: np.ndarray, start: int, end: int) -> np.ndarray:
+        """取出哈希中 [start, end) 位（从低位数起）"""
+        mask = np.uint64((1 << (end - start)) - 1)
+        return (hashes >> np.uint64(start)) & mask
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def pairs(self):
+        """返回所有距离不超过 radius 的下标对 [(i, j, 距离), ...]，i < j，按 (i, j) 排序"""
+        candidates = []
+        for table in self.tables:
+            for bucket in table.values():
+                if len(bucket) > 1:
+                    bucket = np.asarray(bucket)
+                    left, right = np.triu_indices(len(bucket), k=1)
+                    candidates.append(np.column_stack([bucket[left], bucket[right]]))
+        if not candidates:
+            return []
+
+        candidates = np.unique(np.concatenate(candidates), axis=0)
+        distances = hamming_array(self.hashes[candidates[:, 0]], self.hashes[candidates[:, 1]])
+        within = distances <= self.radius
+        return [(int(i), int(j), int(d)) for (i, j), d in zip(candidates[within], distances[within])]
+
+    def query(self, value: int):
+        """查询与 value 距离不超过 radius 的哈希，返回 [(下标, 距离), ...]，按距离升序"""
+        value = np.array([int(value)], dtype=np.uint64)
+        candidates = set()
+        for (start, end), table in zip(self.segments, self.tables):
+            candidates.update(table.get(int(self._segment(value, start, end)[0]), ()))
+        if not candidates:
+            return []
+        candidates = np.array(sorted(candidates))
+        distances = hamming_array(self.hashes[candidates], np.repeat(value, len(candidates)))
+        order = np.argsort(distances, kind='stable')
+        return [(int(candidates[k]), int(distances[k])) for k in order if distances[k] <= self.radius]
+
+
+def group_pairs(pairs, size: int):
+    """
+    按相似对把下标合并成组（并查集，相似关系可传递），返回包含两个以上元素的组，
+    组内下标升序，各组按最小下标排序
+    """
+    parent = list(range(size))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j, _ in pairs:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    groups = {}
+    for i in range(size):
+        groups.setdefault(find(i), []).append(i)
+    return sorted((members for members in groups.values() if len(members) > 1), key=lambda g: g[0])
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+图片目录的快照备份库
+
+每次备份生成一个快照（以运行开始时间为ID），目录结构与图片目录相同：
+    images_backup/
+        20250101_120000/
+            snapshot.json      # 快照索引：每个文件的大小、修改时间和内容哈希
+            留园/01.jpg
+            ...
+
+内容与上一个快照中某个文件相同的文件直接硬链接到该文件，只有变化的文件才复制，
+多个快照共享未变化的数据。文件大小和修改时间与上一个快照记录一致时沿用记录的
+哈希，不再读取文件内容。快照索引最后写入，没有索引的目录不视为快照。
+
+用法示例：
+    from snapshot_store import SnapshotStore
+    store = SnapshotStore(Path('public/dataset/backup/images_backup'))
+    snapshot = store.create(Path('public/dataset/images'), folders, '20250101_120000')
+    store.restore('20250101_120000', Path('public/dataset/images'))
+    store.prune(keep=5)
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+SNAPSHOT_INDEX = 'snapshot.json'
+SNAPSHOT_VERSION = 1
+
+
+def sha256_file(path: Path) -> str:
+    """文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SnapshotStore:
+    """
+    快照备份库
+    include 用于筛选需要备份的文件（参数为文件路径），默认备份所有文件
+    """
+
+    def __init__(self, root: Path, include: Optional[Callable[[Path], bool]] = None):
+        self.root = root
+        self.include = include or (lambda path: True)
+
+    def list_snapshots(self) -> List[Dict]:
+        """按ID升序返回所有完整快照的索引"""
+        snapshots = []
+        if not self.root.exists():
+            return snapshots
+        for path in sorted(self.root.iterdir()):
+            index_path = path / SNAPSHOT_INDEX
+            if not index_path.is_file():
+                continue
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if index.get('version') == SNAPSHOT_VERSION:
+                snapshots.append(index)
+        return snapshots
+
+    def get(self, snapshot_id: str) -> Dict:
+        """读取指定快照的索引，不存在时抛出 KeyError"""
+        for snapshot in self.list_snapshots():
+            if snapshot['id'] == snapshot_id:
+                return snapshot
+        raise KeyError(snapshot_id)
+
+    def new_id(self, snapshot_id: str) -> str:
+        """同一秒内多次备份时在ID后追加序号"""
+        candidate, n = snapshot_id, 1
+        while (self.root / candidate).exists():
+            n += 1
+            candidate = f"{snapshot_id}_{n}"
+        return candidate
+
+    def create(self, source_dir: Path, folders: Iterable[Path], snapshot_id: str) -> Dict:
+        """
+        为 folders（source_dir 下的子目录）创建快照，返回快照索引
+        内容已在上一个快照中出现的文件以硬链接保存（跨文件系统等无法链接时退回复制）
+        """
+        previous = self.list_snapshots()
+        previous = previous[-1] if previous else None
+        previous_files = previous['files'] if previous else {}
+        # 按内容哈希查找上一个快照中的文件，重命名过的文件同样可以链接
+        by_hash = {record['sha256']: self.root / previous['id'] / rel_path
+                   for rel_path, record in previous_files.items()}
+
+        snapshot_id = self.new_id(snapshot_id)
+        snapshot_dir = self.root / snapshot_id
+        snapshot_dir.mkdir(parents=True)
+
+        files = {}
+        stats = {'files': 0, 'linked': 0, 'copied': 0, 'copied_bytes': 0}
+        for folder in sorted(folders):
+            for path in sorted(folder.iterdir()):
+                if not path.is_file() or not self.include(path):
+                    continue
+                rel_path = path.relative_to(source_dir).as_posix()
+                stat = path.stat()
+                record = previous_files.get(rel_path)
+                if record and record['size'] == stat.st_size and record['mtime_ns'] == stat.st_mtime_ns:
+                    digest = record['sha256']
+                else:
+                    digest = sha256_file(path)
+
+                target = snapshot_dir / rel_path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                linked = False
+                if digest in by_hash:
+                    try:
+                        os.link(by_hash[digest], target)
+                        linked = True
+                    except OSError:
+                        pass
+                if linked:
+                    stats['linked'] += 1
+                else:
+                    shutil.copy2(path, target)
+                    stats['copied'] += 1
+                    stats['copied_bytes'] += stat.st_size
+                    by_hash.setdefault(digest, target)
+
+                stats['files'] += 1
+                files[rel_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+
+        index = {
+            'version': SNAPSHOT_VERSION,
+            'id': snapshot_id,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'source': str(source_dir),
+            'previous': previous['id'] if previous else None,
+            'stats': stats,
+            'files': files
+        }
+        # 索引最后写入：中断的快照没有索引，不会被当作完整快照
+        tmp_path = snapshot_dir / f"tmp_{SNAPSHOT_INDEX}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, snapshot_dir / SNAPSHOT_INDEX)
+        return index
+
+    def restore(self, snapshot_id: str, target_dir: Path, folders: Optional[Iterable[str]] = None) -> Dict:
+        """
+        把快照中的文件夹恢复到 target_dir；folders 为要恢复的文件夹名，默认恢复全部
+        目标文件夹中符合 include 但不在快照中的文件会被删除，其他文件（如缩略图）保留。
+        恢复的文件是复制出来的新文件（修改时间为当前时间），不会与快照共享数据，
+        以免之后原地修改文件时破坏快照
+        """
+        snapshot = self.get(snapshot_id)
+        snapshot_dir = self.root / snapshot_id
+
+        by_folder: Dict[str, List[str]] = {}
+        for rel_path in snapshot['files']:
+            by_folder.setdefault(rel_path.split('/', 1)[0], []).append(rel_path)
+        if folders is not None:
+            missing = set(folders) - set(by_folder)
+            if missing:
+                raise KeyError(', '.join(sorted(missing)))
+            by_folder = {name: by_folder[name] for name in folders}
+
+        stats = {'folders': 0, 'restored': 0, 'removed': 0}
+        for folder_name, rel_paths in sorted(by_folder.items()):
+            folder = target_dir / folder_name
+            folder.mkdir(parents=True, exist_ok=True)
+            keep = {rel_path.split('/', 1)[1] for rel_path in rel_paths}
+            for path in folder.iterdir():
+                if path.is_file() and self.include(path) and path.name not in keep:
+                    path.unlink()
+                    stats['removed'] += 1
+            for rel_path in rel_paths:
+                target = target_dir / rel_path
+                tmp_target = target.with_name(f"tmp_{target.name}")
+                shutil.copyfile(snapshot_dir / rel_path, tmp_target)
+                os.replace(tmp_target, target)
+                stats['restored'] += 1
+            stats['folders'] += 1
+        return stats
+
+    def prune(self, keep: int) -> List[str]:
+        """只保留最近 keep 个快照，返回被删除的快照ID；硬链接的数据在其他快照中仍然保留"""
+        snapshots = self.list_snapshots()
+        removed = [snapshot['id'] for snapshot in snapshots[:max(0, len(snapshots) - keep)]]
+        for snapshot_id in removed:
+            shutil.rmtree(self.root / snapshot_id)
+        return removed
+
+    @staticmethod
+    def disk_usage(path: Path) -> int:
+        """目录实际占用的字节数，硬链接的文件只计一次"""
+        seen = set()
+        total = 0
+        for dirpath, _, filenames in os.walk(path):
+            for name in filenames:
+                stat = os.stat(os.path.join(dirpath, name))
+                if (stat.st_dev, stat.st_ino) not in seen:
+                    seen.add((stat.st_dev, stat.st_ino))
+                    total += stat.st_size
+        return total
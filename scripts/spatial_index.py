@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+经纬度点的空间索引
+将经纬度转换为单位球面上的三维坐标，按固定边长的立方网格分桶，
+支持以公里为单位的半径查询和k近邻查询，可保存到磁盘后直接加载
+
+用法示例：
+    from spatial_index import SpatialIndex
+    index = SpatialIndex.from_dataframe(heritage_df)          # 默认使用 经度/纬度 列
+    positions, distances = index.query_radius(120.63, 31.32, 1.0)
+    positions, distances = index.query_knn(120.63, 31.32, k=3)
+    index.save('heritage_index.npz')
+"""
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371  # 地球平均半径，单位为公里
+MAX_BATCH_PAIRS = 1 << 22  # 批量查询时一次计算的（查询点, 候选点）对数上限
+
+def to_unit_xyz(lons, lats):
+    """
+    将经纬度（十进制度数）转换为单位球面上的三维坐标
+    """
+    lon = np.radians(np.asarray(lons, dtype=float))
+    lat = np.radians(np.asarray(lats, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+def km_to_chord(distance_km):
+    """
+    球面距离（公里）转换为单位球上的弦长
+    """
+    return 2 * np.sin(np.minimum(np.asarray(distance_km, dtype=float), np.pi * EARTH_RADIUS_KM) / (2 * EARTH_RADIUS_KM))
+
+def chord_to_km(chord):
+    """
+    单位球上的弦长转换为球面距离（公里），与Haversine公式结果一致
+    """
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord, dtype=float) / 2, 0, 1))
+
+class SpatialIndex:
+    """
+    单位球面三维坐标上的均匀网格索引
+    positions 为点在原始输入中的位置下标；缺少坐标的点不进入索引
+    """
+
+    def __init__(self, lons, lats, cell_km=1.0):
+        lons = np.asarray(lons, dtype=float)
+        lats = np.asarray(lats, dtype=float)
+        valid = ~(np.isnan(lons) | np.isnan(lats))
+
+        self.size = len(lons)
+        self.cell_km = float(cell_km)
+        self.positions = np.flatnonzero(valid)
+        self.xyz = to_unit_xyz(lons[valid], lats[valid])
+        self._build_buckets()
+
+    def _build_buckets(self):
+        """按网格坐标把点分桶"""
+        self.cell = km_to_chord(self.cell_km)
+        keys = np.floor(self.xyz / self.cell).astype(np.int64)
+        self.buckets = {}
+        if len(keys) == 0:
+            return
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        order = np.argsort(inverse.ravel(), kind='stable')
+        bounds = np.searchsorted(inverse.ravel()[order], np.arange(len(unique_keys) + 1))
+        for i, key in enumerate(map(tuple, unique_keys)):
+            self.buckets[key] = order[bounds[i]:bounds[i + 1]]
+
+        # 批量查询使用的扁平表示：网格坐标按 C 顺序编码为整数（unique_keys 已按字典序排列，编码递增）
+        self._bucket_low = unique_keys.min(axis=0)
+        self._bucket_dims = tuple(unique_keys.max(axis=0) - self._bucket_low + 1)
+        self._bucket_codes = np.ravel_multi_index((unique_keys - self._bucket_low).T, self._bucket_dims)
+        self._bucket_starts = bounds[:-1]
+        self._bucket_sizes = np.diff(bounds)
+        self._max_bucket = int(self._bucket_sizes.max())
+        self._bucket_order = order
+
+    @classmethod
+    def from_dataframe(cls, df, lon_col='经度', lat_col='纬度', cell_km=1.0):
+        """
+        从DataFrame构建索引，坐标列中无法解析为数字的值视为缺失
+        """
+        import pandas as pd
+        return cls(
+            pd.to_numeric(df[lon_col], errors='coerce').to_numpy(dtype=float),
+            pd.to_numeric(df[lat_col], errors='coerce').to_numpy(dtype=float),
+            cell_km=cell_km
+        )
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _candidates(self, point, chord):
+        """
+        返回与查询点弦长不超过 chord 的网格内的候选点（内部下标）
+        需要检查的网格数多于已占用的网格数时直接返回全部点
+        """
+        low = np.floor((point - chord) / self.cell).astype(np.int64)
+        high = np.floor((point + chord) / self.cell).astype(np.int64)
+        span = high - low + 1
+        if np.prod(span.astype(float)) >= len(self.buckets):
+            return np.arange(len(self.xyz))
+
+        found = []
+        for x in range(low[0], high[0] + 1):
+            for y in range(low[1], high[1] + 1):
+                for z in range(low[2], high[2] + 1):
+                    bucket = self.buckets.get((x, y, z))
+                    if bucket is not None:
+                        found.append(bucket)
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(found)
+
+    def query_radius(self, lon, lat, radius_km):
+        """
+        半径查询：返回距离不超过 radius_km 的点的 (位置下标, 距离公里)，按距离升序
+        """
+        if np.isnan(lon) or np.isnan(lat) or len(self.xyz) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        point = to_unit_xyz([lon], [lat])[0]
+        chord = km_to_chord(radius_km)
+        candidates = self._candidates(point, chord)
+        chords = np.linalg.norm(self.xyz[candidates] - point, axis=1)
+        within = chords <= chord
+        candidates, chords = candidates[within], chords[within]
+        order = np.argsort(chords, kind='stable')
+        return self.positions[candidates[order]], chord_to_km(chords[order])
+
+    def query_knn(self, lon, lat, k=1):
+        """
+        k近邻查询：返回最近的 k 个点的 (位置下标, 距离公里)，按距离升序
+        从一个网格边长开始逐步倍增搜索半径，直到半径内至少有 k 个点
+        """
+        if np.isnan(lon) or np.isnan(lat) or len(self.xyz) == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        k = min(k, len(self.xyz))
+        point = to_unit_xyz([lon], [lat])[0]
+        chord = self.cell
+        while True:
+            candidates = self._candidates(point, chord)
+            chords = np.linalg.norm(self.xyz[candidates] - point, axis=1)
+            # 半径内已有 k 个点，或已经检查了全部点
+            if np.count_nonzero(chords <= chord) >= k or len(candidates) == len(self.xyz):
+                break
+            chord *= 2
+
+        order = np.argsort(chords, kind='stable')[:k]
+        return self.positions[candidates[order]], chord_to_km(chords[order])
+
+    def _neighbor_pairs(self, points, reach):
+        """
+        批量收集候选点：每个查询点所在网格及各方向 reach 个网格内的点
+        返回 (查询点下标, 候选点内部下标) 两个等长数组，按查询点、网格坐标的顺序排列
+        """
+        steps = np.arange(-reach, reach + 1)
+        offsets = np.stack(np.meshgrid(steps, steps, steps, indexing='ij'), axis=-1).reshape(-1, 3)
+        cells = np.floor(points / self.cell).astype(np.int64)
+        relative = cells[:, None, :] + offsets[None, :, :] - self._bucket_low
+        inside = np.all((relative >= 0) & (relative < self._bucket_dims), axis=2)
+        query_ids, offset_ids = np.nonzero(inside)
+        codes = np.ravel_multi_index(relative[query_ids, offset_ids].T, self._bucket_dims)
+
+        # 查找已占用的网格
+        slots = np.minimum(np.searchsorted(self._bucket_codes, codes), len(self._bucket_codes) - 1)
+        hit = self._bucket_codes[slots] == codes
+        query_ids, slots = query_ids[hit], slots[hit]
+
+        # 展开为逐点的 (查询点, 候选点) 对
+        sizes = self._bucket_sizes[slots]
+        within_bucket = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        candidates = self._bucket_order[np.repeat(self._bucket_starts[slots], sizes) + within_bucket]
+        return np.repeat(query_ids, sizes), candidates
+
+    def query_knn_batch(self, lons, lats, k=1):
+        """
+        批量k近邻查询：返回形状为 (查询点数, k) 的位置下标与距离
+        不足 k 个结果的位置下标填 -1，距离填 inf
+        与 query_knn 一样逐步倍增搜索半径，每一轮对所有未完成的查询点一次性收集候选点并计算距离；
+        需要检查的网格数多于已占用的网格数时与全部点比较；两种情况都按候选数上限对查询点分块
+        """
+        lons = np.asarray(lons, dtype=float)
+        lats = np.asarray(lats, dtype=float)
+        positions = np.full((len(lons), k), -1, dtype=np.int64)
+        distances = np.full((len(lons), k), np.inf)
+        if len(self.xyz) == 0 or k <= 0:
+            return positions, distances
+
+        needed = min(k, len(self.xyz))
+        queries = np.flatnonzero(~(np.isnan(lons) | np.isnan(lats)))
+        points = to_unit_xyz(lons[queries], lats[queries])
+        chord = self.cell
+        while len(queries):
+            reach = int(np.ceil(chord / self.cell))
+            cells = (2 * reach + 1) ** 3
+            exhaustive = cells >= len(self.buckets)
+            # 每个查询点候选数的上限，按它分块，使每块的（查询点, 候选点）对数不超过 MAX_BATCH_PAIRS
+            per_query = len(self.xyz) if exhaustive else min(len(self.xyz), cells * self._max_bucket)
+            chunk = max(1, MAX_BATCH_PAIRS // per_query)
+            done = np.zeros(len(queries), dtype=bool)
+            for start in range(0, len(queries), chunk):
+                block = slice(start, start + chunk)
+                block_points = points[block]
+                if exhaustive:
+                    pair_query = np.repeat(np.arange(len(block_points)), len(self.xyz))
+                    pair_point = np.tile(np.arange(len(self.xyz)), len(block_points))
+                else:
+                    pair_query, pair_point = self._neighbor_pairs(block_points, reach)
+                chords = np.linalg.norm(block_points[pair_query] - self.xyz[pair_point], axis=1)
+
+                # 半径内已有 k 个点，或已经检查了全部点
+                within = np.bincount(pair_query, weights=chords <= chord, minlength=len(block_points))
+                block_done = (within >= needed) | exhaustive
+                done[block] = block_done
+
+                # 已完成的查询点按距离取前 k 个（lexsort 稳定，等距时保持候选顺序）
+                keep = block_done[pair_query]
+                pair_query, pair_point, chords = pair_query[keep], pair_point[keep], chords[keep]
+                order = np.lexsort((chords, pair_query))
+                pair_query, pair_point, chords = pair_query[order], pair_point[order], chords[order]
+                rank = np.arange(len(pair_query)) - np.searchsorted(pair_query, pair_query)
+                top = rank < k
+                rows = queries[block][pair_query[top]]
+                positions[rows, rank[top]] = self.positions[pair_point[top]]
+                distances[rows, rank[top]] = chord_to_km(chords[top])
+
+            queries, points = queries[~done], points[~done]
+            chord *= 2
+        return positions, distances
+
+    def save(self, path):
+        """
+        保存索引到 .npz 文件
+        """
+        np.savez_compressed(
+            path,
+            xyz=self.xyz,
+            positions=self.positions,
+            size=np.int64(self.size),
+            cell_km=np.float64(self.cell_km)
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        从 save 生成的 .npz 文件加载索引
+        """
+        with np.load(path) as data:
+            index = cls.__new__(cls)
+            index.xyz = data['xyz']
+            index.positions = data['positions']
+            index.size = int(data['size'])
+            index.cell_km = float(data['cell_km'])
+        index._build_buckets()
+        return index
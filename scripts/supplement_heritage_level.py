@@ -7,193 +7,469 @@
 
 import pandas as pd
 import numpy as np
-from math import radians, cos, sin, asin, sqrt
-import re
+import io
 import os
+import argparse
+import json
+import time
+from datetime import datetime
 
-def haversine(lon1, lat1, lon2, lat2):
+from dataset_io import CACHE_DIR, DATASET_DIR, load_cached, load_garden_list
+from keyword_scanner import KeywordAutomaton, resolve_by_precedence
+from name_index import METRICS, NameIndex
+from spatial_index import SpatialIndex
+
+def match_by_name(garden_name, name_index, level="全国", cutoff=0.5, metric='jaccard'):
     """
-    计算两个经纬度点之间的距离（单位：公里）
-    使用Haversine公式
+    通过名称匹配文物保护单位名录
+    在名称n-gram索引中查找相似名称，返回 (是否匹配, 级别, 候选列表)
+    候选列表为 [(位置下标, 匹配的名称, 得分), ...]，按得分降序
     """
-    # 将十进制度数转化为弧度
-    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-    
-    # Haversine公式
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
-    r = 6371  # 地球平均半径，单位为公里
-    return c * r
-
-def match_by_name(garden_name, heritage_df):
-    """
-    通过名称匹配全国重点文物保护单位
-    """
-    # 精确匹配
-    exact_match = heritage_df[heritage_df['名称'] == garden_name]
-    if not exact_match.empty:
-        return True, "全国"
-    
-    # 模糊匹配（去除常见后缀）
-    garden_name_clean = re.sub(r'(园|庄|亭|堂|寺|塔|楼|阁|轩|斋|居|室|舫|榭|廊|桥|池|湖|山|石|峰|洞|泉|井|台|坛|祠|庙|观|院|馆|所|厅|房|屋|宅|府|第|里|巷|街|路|道|桥|门|城|墙|关|口|渡|码头|市场|广场|公园|花园|别墅|山庄|度假村|酒店|宾馆|饭店|餐厅|茶楼|会所|俱乐部|中心|基地|园区|景区|风景区|旅游区|保护区|遗址|故居|纪念馆|博物馆|展览馆|文化馆|图书馆|档案馆|研究所|学校|大学|学院|医院|诊所|银行|商店|超市|市场|工厂|公司|企业|机关|政府|委员会|办公室|部门|局|处|科|股|组|队|站|所|中心|基地|园区|景区|风景区|旅游区|保护区)$', '', garden_name)
+    candidates = name_index.query(garden_name, cutoff=cutoff, metric=metric)
+    if candidates:
+        return True, level, candidates
     
-    fuzzy_matches = heritage_df[heritage_df['名称'].str.contains(garden_name_clean, na=False)]
-    if not fuzzy_matches.empty:
-        return True, "全国"
-    
-    return False, None
+    return False, None, candidates
 
-def match_by_location(garden_lon, garden_lat, heritage_df, threshold_km=1.0):
+def match_by_location(suzhou_df, heritage_df, threshold_km=1.0, top_k=3, site_index=None, level="全国"):
     """
-    通过经纬度匹配全国重点文物保护单位
+    通过经纬度匹配文物保护单位名录
+    用空间索引为每个园林查找最近的 top_k 个文保单位，返回与 suzhou_df 同索引的 DataFrame：
+    matched（最近者是否在阈值内）、level、nearest_name（最近文保单位）、distance_km（距离）、
+    candidates（[(名称, 距离), ...]，按距离升序）
     """
-    if pd.isna(garden_lon) or pd.isna(garden_lat):
-        return False, None
-    
-    # 计算与所有文保单位的距离
-    distances = []
-    for _, row in heritage_df.iterrows():
-        if pd.notna(row['经度']) and pd.notna(row['纬度']):
-            distance = haversine(garden_lon, garden_lat, row['经度'], row['纬度'])
-            distances.append(distance)
-        else:
-            distances.append(float('inf'))
-    
-    min_distance = min(distances)
-    if min_distance <= threshold_km:
-        return True, "全国（地点推测）"
-    
-    return False, None
+    if site_index is None:
+        site_index = SpatialIndex.from_dataframe(heritage_df)
+
+    positions, distances = site_index.query_knn_batch(
+        pd.to_numeric(suzhou_df['经度'], errors='coerce'),
+        pd.to_numeric(suzhou_df['纬度'], errors='coerce'),
+        k=max(top_k, 1)
+    )
+
+    site_names = heritage_df['名称'].to_numpy(dtype=object)
+    candidates = [
+        [(site_names[pos], dist) for pos, dist in zip(row_pos, row_dist) if pos >= 0]
+        for row_pos, row_dist in zip(positions[:, :top_k], distances[:, :top_k])
+    ]
+
+    found = positions[:, 0] >= 0
+    nearest_name = np.full(len(positions), None, dtype=object)
+    nearest_name[found] = site_names[positions[found, 0]]
+    matched = distances[:, 0] <= threshold_km
+
+    return pd.DataFrame({
+        'matched': matched,
+        'level': np.where(matched, f"{level}（地点推测）", None),
+        'nearest_name': nearest_name,
+        'distance_km': np.where(found, distances[:, 0], np.nan),
+        'candidates': candidates
+    }, index=suzhou_df.index)
+
+# 文物保护单位级别关键字
+LEVEL_KEYWORDS = {
+    "全国重点文物保护单位": "全国",
+    "国家重点文物保护单位": "全国",
+    "省级文物保护单位": "省级",
+    "市级文物保护单位": "市级",
+    "县级文物保护单位": "县级",
+    "区级文物保护单位": "区级",
+    "文物保护单位": "文物保护单位"
+}
+
+# 额外关键字，可通过 --extra-keyword 关键字=级别 追加
+EXTRA_KEYWORDS = {
+    "世界文化遗产": "世界遗产",
+    "世界遗产名录": "世界遗产",
+    "控制保护建筑": "控制保护建筑"
+}
+
+# 同一描述命中多个级别时的取值优先级；不在其中的命中（如世界遗产）只记录不定级
+LEVEL_PRECEDENCE = ("全国", "省级", "市级", "县级", "区级", "文物保护单位", "控制保护建筑")
+
+def build_description_automaton(extra_keywords=None):
+    """
+    由级别关键字和额外关键字构建描述扫描自动机
+    """
+    keywords = dict(LEVEL_KEYWORDS)
+    keywords.update(EXTRA_KEYWORDS if extra_keywords is None else extra_keywords)
+    return KeywordAutomaton(keywords)
 
-def search_in_description(description):
+def search_in_description(descriptions, automaton, precedence=LEVEL_PRECEDENCE):
     """
     在描述中搜索文物保护单位相关关键字
+    单遍扫描全部描述，返回 (级别列表, 命中列表)，两者与输入等长；
+    命中为 [(位置, 关键字, 级别), ...]，级别按 precedence 从命中中选出
     """
-    if pd.isna(description):
-        return None
-    
-    # 定义文物保护单位级别关键字
-    patterns = {
-        "全国重点文物保护单位": "全国",
-        "国家重点文物保护单位": "全国", 
-        "省级文物保护单位": "省级",
-        "市级文物保护单位": "市级",
-        "县级文物保护单位": "县级",
-        "区级文物保护单位": "区级",
-        "文物保护单位": "文物保护单位"
-    }
-    
-    for pattern, level in patterns.items():
-        if pattern in description:
-            return level
-    
-    return None
+    hits = automaton.scan(descriptions)
+    levels = [resolve_by_precedence(text_hits, precedence) for text_hits in hits]
+    return levels, hits
+
+# 名录中可能使用的列名，统一为 名称/经度/纬度
+REGISTRY_COLUMNS = {
+    '名称': ('名称', '单位名称', '文物名称', '文保单位名称'),
+    '经度': ('经度', 'lng', 'lon', 'longitude'),
+    '纬度': ('纬度', 'lat', 'latitude')
+}
+
+# 解析结果缓存的格式版本，修改 normalize_registry 或索引结构时需递增
+REGISTRY_CACHE_VERSION = 3
+
+def normalize_registry(df, path):
+    """
+    把名录统一为 名称/经度/纬度 三列：名称去除首尾空白，坐标转换为数值
+    """
+    normalized = {}
+    for column, aliases in REGISTRY_COLUMNS.items():
+        source = next((alias for alias in aliases if alias in df.columns), None)
+        if source is None:
+            if column == '名称':
+                raise ValueError(f"{path} 缺少名称列（可用列名：{'、'.join(aliases)}）")
+            normalized[column] = np.nan
+        elif column == '名称':
+            normalized[column] = df[source].astype(str).str.strip()
+        else:
+            normalized[column] = pd.to_numeric(df[source], errors='coerce')
+    return pd.DataFrame(normalized, index=df.index).reset_index(drop=True)
+
+class HeritageRegistry:
+    """
+    一份带级别标记的文物保护单位名录，以及在其上构建的名称索引和空间索引
+    """
+
+    def __init__(self, path, level, df, name_index=None, site_index=None):
+        self.path = path
+        self.level = level
+        self.label = os.path.splitext(os.path.basename(path))[0]
+        self.df = df
+        self.name_index = name_index if name_index is not None else NameIndex.from_dataframe(df)
+        self.site_index = site_index if site_index is not None else SpatialIndex.from_dataframe(df)
+        self.from_cache = False
+
+    @classmethod
+    def load(cls, path, level, cache_dir=None):
+        """
+        读取名录；cache_dir 不为空时，解析和建索引的结果经 dataset_io.load_cached 按文件内容哈希缓存，
+        文件未变化的重复运行直接加载缓存，跳过CSV解析和编码回退
+        """
+        def parse(text):
+            df = normalize_registry(pd.read_csv(io.StringIO(text)), path)
+            return {'df': df, 'name_index': NameIndex.from_dataframe(df),
+                    'site_index': SpatialIndex.from_dataframe(df)}
+
+        cached, source = load_cached(path, f"registry-v{REGISTRY_CACHE_VERSION}", parse, cache_dir)
+        registry = cls(path, level, cached['df'], cached['name_index'], cached['site_index'])
+        registry.from_cache = source['from_cache']
+        return registry
+
+def parse_registry_arg(value):
+    """
+    解析 --registry 参数：路径:级别（级别省略时为“全国”）
+    """
+    path, sep, level = value.rpartition(':')
+    if not sep or not path or os.path.sep in level:
+        return value, "全国"
+    return path, level
+
+def level_rank(levels):
+    """
+    把级别数组转换为优先级序号（越小越优先），空值和未知级别排在最后
+    """
+    order = {level: rank for rank, level in enumerate(LEVEL_PRECEDENCE)}
+    return np.array([order.get(level, len(LEVEL_PRECEDENCE)) if level is not None else np.inf
+                     for level in levels], dtype=float)
+
+def match_names(names, registry, cutoff=0.5, metric='jaccard', ambiguity_margin=0.05):
+    """
+    对一份名录批量做名称匹配（NameIndex.query_batch 一次查询全部名称），返回与 names 等长的 DataFrame：
+    matched、level、detail（最佳匹配及得分）、ambiguous（前两名得分差不超过 ambiguity_margin）
+    """
+    results = registry.name_index.query_batch(names, cutoff=cutoff, metric=metric)
+    matched = np.array([bool(candidates) for candidates in results], dtype=bool)
+    detail = np.full(len(names), None, dtype=object)
+    ambiguous = np.full(len(names), None, dtype=object)
+    for i in np.flatnonzero(matched):
+        candidates = results[i]
+        _, matched_name, score = candidates[0]
+        detail[i] = f"{matched_name}（{score:.2f}）"
+        if (len(candidates) > 1 and candidates[1][1] != matched_name
+                and score - candidates[1][2] <= ambiguity_margin):
+            ambiguous[i] = [f"{alias}（{alias_score:.2f}）" for _, alias, alias_score in candidates]
+    return pd.DataFrame({
+        'matched': matched,
+        'level': np.where(matched, registry.level, None),
+        'detail': detail,
+        'ambiguous': ambiguous
+    })
+
+def pick_best(results, levels):
+    """
+    在多份名录的同一种匹配结果中，按名录级别的优先级为每个园林选出最佳名录
+    返回 (是否有匹配, 最佳名录下标)
+    """
+    if not results:
+        return np.zeros(0, dtype=bool), np.zeros(0, dtype=np.int64)
+    ranks = level_rank(levels)
+    stacked = np.vstack([np.where(result['matched'].to_numpy(), rank, np.inf)
+                         for result, rank in zip(results, ranks)])
+    return np.isfinite(stacked.min(axis=0)), np.argmin(stacked, axis=0)
 
-def supplement_heritage_level(suzhou_csv_path, heritage_csv_path, output_csv_path):
+def take_by_registry(results, column, best):
+    """
+    按每个园林的最佳名录下标，从各名录结果中取出某一列
+    """
+    stacked = np.vstack([result[column].to_numpy(dtype=object) for result in results])
+    return stacked[best, np.arange(stacked.shape[1])]
+
+def supplement_heritage_level(suzhou_csv_path, registries, output_csv_path, threshold_km=1.0, top_k=3,
+                              name_cutoff=0.5, name_metric='jaccard', extra_keywords=None, report_path=None,
+                              cache_dir=CACHE_DIR):
     """
     主函数：补充文保单位级别
+    registries 为 HeritageRegistry 列表，可同时使用全国、省级、市级等多份名录。
+    名称、地点、描述三种匹配都按整列计算，再按“名称 > 地点 > 描述、同种匹配按级别优先级”
+    一次性合并写入；匹配统计、各阶段耗时和存疑情况写入JSON报告。
+    园林名录按 dataset_io 的表结构读取，cache_dir 为解析结果缓存目录（None 时不缓存）
     """
+    timings = {}
+    start = time.perf_counter()
     print("正在读取数据文件...")
     
     # 读取苏州园林数据
-    try:
-        suzhou_df = pd.read_csv(suzhou_csv_path, encoding='utf-8')
-    except UnicodeDecodeError:
-        suzhou_df = pd.read_csv(suzhou_csv_path, encoding='gbk')
-    
-    # 读取全国重点文物保护单位数据
-    try:
-        heritage_df = pd.read_csv(heritage_csv_path, encoding='utf-8')
-    except UnicodeDecodeError:
-        heritage_df = pd.read_csv(heritage_csv_path, encoding='gbk')
+    suzhou_df = load_garden_list(suzhou_csv_path, cache_dir)
+    timings['load'] = time.perf_counter() - start
     
-    print(f"苏州园林数据：{len(suzhou_df)} 条记录")
-    print(f"全国重点文物保护单位数据：{len(heritage_df)} 条记录")
-    
-    # 添加文保单位级别列
-    suzhou_df['文保单位级别'] = None
-    
-    # 统计匹配结果
-    name_matches = 0
-    location_matches = 0
-    description_matches = 0
-    no_matches = 0
+    source = "（缓存）" if suzhou_df.attrs['source']['from_cache'] else ""
+    print(f"苏州园林数据：{len(suzhou_df)} 条记录{source}")
+    for registry in registries:
+        source = "（缓存）" if registry.from_cache else ""
+        print(f"{registry.level}名录 {registry.label}：{len(registry.df)} 条记录{source}")
     
     print("\n开始匹配处理...")
-    
-    for idx, row in suzhou_df.iterrows():
-        garden_name = row['名称']
-        garden_lon = row['经度']
-        garden_lat = row['纬度']
-        description = row['描述']
-        
-        print(f"处理第 {idx+1}/{len(suzhou_df)} 个：{garden_name}")
-        
-        # 1. 名称匹配
-        name_matched, name_level = match_by_name(garden_name, heritage_df)
-        if name_matched:
-            suzhou_df.at[idx, '文保单位级别'] = name_level
-            name_matches += 1
-            print(f"  ✓ 名称匹配成功：{name_level}")
-            continue
-        
-        # 2. 经纬度匹配
-        location_matched, location_level = match_by_location(garden_lon, garden_lat, heritage_df)
-        if location_matched:
-            suzhou_df.at[idx, '文保单位级别'] = location_level
-            location_matches += 1
-            print(f"  ✓ 地点匹配成功：{location_level}")
-            continue
-        
-        # 3. 描述关键字搜索
-        desc_level = search_in_description(description)
-        if desc_level:
-            suzhou_df.at[idx, '文保单位级别'] = desc_level
-            description_matches += 1
-            print(f"  ✓ 描述匹配成功：{desc_level}")
-            continue
-        
-        # 未匹配到
-        no_matches += 1
-        print(f"  ✗ 未找到匹配")
+    names = suzhou_df['名称'].tolist()
+    labels = np.array([registry.label for registry in registries], dtype=object)
+
+    # 1. 名称匹配
+    start = time.perf_counter()
+    name_results = [match_names(names, registry, name_cutoff, name_metric) for registry in registries]
+    timings['name'] = time.perf_counter() - start
+
+    # 2. 经纬度匹配
+    start = time.perf_counter()
+    location_results = [
+        match_by_location(suzhou_df, registry.df, threshold_km, top_k, registry.site_index, registry.level)
+        .reset_index(drop=True)
+        for registry in registries
+    ]
+    timings['location'] = time.perf_counter() - start
+
+    # 3. 描述关键字搜索
+    start = time.perf_counter()
+    description_levels, description_hits = search_in_description(
+        suzhou_df['描述'].tolist(), build_description_automaton(extra_keywords)
+    )
+    description_levels = np.array(description_levels, dtype=object)
+    timings['description'] = time.perf_counter() - start
+
+    # 合并：名称 > 地点 > 描述
+    start = time.perf_counter()
+    registry_levels = np.array([registry.level for registry in registries], dtype=object)
+    name_any, name_best = pick_best(name_results, registry_levels)
+    location_any, location_best = pick_best(location_results, registry_levels)
+    location_found = location_any.copy()
+    description_any = np.array([level is not None for level in description_levels], dtype=bool)
+    location_any &= ~name_any
+    description_any &= ~(name_any | location_any)
+
+    if registries:
+        name_level = take_by_registry(name_results, 'level', name_best)
+        location_level = take_by_registry(location_results, 'level', location_best)
+    else:
+        name_level = location_level = np.full(len(suzhou_df), None, dtype=object)
+
+    suzhou_df['文保单位级别'] = np.select(
+        [name_any, location_any, description_any],
+        [name_level, location_level, description_levels],
+        default=None
+    )
+    suzhou_df['匹配方式'] = np.select(
+        [name_any, location_any, description_any], ["名称", "地点", "描述"], default=None
+    )
+    suzhou_df['级别来源'] = np.select(
+        [name_any, location_any, description_any],
+        [labels[name_best] if registries else None, labels[location_best] if registries else None, "描述"],
+        default=None
+    )
+
+    # 各名录的全部命中
+    details = [[] for _ in range(len(suzhou_df))]
+    for registry, name_result, location_result in zip(registries, name_results, location_results):
+        for i in np.flatnonzero(name_result['matched'].to_numpy()):
+            details[i].append(f"{registry.level}/名称：{name_result.at[i, 'detail']}")
+        for i in np.flatnonzero(location_result['matched'].to_numpy()):
+            details[i].append(f"{registry.level}/地点：{location_result.at[i, 'nearest_name']}"
+                              f"（{location_result.at[i, 'distance_km']:.2f}公里）")
+    suzhou_df['匹配详情'] = ["；".join(items) or None for items in details]
+    suzhou_df['描述关键字'] = [
+        "；".join(f"{keyword}@{offset}" for offset, keyword, _ in hits) for hits in description_hits
+    ]
+
+    # 所有名录中的最近文保单位及候选
+    nearest = [
+        sorted((dist, name) for results in location_results for name, dist in results.at[i, 'candidates'])
+        for i in range(len(suzhou_df))
+    ]
+    suzhou_df['最近文保单位'] = [items[0][1] if items else None for items in nearest]
+    suzhou_df['最近距离（公里）'] = [round(items[0][0], 3) if items else np.nan for items in nearest]
+    if top_k > 1:
+        suzhou_df['候选文保单位'] = [
+            "；".join(f"{name}（{dist:.2f}公里）" for dist, name in items[:top_k]) for items in nearest
+        ]
+
+    # 存疑情况：名称候选得分接近、名称与地点推测的级别不同、描述中的级别与结果不同
+    ambiguous = []
+    if registries:
+        name_location_conflict = (name_any & location_found
+                                  & (registry_levels[name_best] != registry_levels[location_best]))
+        chosen_level = np.select([name_any, location_any],
+                                 [registry_levels[name_best], registry_levels[location_best]], default=None)
+    else:
+        name_location_conflict = np.zeros(len(suzhou_df), dtype=bool)
+        chosen_level = np.full(len(suzhou_df), None, dtype=object)
+    # 只有描述中给出了具体级别（而不是笼统的“文物保护单位”等）时才与匹配结果比较
+    specific_rank = LEVEL_PRECEDENCE.index("文物保护单位")
+    description_conflict = ((name_any | location_any) & (level_rank(description_levels) < specific_rank)
+                            & (description_levels != chosen_level))
+    for i, name in enumerate(names):
+        reasons = []
+        for registry, name_result in zip(registries, name_results):
+            if name_result.at[i, 'ambiguous']:
+                reasons.append({'type': '名称候选接近', 'registry': registry.label,
+                                'candidates': name_result.at[i, 'ambiguous']})
+        if name_location_conflict[i]:
+            reasons.append({'type': '名称与地点级别不一致', 'name_level': name_level[i],
+                            'location_level': location_level[i]})
+        if description_conflict[i]:
+            reasons.append({'type': '描述级别与匹配结果不一致', 'description_level': description_levels[i],
+                            'result': chosen_level[i]})
+        if reasons:
+            ambiguous.append({'名称': name, 'reasons': reasons})
+    timings['combine'] = time.perf_counter() - start
     
     # 保存结果
+    start = time.perf_counter()
     print(f"\n正在保存结果到：{output_csv_path}")
     suzhou_df.to_csv(output_csv_path, index=False, encoding='utf-8-sig')
+    timings['write'] = time.perf_counter() - start
+
+    counts = {
+        'total': len(suzhou_df),
+        'by_method': {method: int(np.count_nonzero(mask)) for method, mask in
+                      (("名称", name_any), ("地点", location_any), ("描述", description_any))},
+        'unmatched': int(np.count_nonzero(~(name_any | location_any | description_any))),
+        'by_level': {str(k): int(v) for k, v in suzhou_df['文保单位级别'].value_counts().items()},
+        'by_source': {str(k): int(v) for k, v in suzhou_df['级别来源'].value_counts().items()}
+    }
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'inputs': {
+            'gardens': suzhou_csv_path,
+            'registries': [
+                {'label': registry.label, 'level': registry.level, 'path': registry.path,
+                 'records': len(registry.df), 'from_cache': registry.from_cache}
+                for registry in registries
+            ],
+            'threshold_km': threshold_km,
+            'name_cutoff': name_cutoff,
+            'name_metric': name_metric
+        },
+        'counts': counts,
+        'timings_ms': {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()},
+        'ambiguous': ambiguous
+    }
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
     
     # 输出统计结果
     print("\n=== 匹配统计结果 ===")
-    print(f"名称匹配：{name_matches} 条")
-    print(f"地点匹配：{location_matches} 条")
-    print(f"描述匹配：{description_matches} 条")
-    print(f"未匹配：{no_matches} 条")
-    print(f"总计：{len(suzhou_df)} 条")
+    for method, count in counts['by_method'].items():
+        print(f"{method}匹配：{count} 条")
+    print(f"未匹配：{counts['unmatched']} 条")
+    print(f"总计：{counts['total']} 条")
+    print(f"存疑：{len(ambiguous)} 条")
     
     # 显示各级别统计
     print("\n=== 文保单位级别统计 ===")
-    level_counts = suzhou_df['文保单位级别'].value_counts()
-    for level, count in level_counts.items():
+    for level, count in counts['by_level'].items():
         print(f"{level}：{count} 条")
+
+    # 显示各来源统计
+    print("\n=== 级别来源统计 ===")
+    for label, count in counts['by_source'].items():
+        print(f"{label}：{count} 条")
+
+    print("\n=== 各阶段耗时 ===")
+    for stage, ms in report['timings_ms'].items():
+        print(f"{stage}：{ms} 毫秒")
     
     print(f"\n处理完成！结果已保存到：{output_csv_path}")
+    if report_path:
+        print(f"匹配报告已保存到：{report_path}")
+    return report
 
 if __name__ == "__main__":
     # 文件路径
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    suzhou_csv = os.path.join(base_dir, "dataset", "SuzhouGardenList.csv")
-    heritage_csv = os.path.join(base_dir, "dataset", "全国重点文物保护单位名单.csv")
-    output_csv = os.path.join(base_dir, "dataset", "SuzhouGardenList_补充文保级别.csv")
+    suzhou_csv = str(DATASET_DIR / "SuzhouGardenList.csv")
+    heritage_csv = str(DATASET_DIR / "全国重点文物保护单位名单.csv")
+    output_csv = str(DATASET_DIR / "SuzhouGardenList_补充文保级别.csv")
+    report_json = str(DATASET_DIR / "SuzhouGardenList_补充文保级别_report.json")
+
+    parser = argparse.ArgumentParser(description='根据文物保护单位名录补充园林的文保单位级别')
+    parser.add_argument('--registry', action='append', default=[], metavar='路径:级别',
+                        help='文保单位名录及其级别，可重复，如 dataset/江苏省文物保护单位名单.csv:省级'
+                             '（默认仅使用全国重点文物保护单位名单）')
+    parser.add_argument('--cache-dir', default=str(CACHE_DIR),
+                        help='名录和园林名录解析结果的缓存目录（默认 scripts/.frame_cache）')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='不使用名录和园林名录的缓存，重新解析CSV')
+    parser.add_argument('--threshold-km', type=float, default=1.0,
+                        help='地点匹配的距离阈值（公里，默认1.0）')
+    parser.add_argument('--top-k', type=int, default=3,
+                        help='每个园林记录的最近文保单位候选数（默认3）')
+    parser.add_argument('--name-cutoff', type=float, default=0.5,
+                        help='名称匹配的最低相似度（0-1，默认0.5）')
+    parser.add_argument('--name-metric', choices=METRICS, default='jaccard',
+                        help='名称相似度度量（默认 jaccard）')
+    parser.add_argument('--report', default=report_json,
+                        help='匹配报告（JSON）输出路径（默认 dataset/SuzhouGardenList_补充文保级别_report.json）')
+    parser.add_argument('--extra-keyword', action='append', default=[], metavar='关键字=级别',
+                        help='追加描述扫描关键字，可重复；级别不在优先级表中的命中只记录不定级')
+    args = parser.parse_args()
+
+    extra_keywords = dict(EXTRA_KEYWORDS)
+    for entry in args.extra_keyword:
+        keyword, _, level = entry.partition('=')
+        extra_keywords[keyword] = level or keyword
+
+    registry_specs = [parse_registry_arg(value) for value in args.registry] or [(heritage_csv, "全国")]
     
     # 检查文件是否存在
     if not os.path.exists(suzhou_csv):
         print(f"错误：找不到文件 {suzhou_csv}")
         exit(1)
     
-    if not os.path.exists(heritage_csv):
-        print(f"错误：找不到文件 {heritage_csv}")
-        exit(1)
+    for path, _ in registry_specs:
+        if not os.path.exists(path):
+            print(f"错误：找不到文件 {path}")
+            exit(1)
+
+    registries = [
+        HeritageRegistry.load(path, level, None if args.no_cache else args.cache_dir)
+        for path, level in registry_specs
+    ]
     
     # 执行补充处理
-    supplement_heritage_level(suzhou_csv, heritage_csv, output_csv)
\ No newline at end of file
+    supplement_heritage_level(suzhou_csv, registries, output_csv, args.threshold_km, args.top_k,
+                              args.name_cutoff, args.name_metric, extra_keywords, args.report,
+                              None if args.no_cache else args.cache_dir)
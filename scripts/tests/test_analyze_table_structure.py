@@ -0,0 +1,74 @@
+import itertools
+import random
+
+from analyze_table_structure import (LayoutLSHIndex, analyze_content, fold_structures, generate_report,
+                                     group_structure_families, new_structure_stats)
+
+
+def _index(signatures, num_perm, bands):
+    """签名直接作为特征集合传入，便于构造指定的分桶"""
+    index = LayoutLSHIndex(num_perm=num_perm, bands=bands)
+    index.minhash = lambda shingles: tuple(shingles)
+    for key, signature in signatures.items():
+        index.add(key, signature)
+    return index
+
+
+def _families(index, threshold):
+    return sorted(sorted(members) for members in index.families(threshold))
+
+
+def test_similar_members_merge_even_when_bucket_head_differs():
+    # head 与 x、y 只共享第一个分段，x 与 y 的相似度为 0.75
+    index = _index({'head': (1, 2, 3, 4), 'x': (1, 2, 5, 6), 'y': (1, 2, 5, 7)}, num_perm=4, bands=2)
+    assert _families(index, 0.7) == [['head'], ['x', 'y']]
+
+
+def test_families_match_brute_force_over_candidate_pairs():
+    rng = random.Random(3)
+    signatures = {f"s{i}": tuple(rng.randrange(3) for _ in range(8)) for i in range(40)}
+    index = _index(signatures, num_perm=8, bands=4)
+    threshold = 0.6
+
+    parent = {key: key for key in signatures}
+
+    def find(key):
+        while parent[key] != key:
+            key = parent[key]
+        return key
+
+    for a, b in itertools.combinations(signatures, 2):
+        shares_band = any(signatures[a][i:i + 2] == signatures[b][i:i + 2] for i in range(0, 8, 2))
+        if shares_band and index.similarity(a, b) >= threshold:
+            parent[find(b)] = find(a)
+    expected = {}
+    for key in signatures:
+        expected.setdefault(find(key), []).append(key)
+
+    assert _families(index, threshold) == sorted(sorted(members) for members in expected.values())
+
+
+def _table(values):
+    rows = ''.join(f'<tr><td>字段</td><td>{value}</td></tr>' for value in values)
+    return f'<table><tr><td>名称</td><td>内容</td></tr>{rows}</table>'
+
+
+def test_family_fields_aggregate_type_counts_of_all_members():
+    # 同一种表格多一行即成为另一个结构：单看较小的结构第2列是整数，整个家族则以文本为主
+    small = ['1', '2', '3', '4', '5', '6', '甲', '乙', '丙']
+    large = ['7', '8'] + ['丁'] * 8
+    structure_stats = new_structure_stats()
+    fold_structures(structure_stats, 'a', analyze_content(_table(small)))
+    fold_structures(structure_stats, 'b', analyze_content(_table(large)))
+    assert len(structure_stats) == 2
+
+    families = group_structure_families(structure_stats)
+    assert len(families) == 1
+    field = families[0]['fields'][1]
+    assert field['type'] == 'text'
+    assert field['type_distribution'] == {'text': 11, 'integer': 8}
+
+    report = generate_report(structure_stats, 2, families)
+    per_structure = {info['examples'][0]: info['fields'][1]['type'] for info in report['structures']}
+    assert per_structure == {'a': 'integer', 'b': 'text'}
+    assert all(info['family_id'] == families[0]['family_id'] for info in report['structures'])
@@ -0,0 +1,87 @@
+import itertools
+import random
+
+import numpy as np
+
+from district_topology import (build_arcs, crossing_arcs, degenerate_arcs, ring_points,
+                               simplify, triangle_area, visvalingam_weights)
+
+
+def brute_weights(arc):
+    """逐个移除当前面积最小的内部顶点（面积相同时先移除下标小的）"""
+    weights = [float('inf')] * len(arc)
+    alive = list(range(len(arc)))
+    max_area = 0.0
+    while len(alive) > 2:
+        area, index = min((triangle_area(arc[alive[k - 1]], arc[alive[k]], arc[alive[k + 1]]), alive[k])
+                          for k in range(1, len(alive) - 1))
+        max_area = max(max_area, area)
+        weights[index] = max_area
+        alive.remove(index)
+    return weights
+
+
+def test_visvalingam_matches_brute_force():
+    rng = random.Random(2)
+    for _ in range(50):
+        arc = [(rng.randint(0, 20), rng.randint(0, 20)) for _ in range(rng.randint(2, 12))]
+        np.testing.assert_array_equal(visvalingam_weights(arc), brute_weights(arc))
+
+
+def _orientation(a, b, c):
+    return np.sign((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]))
+
+
+def _on_segment(a, b, p):
+    return min(a[0], b[0]) <= p[0] <= max(a[0], b[0]) and min(a[1], b[1]) <= p[1] <= max(a[1], b[1])
+
+
+def segments_cross(a, b, c, d):
+    if {a, b} & {c, d}:
+        return False
+    o1, o2, o3, o4 = _orientation(a, b, c), _orientation(a, b, d), _orientation(c, d, a), _orientation(c, d, b)
+    if o1 != o2 and o3 != o4:
+        return True
+    return ((o1 == 0 and _on_segment(a, b, c)) or (o2 == 0 and _on_segment(a, b, d))
+            or (o3 == 0 and _on_segment(c, d, a)) or (o4 == 0 and _on_segment(c, d, b)))
+
+
+def brute_crossings(arcs):
+    segments = [(arc_id, tuple(p), tuple(q)) for arc_id, points in enumerate(arcs)
+                for p, q in zip(points[:-1].tolist(), points[1:].tolist())]
+    bad = set()
+    for (i, a, b), (j, c, d) in itertools.combinations(segments, 2):
+        if segments_cross(a, b, c, d):
+            bad.update((i, j))
+    return bad
+
+
+def test_crossing_arcs_matches_brute_force():
+    rng = random.Random(4)
+    for _ in range(100):
+        arcs = [np.array([(rng.randint(0, 8), rng.randint(0, 8)) for _ in range(rng.randint(2, 4))])
+                for _ in range(rng.randint(1, 4))]
+        arcs = [arc for arc in arcs if not (arc[1:] == arc[:-1]).all(axis=1).any()]
+        assert crossing_arcs(arcs) == brute_crossings(arcs)
+
+
+def test_simplify_repairs_collapsed_rings_and_keeps_shared_boundary():
+    # 两个相邻区域共享一条锯齿状边界，外侧各是一条弧段
+    shared = [(10, 0), (11, 2), (9, 4), (11, 6), (9, 8), (10, 10)]
+    left = [(0, 0)] + shared + [(0, 10), (-1, 5)]
+    right = [(20, 10), (10, 10)] + shared[::-1][1:-1] + [(10, 0), (20, 0), (21, 5)]
+    arcs, references = build_arcs([[[left]], [[right]]])
+    weights = [visvalingam_weights(arc) for arc in arcs]
+
+    simplified, rounds, repaired = simplify(arcs, weights, references, float('inf'))
+    assert rounds > 0 and repaired > 0
+    assert crossing_arcs(simplified) == set()
+    assert degenerate_arcs(references, simplified) == set()
+
+    # 公共边界只存一次，两侧以相反方向引用同一弧段
+    left_refs, right_refs = references[0][0][0], references[1][0][0]
+    shared_ids = {ref if ref >= 0 else ~ref for ref in left_refs} & {ref if ref >= 0 else ~ref for ref in right_refs}
+    assert len(shared_ids) == 1
+    for polygons in references:
+        points = ring_points(polygons[0][0], simplified)
+        assert (points[0] == points[-1]).all()
@@ -0,0 +1,78 @@
+import extract_table_records
+from extract_table_records import coerce_value, extract_records
+
+
+def test_coerce_value_strips_thousands_separators():
+    assert coerce_value('面积（㎡）', '约52,000平方米') == 52000.0
+    assert coerce_value('面积（㎡）', '1，234,567.5') == 1234567.5
+    assert coerce_value('公布批次', '第1批') == 1
+
+
+def test_coerce_value_keeps_separate_numbers():
+    # 逗号后不是三位数字时不是千分位，只取第一个数字
+    assert coerce_value('经度', '120.62,31.31') == 120.62
+    assert coerce_value('面积（㎡）', '无') is None
+    assert coerce_value('名称', '拙政园') == '拙政园'
+
+
+def _table(*rows):
+    return '<table>' + ''.join(
+        '<tr>' + ''.join(f'<td>{cell}</td>' for cell in row) + '</tr>' for row in rows
+    ) + '</table>'
+
+
+def test_same_layout_with_different_labels_recompiles_extractor():
+    items = [
+        {'name': '拙政园', 'content_html': _table(['名称', '拙政园'], ['面积', '约52,000平方米'])},
+        {'name': '留园', 'content_html': _table(['地址', '东北街178号'], ['建造年代', '明'])},
+    ]
+    stats = {}
+    records = list(extract_records(items, stats=stats))
+    assert records == [
+        {'名称': '拙政园', '面积（㎡）': 52000.0},
+        {'地址': '东北街178号', '建造年代': '明', '名称': '留园'},
+    ]
+    assert stats['extractors'] == 2
+
+
+def test_same_layout_and_labels_reuses_extractor():
+    items = [
+        {'name': name, 'content_html': _table(['名称', name], ['建造年代', era])}
+        for name, era in [('拙政园', '明'), ('留园', '明'), ('网师园', '南宋')]
+    ]
+    stats = {}
+    records = list(extract_records(items, stats=stats))
+    assert [record['建造年代'] for record in records] == ['明', '明', '南宋']
+    assert stats['extractors'] == 1
+
+
+def test_reused_extractor_only_checks_anchor_labels(monkeypatch):
+    items = [
+        {'name': name, 'content_html': _table(['名称', name, '面积', '500'], ['建造年代', '明', '备注', '无'])}
+        for name in ('拙政园', '留园', '网师园')
+    ]
+    first = list(extract_records(items[:1]))
+    assert first == [{'名称': '拙政园', '面积（㎡）': 500.0, '建造年代': '明'}]
+
+    calls = []
+    normalize = extract_table_records.normalize_label
+    monkeypatch.setattr(extract_table_records, 'normalize_label', lambda text: calls.append(text) or normalize(text))
+    list(extract_records(items[:1]))
+    compile_calls = len(calls)
+    stats = {}
+    list(extract_records(items, stats=stats))
+    # 之后的每个表格只核对 3 个字段标签，不再扫描全部单元格
+    assert stats['extractors'] == 1
+    assert len(calls) - compile_calls == compile_calls + 2 * 3
+
+
+def test_label_drift_recompiles_only_when_anchor_labels_change():
+    items = [
+        {'name': '拙政园', 'content_html': _table(['名称', '拙政园'], ['面积', '1,000'])},
+        {'name': '留园', 'content_html': _table(['名称', '留园'], ['地址', '留园路'])},
+        {'name': '网师园', 'content_html': _table(['名称', '网师园'], ['地址', '带城桥路'])},
+    ]
+    stats = {}
+    records = list(extract_records(items, stats=stats))
+    assert records[1:] == [{'名称': '留园', '地址': '留园路'}, {'名称': '网师园', '地址': '带城桥路'}]
+    assert stats['extractors'] == 2
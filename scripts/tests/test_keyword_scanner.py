@@ -0,0 +1,42 @@
+import random
+
+from keyword_scanner import KeywordAutomaton, resolve_by_precedence
+
+
+def brute_force(keywords, text):
+    hits = [(start, keyword, keyword)
+            for keyword in keywords if keyword
+            for start in range(len(text) - len(keyword) + 1)
+            if text.startswith(keyword, start)]
+    return sorted(hits, key=lambda hit: (hit[0], -len(hit[1])))
+
+
+def test_nested_and_overlapping_keywords():
+    automaton = KeywordAutomaton({'全国重点文物保护单位': '全国', '文物保护单位': '文物保护单位', '保护': '保护'})
+    assert automaton.find_all('1961年列为全国重点文物保护单位') == [
+        (7, '全国重点文物保护单位', '全国'),
+        (11, '文物保护单位', '文物保护单位'),
+        (13, '保护', '保护'),
+    ]
+
+
+def test_matches_brute_force_on_random_texts():
+    rng = random.Random(5)
+    alphabet = 'abc'
+    keywords = {''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(15)}
+    automaton = KeywordAutomaton(keywords)
+    for _ in range(200):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert automaton.find_all(text) == brute_force(keywords, text)
+
+
+def test_scan_skips_non_strings_and_empty_keywords():
+    automaton = KeywordAutomaton(['', '园'])
+    assert len(automaton) == 1
+    assert automaton.scan(['拙政园', float('nan'), None]) == [[(2, '园', '园')], [], []]
+
+
+def test_resolve_by_precedence():
+    hits = [(0, '省级文物保护单位', '省级'), (3, '全国重点文物保护单位', '全国')]
+    assert resolve_by_precedence(hits, ['全国', '省级', '市级']) == '全国'
+    assert resolve_by_precedence([], ['全国']) is None
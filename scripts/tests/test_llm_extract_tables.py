@@ -0,0 +1,130 @@
+import asyncio
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from llm_extract_tables import (LLMTableExtractor, ResponseCache, ResponseValidationError, iter_table_jobs,
+                                parse_response)
+
+
+class FakeClient:
+    """模拟 Chat Completions 接口：按顺序返回预设的响应内容"""
+
+    def __init__(self, *contents, delay=0.0):
+        self.contents = list(contents)
+        self.delay = delay
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        content = self.contents[min(self.calls, len(self.contents)) - 1]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def extractor(client, cache_dir):
+    return LLMTableExtractor(client, 'stub', ResponseCache(cache_dir), rate=1000, burst=1000, backoff=0)
+
+
+RECORD = {'名称': '拙政园', '面积（㎡）': 52000}
+TABLE = '<table><tr><td>名称</td><td>拙政园</td></tr></table>'
+
+
+def test_repeated_tables_are_served_from_disk_cache(tmp_path):
+    client = FakeClient(json.dumps(RECORD, ensure_ascii=False))
+    first = extractor(client, tmp_path)
+    assert asyncio.run(first.extract('s1', TABLE)) == RECORD
+    assert asyncio.run(first.extract('s1', TABLE)) == RECORD
+    assert (client.calls, first.stats['cache_hits']) == (1, 1)
+
+    # 新的进程（新的抽取器）读取同一缓存目录
+    second = extractor(client, tmp_path)
+    assert asyncio.run(second.extract('s1', TABLE)) == RECORD
+    assert client.calls == 1
+
+    # 结构ID或表格内容不同时是不同的缓存键
+    asyncio.run(second.extract('s2', TABLE))
+    asyncio.run(second.extract('s1', TABLE.replace('拙政园', '留园')))
+    assert client.calls == 3
+
+
+def test_concurrent_duplicates_share_one_request(tmp_path):
+    client = FakeClient(json.dumps(RECORD, ensure_ascii=False), delay=0.05)
+    llm = extractor(client, tmp_path)
+
+    async def run():
+        return await asyncio.gather(*(llm.extract('s1', TABLE) for _ in range(5)))
+
+    assert asyncio.run(run()) == [RECORD] * 5
+    assert (client.calls, llm.stats['deduplicated']) == (1, 4)
+
+
+def test_invalid_responses_are_retried_and_not_cached(tmp_path):
+    client = FakeClient('不是JSON', json.dumps({'未知列': 1}, ensure_ascii=False), json.dumps(RECORD))
+    llm = extractor(client, tmp_path)
+    assert asyncio.run(llm.extract('s1', TABLE)) == RECORD
+    assert llm.stats['retries'] == 2
+
+    failing = LLMTableExtractor(FakeClient('{'), 'stub', ResponseCache(tmp_path / 'other'),
+                                rate=1000, burst=1000, max_retries=1, backoff=0)
+    with pytest.raises(ResponseValidationError):
+        asyncio.run(failing.extract('s1', TABLE))
+    assert list((tmp_path / 'other').iterdir()) == []
+
+
+def test_parse_response_checks_schema():
+    assert parse_response('{"公布批次": 1, "名称": "留园"}') == {'公布批次': 1, '名称': '留园'}
+    with pytest.raises(ResponseValidationError):
+        parse_response('{"公布批次": "第一批"}')
+
+
+def test_iter_table_jobs_skips_empty_items():
+    items = [{'name': '拙政园', 'content_html': TABLE + TABLE}, {'name': '留园', 'content_html': ''}]
+    jobs = list(iter_table_jobs(items))
+    assert [(name, index) for name, index, _, _ in jobs] == [('拙政园', 0), ('拙政园', 1)]
+    assert jobs[0][2] == jobs[1][2]
+
+
+STUB_SERVER = Path(__file__).resolve().parents[1] / 'llm_stub_server.py'
+
+
+@pytest.fixture
+def stub_server():
+    """在系统分配的空闲端口上启动桩服务器（seed 7 时依次返回非法JSON、500、成功、429、成功）"""
+    process = subprocess.Popen(
+        [sys.executable, str(STUB_SERVER), '--port', '0', '--seed', '7',
+         '--error-rate', '0.3', '--invalid-rate', '0.2'],
+        cwd=STUB_SERVER.parent, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        line = process.stdout.readline()
+        match = re.search(r'(http://\S+/v1)', line)
+        assert match, f'桩服务器未能启动: {line!r}'
+        yield match.group(1)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def test_stub_server_errors_are_retried_over_http(tmp_path, stub_server):
+    openai = pytest.importorskip('openai')
+    client = openai.AsyncOpenAI(base_url=stub_server, api_key='stub', max_retries=0)
+    # 并发为1时请求按顺序到达，桩服务器的随机序列决定每次的结果
+    llm = LLMTableExtractor(client, 'stub', ResponseCache(tmp_path / 'cache'), concurrency=1,
+                            rate=1000, burst=1000, backoff=0)
+    tables = [
+        ('拙政园', 0, 's1', '<table><tr><td>名称</td><td>拙政园</td><td>公布批次</td><td>1</td></tr></table>'),
+        ('留园', 0, 's1', '<table><tr><td>名称</td><td>留园</td><td>公布批次</td><td>1</td></tr></table>'),
+    ]
+    output = tmp_path / 'records.jsonl'
+    stats = asyncio.run(llm.run(tables, output))
+
+    records = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert [item['record'] for item in records] == [{'名称': '拙政园', '公布批次': 1}, {'名称': '留园', '公布批次': 1}]
+    assert (stats['requests'], stats['retries'], stats['failed']) == (5, 3, 0)
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from name_index import NameIndex, name_grams, split_aliases
+
+
+NAMES = ['苏州园林（拙政园、留园）', '虎丘', '沧浪亭', '网师园', '拙政园', None, '  ', '环秀山庄', '艺圃', '留园']
+
+
+def brute_force(names, name, cutoff, limit, metric):
+    grams = name_grams(name)
+    best = {}
+    for position, candidate in enumerate(names):
+        if not isinstance(candidate, str) or not candidate.strip():
+            continue
+        for alias in split_aliases(candidate.strip()):
+            alias_grams = name_grams(alias)
+            overlap = len(grams & alias_grams)
+            if alias == name:
+                score = 1.0
+            elif metric == 'jaccard':
+                score = overlap / len(grams | alias_grams)
+            else:
+                score = overlap / len(grams)
+            if overlap or alias == name:
+                if score >= cutoff and score > best.get(position, -1.0):
+                    best[position] = score
+    ranked = sorted(best.items(), key=lambda x: (-x[1], x[0]))
+    return [(position, round(score, 4)) for position, score in ranked[:limit]]
+
+
+def test_aliases_are_indexed():
+    index = NameIndex(NAMES)
+    assert index.query('留园', cutoff=0.9) == [(0, '留园', 1.0), (9, '留园', 1.0)]
+    assert split_aliases('苏州园林（拙政园、留园）') == ['苏州园林（拙政园、留园）', '苏州园林', '拙政园', '留园']
+
+
+def test_unknown_metric_is_rejected():
+    with pytest.raises(ValueError):
+        NameIndex(NAMES).query('拙政园', metric='cosine')
+
+
+@pytest.mark.parametrize('metric', ['jaccard', 'containment'])
+def test_matches_brute_force_on_random_names(metric):
+    rng = random.Random(9)
+    alphabet = '园林山庄亭水阁'
+    names = [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 6))) for _ in range(60)]
+    index = NameIndex(names)
+    for _ in range(100):
+        query = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 5)))
+        actual = [(position, score) for position, _, score in index.query(query, 0.3, 10, metric)]
+        assert actual == brute_force(names, query, 0.3, 10, metric)
+
+
+@pytest.mark.parametrize('metric', ['jaccard', 'containment'])
+def test_query_batch_matches_brute_force(metric):
+    rng = random.Random(17)
+    alphabet = '园林山庄亭水阁'
+    names = [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 6))) for _ in range(80)]
+    queries = [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 5))) for _ in range(150)]
+    queries += [None, '', '  ', names[3], '无关']
+    results = NameIndex(names).query_batch(queries, 0.3, 10, metric)
+    assert len(results) == len(queries)
+    for query, result in zip(queries, results):
+        expected = brute_force(names, query.strip(), 0.3, 10, metric) if query and query.strip() else []
+        assert [(position, score) for position, _, score in result] == expected
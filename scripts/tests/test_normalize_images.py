@@ -0,0 +1,32 @@
+import re
+
+import pytest
+from PIL import Image
+
+from normalize_images import DERIVATIVE_PATTERN, ImageNormalizer, image_size
+
+
+@pytest.mark.parametrize('orientation', [1, 6, 8])
+def test_derivative_width_matches_name_and_manifest(tmp_path, orientation):
+    folder = tmp_path / 'images' / '留园'
+    folder.mkdir(parents=True)
+    # 存储为 3200x2400 的横图；方向为 6/8 时显示为 2400x3200 的竖图
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    Image.new('RGB', (3200, 2400), (120, 160, 90)).save(folder / '01.jpg', 'JPEG', exif=exif.tobytes())
+    display_width, display_height = (2400, 3200) if orientation in (6, 8) else (3200, 2400)
+    assert image_size(folder / '01.jpg')[0] == display_width
+
+    normalizer = ImageNormalizer(tmp_path / 'images', derivatives=True, widths=(800, 1600))
+    normalizer.echo = False
+    entry = normalizer.process_folder(folder)['manifest']['images'][0]
+    assert entry['width'] == display_width
+    assert entry['derivatives'] == [800, 1600]
+
+    derivatives = sorted(f for f in folder.iterdir() if DERIVATIVE_PATTERN.match(f.name))
+    assert len(derivatives) == 4
+    for path in derivatives:
+        with Image.open(path) as img:
+            assert img.width == int(re.search(r'@(\d+)w', path.name).group(1))
+            # 缩略图已按方向旋转，保持显示比例
+            assert img.height == round(img.width * display_height / display_width)
@@ -0,0 +1,60 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from perceptual_hash import MultiIndexHash, group_pairs, hamming, image_hash
+
+
+@pytest.fixture
+def hashes():
+    # 若干个基准哈希，各自翻转少量位得到近似重复
+    rng = random.Random(1)
+    values = []
+    for _ in range(20):
+        base = rng.getrandbits(64)
+        values.append(base)
+        for _ in range(rng.randint(0, 4)):
+            flipped = base
+            for bit in rng.sample(range(64), rng.randint(0, 10)):
+                flipped ^= 1 << bit
+            values.append(flipped)
+    rng.shuffle(values)
+    return values
+
+
+@pytest.mark.parametrize('radius', [0, 3, 6, 10])
+def test_pairs_match_linear_scan(hashes, radius):
+    expected = [(i, j, hamming(a, b)) for (i, a), (j, b) in itertools.combinations(enumerate(hashes), 2)
+                if hamming(a, b) <= radius]
+    assert MultiIndexHash(hashes, radius=radius).pairs() == expected
+
+
+def test_query_matches_linear_scan(hashes):
+    index = MultiIndexHash(hashes, radius=6)
+    for value in hashes[:10] + [hashes[0] ^ 0b101, 0]:
+        expected = sorted(((i, hamming(value, h)) for i, h in enumerate(hashes) if hamming(value, h) <= 6),
+                          key=lambda item: item[1])
+        assert index.query(value) == expected
+
+
+def test_group_pairs_is_transitive():
+    assert group_pairs([(0, 2, 1), (2, 5, 3), (3, 4, 0)], 6) == [[0, 2, 5], [3, 4]]
+
+
+@pytest.mark.parametrize('method', ['dhash', 'phash'])
+def test_resized_image_stays_close(method):
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, (12, 12), dtype=np.uint8)
+    photo = Image.fromarray(noise).resize((240, 240), Image.BILINEAR)
+    other = Image.fromarray(rng.integers(0, 256, (12, 12), dtype=np.uint8)).resize((240, 240), Image.BILINEAR)
+    original = image_hash(photo, method)
+    assert hamming(original, image_hash(photo.resize((97, 97), Image.LANCZOS), method)) <= 6
+    assert hamming(original, image_hash(other, method)) > 6
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        image_hash(Image.new('L', (8, 8)), 'ahash')
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from snapshot_store import SNAPSHOT_INDEX, SnapshotStore
+
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def tree(root):
+    return {path.relative_to(root).as_posix(): path.read_bytes()
+            for path in sorted(root.rglob('*')) if path.is_file()}
+
+
+@pytest.fixture
+def images(tmp_path):
+    source = tmp_path / 'images'
+    write(source / '留园' / '01.jpg', b'liuyuan-1')
+    write(source / '留园' / '02.jpg', b'liuyuan-2')
+    write(source / '网师园' / '01.jpg', b'wangshi-1')
+    write(source / '网师园' / 'thumb.txt', b'not an image')
+    return source
+
+
+def test_unchanged_files_are_hard_linked(tmp_path, images):
+    store = SnapshotStore(tmp_path / 'backup', include=lambda path: path.suffix == '.jpg')
+    folders = [images / '留园', images / '网师园']
+    first = store.create(images, folders, '20250101_120000')
+    assert first['stats'] == {'files': 3, 'linked': 0, 'copied': 3, 'copied_bytes': 27}
+
+    write(images / '留园' / '02.jpg', b'changed')
+    (images / '网师园' / '01.jpg').rename(images / '网师园' / '03.jpg')
+    second = store.create(images, folders, '20250101_120000')
+    assert second['id'] == '20250101_120000_2' and second['previous'] == first['id']
+    assert second['stats'] == {'files': 3, 'linked': 2, 'copied': 1, 'copied_bytes': 7}
+    assert 'thumb.txt' not in json.dumps(second['files'])
+
+    # 硬链接的文件只计一次
+    first_dir, second_dir = store.root / first['id'], store.root / second['id']
+    linked = (second_dir / '网师园' / '03.jpg').stat()
+    assert linked.st_ino == (first_dir / '网师园' / '01.jpg').stat().st_ino
+    assert store.disk_usage(store.root) < store.disk_usage(first_dir) + store.disk_usage(second_dir)
+
+
+def test_restore_round_trip(tmp_path, images):
+    store = SnapshotStore(tmp_path / 'backup', include=lambda path: path.suffix == '.jpg')
+    snapshot = store.create(images, [images / '留园', images / '网师园'], '20250101_120000')
+    expected = tree(images)
+
+    write(images / '留园' / '01.jpg', b'overwritten')
+    write(images / '留园' / '99.jpg', b'new file')
+    stats = store.restore(snapshot['id'], images, ['留园'])
+    assert stats == {'folders': 1, 'restored': 2, 'removed': 1}
+    assert tree(images) == expected
+
+    # 恢复出的文件不与快照共享数据
+    restored = images / '留园' / '01.jpg'
+    assert restored.stat().st_ino != (store.root / snapshot['id'] / '留园' / '01.jpg').stat().st_ino
+    with pytest.raises(KeyError):
+        store.restore(snapshot['id'], images, ['拙政园'])
+
+
+def test_incomplete_snapshots_are_ignored_and_pruned_in_order(tmp_path, images):
+    store = SnapshotStore(tmp_path / 'backup')
+    ids = [store.create(images, [images / '留园'], f"2025010{day}_120000")['id'] for day in (1, 2, 3)]
+    (store.root / '20250104_120000').mkdir()
+    (store.root / ids[1] / SNAPSHOT_INDEX).write_text('{', encoding='utf-8')
+
+    assert [snapshot['id'] for snapshot in store.list_snapshots()] == [ids[0], ids[2]]
+    assert store.prune(keep=1) == [ids[0]]
+    assert [snapshot['id'] for snapshot in store.list_snapshots()] == [ids[2]]
+    restored = tree(store.root / ids[2])
+    assert {name: restored[name] for name in ('留园/01.jpg', '留园/02.jpg')} == \
+        {'留园/01.jpg': b'liuyuan-1', '留园/02.jpg': b'liuyuan-2'}
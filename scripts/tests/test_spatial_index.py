@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from spatial_index import EARTH_RADIUS_KM, SpatialIndex
+
+
+def haversine_km(lon, lat, lons, lats):
+    lon, lat, lons, lats = map(np.radians, (lon, lat, np.asarray(lons), np.asarray(lats)))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture
+def sites():
+    rng = np.random.default_rng(7)
+    lons = rng.uniform(120.4, 120.9, 300)
+    lats = rng.uniform(31.1, 31.5, 300)
+    lons[[5, 40]] = np.nan
+    return lons, lats
+
+
+@pytest.fixture
+def queries():
+    rng = np.random.default_rng(11)
+    lons = np.append(rng.uniform(120.3, 121.0, 80), [np.nan, 116.4])
+    lats = np.append(rng.uniform(31.0, 31.6, 80), [31.3, 39.9])
+    return lons, lats
+
+
+def brute_knn(sites, lon, lat, k):
+    distances = haversine_km(lon, lat, *sites)
+    distances[np.isnan(distances)] = np.inf
+    order = np.argsort(distances, kind='stable')[:k]
+    return order, distances[order]
+
+
+@pytest.mark.parametrize('k', [1, 3, 10])
+@pytest.mark.parametrize('cell_km', [0.5, 2.0, 50.0])
+def test_knn_matches_brute_force(sites, queries, k, cell_km):
+    index = SpatialIndex(*sites, cell_km=cell_km)
+    positions, distances = index.query_knn_batch(*queries, k=k)
+    for i, (lon, lat) in enumerate(zip(*queries)):
+        if np.isnan(lon):
+            assert (positions[i] == -1).all() and np.isinf(distances[i]).all()
+            continue
+        _, expected = brute_knn(sites, lon, lat, k)
+        np.testing.assert_allclose(distances[i], expected, rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(haversine_km(lon, lat, sites[0][positions[i]], sites[1][positions[i]]),
+                                   expected, rtol=1e-9, atol=1e-9)
+        single_positions, single_distances = index.query_knn(lon, lat, k)
+        np.testing.assert_array_equal(single_positions, positions[i])
+        np.testing.assert_allclose(single_distances, distances[i])
+
+
+def test_knn_batch_pads_when_fewer_points_than_k():
+    index = SpatialIndex([120.6, 120.7, np.nan], [31.3, 31.3, 31.3])
+    positions, distances = index.query_knn_batch([120.6], [31.3], k=4)
+    assert positions.tolist() == [[0, 1, -1, -1]]
+    assert distances[0, 0] == pytest.approx(0) and np.isinf(distances[0, 2:]).all()
+
+
+def test_radius_matches_brute_force(sites, queries):
+    index = SpatialIndex(*sites, cell_km=1.0)
+    for lon, lat in zip(*queries):
+        positions, distances = index.query_radius(lon, lat, 3.0)
+        if np.isnan(lon):
+            assert len(positions) == 0
+            continue
+        expected = haversine_km(lon, lat, *sites)
+        assert set(positions.tolist()) == set(np.flatnonzero(expected <= 3.0).tolist())
+        np.testing.assert_allclose(distances, expected[positions], rtol=1e-9, atol=1e-9)
+
+
+def test_save_and_load_round_trip(sites, queries, tmp_path):
+    index = SpatialIndex(*sites)
+    index.save(tmp_path / 'index.npz')
+    loaded = SpatialIndex.load(tmp_path / 'index.npz')
+    for expected, actual in zip(index.query_knn_batch(*queries, k=3), loaded.query_knn_batch(*queries, k=3)):
+        np.testing.assert_array_equal(expected, actual)
+
+
+def test_knn_batch_bounds_pairs_per_chunk(sites, monkeypatch):
+    import spatial_index
+
+    rng = np.random.default_rng(5)
+    queries = rng.uniform(120.4, 120.9, 2000), rng.uniform(31.1, 31.5, 2000)
+    index = SpatialIndex(*sites, cell_km=0.5)
+    expected = index.query_knn_batch(*queries, k=3)
+
+    limit = 500
+    sizes = []
+    neighbor_pairs = SpatialIndex._neighbor_pairs
+
+    def recording(self, points, reach):
+        pairs = neighbor_pairs(self, points, reach)
+        sizes.append(len(pairs[0]))
+        return pairs
+
+    monkeypatch.setattr(spatial_index, 'MAX_BATCH_PAIRS', limit)
+    monkeypatch.setattr(SpatialIndex, '_neighbor_pairs', recording)
+    actual = index.query_knn_batch(*queries, k=3)
+    assert len(sizes) > 1 and max(sizes) <= limit
+    for a, b in zip(expected, actual):
+        np.testing.assert_array_equal(a, b)
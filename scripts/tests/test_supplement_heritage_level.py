@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_io import load_garden_list
+from supplement_heritage_level import (
+    LEVEL_PRECEDENCE, HeritageRegistry, build_description_automaton, match_by_location, match_by_name,
+    search_in_description, supplement_heritage_level
+)
+
+
+GARDEN_LIST = Path(__file__).resolve().parents[2] / 'public' / 'dataset' / 'SuzhouGardenListFull.csv'
+RESULT_COLUMNS = ['文保单位级别', '匹配方式', '级别来源']
+
+
+def row_wise_levels(gardens, registries, threshold_km=1.0, top_k=3, cutoff=0.5, metric='jaccard'):
+    """
+    合并改为整列 np.select 之前的逐行逻辑：名称 > 地点、同种匹配按级别优先级，都没有时取描述
+    """
+    description_levels, _ = search_in_description(gardens['描述'].tolist(), build_description_automaton())
+    locations = [match_by_location(gardens, registry.df, threshold_km, top_k, registry.site_index, registry.level)
+                 for registry in registries]
+    rows = []
+    for pos, (idx, row) in enumerate(gardens.iterrows()):
+        matches = []
+        for registry, location in zip(registries, locations):
+            if match_by_name(row['名称'], registry.name_index, registry.level, cutoff, metric)[0]:
+                matches.append(("名称", registry.level, registry.label))
+            if location.at[idx, 'matched']:
+                matches.append(("地点", registry.level, registry.label))
+        best = None
+        for method in ("名称", "地点"):
+            candidates = [match for match in matches if match[0] == method]
+            if candidates:
+                best = min(candidates, key=lambda m: LEVEL_PRECEDENCE.index(m[1]) if m[1] in LEVEL_PRECEDENCE
+                           else len(LEVEL_PRECEDENCE))
+                break
+        if best:
+            method, level, label = best
+            rows.append((f"{level}（地点推测）" if method == "地点" else level, method, label))
+        elif description_levels[pos]:
+            rows.append((description_levels[pos], "描述", "描述"))
+        else:
+            rows.append((None, None, None))
+    return rows
+
+
+def write_registry(path, rows):
+    pd.DataFrame(rows, columns=['名称', '经度', '纬度']).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def registries(tmp_path):
+    gardens = load_garden_list(str(GARDEN_LIST), None)
+    lons = pd.to_numeric(gardens['经度'], errors='coerce').to_numpy()
+    lats = pd.to_numeric(gardens['纬度'], errors='coerce').to_numpy()
+    names = gardens['名称'].tolist()
+    rng = np.random.default_rng(5)
+    # 全国：前20个园林原名原址；省级：部分与全国重叠、名称加后缀、坐标偏移约百米到数公里；
+    # 市级：只有坐标（名称无关），外加世界遗产这类不在优先级中的级别
+    national = [(names[i], lons[i], lats[i]) for i in range(20)]
+    provincial = [(f"{names[i]}旧址", lons[i] + rng.normal(0, 0.01), lats[i] + rng.normal(0, 0.01))
+                  for i in range(10, 50)]
+    city = [(f"民居{i}", lons[i] + 0.002, lats[i]) for i in range(40, 90)]
+    world = [(f"{names[i]}（{names[i + 1]}）", lons[i], lats[i]) for i in range(0, 30, 3)]
+    return [
+        HeritageRegistry.load(write_registry(tmp_path / '省级.csv', provincial), "省级"),
+        HeritageRegistry.load(write_registry(tmp_path / '全国.csv', national), "全国"),
+        HeritageRegistry.load(write_registry(tmp_path / '市级.csv', city), "市级"),
+        HeritageRegistry.load(write_registry(tmp_path / '世界遗产.csv', world), "世界遗产"),
+    ]
+
+
+@pytest.mark.skipif(not GARDEN_LIST.exists(), reason='缺少园林名录')
+def test_column_wise_combination_matches_row_wise(tmp_path, registries):
+    output = tmp_path / 'out.csv'
+    report = supplement_heritage_level(str(GARDEN_LIST), registries, str(output), cache_dir=None)
+
+    actual = pd.read_csv(output, dtype=str)[RESULT_COLUMNS]
+    expected = row_wise_levels(load_garden_list(str(GARDEN_LIST), None), registries)
+    assert [tuple(value if isinstance(value, str) else None for value in row)
+            for row in actual.itertuples(index=False)] == expected
+
+    # 夹具要覆盖名称、地点、描述和未匹配四种情况，否则比较没有意义
+    methods = [method for _, method, _ in expected]
+    assert set(methods) == {"名称", "地点", "描述", None}
+    assert report['counts']['by_method'] == {method: methods.count(method) for method in ("名称", "地点", "描述")}
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from validate_districts import (STATUS_MISMATCH, STATUS_MISSING, STATUS_OK, STATUS_OUTSIDE, STATUS_UNKNOWN,
+                                DistrictIndex, load_district_index, validate)
+
+
+def square(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]
+
+
+NAMES = ['甲区', '乙区', '丙区']
+GEOMETRIES = [
+    # 带洞的正方形，乙区位于洞内
+    {'type': 'Polygon', 'coordinates': [square(0, 0, 10, 10), square(4, 4, 6, 6)]},
+    {'type': 'Polygon', 'coordinates': [square(4.2, 4.2, 5.8, 5.8)]},
+    # 飞地
+    {'type': 'MultiPolygon', 'coordinates': [[square(20, 0, 22, 2)], [square(30, 0, 32, 2)]]},
+]
+
+
+def brute_locate(index, lons, lats):
+    """不用条带索引：每个点与全部边做射线法"""
+    x0, y0, x1, y1 = index.edges.T
+    result = np.full(len(lons), -1)
+    for i, (px, py) in enumerate(zip(lons, lats)):
+        straddle = (y0 > py) != (y1 > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hits = straddle & (px < x0 + (py - y0) * (x1 - x0) / (y1 - y0))
+        counts = np.bincount(index.edge_district[hits], minlength=len(index.names))
+        inside = np.flatnonzero(counts % 2)
+        if len(inside):
+            result[i] = inside[0]
+    return result
+
+
+@pytest.mark.parametrize('bands', [None, 1, 3, 50])
+def test_banded_locate_matches_brute_force(bands):
+    index = DistrictIndex(NAMES, GEOMETRIES, bands)
+    rng = np.random.default_rng(bands or 0)
+    lons = rng.uniform(-2, 34, 2000)
+    lats = rng.uniform(-2, 12, 2000)
+    located = index.locate(lons, lats)
+    np.testing.assert_array_equal(located, brute_locate(index, lons, lats))
+    assert index.locate([5, 5, 21, 31, 15, np.nan], [5, 4.1, 1, 1, 1, 1]).tolist() == [1, -1, 2, 2, -1, -1]
+
+
+def test_suzhou_boundaries_match_brute_force():
+    index = load_district_index()
+    x_min, y_min, x_max, y_max = index.bbox
+    rng = np.random.default_rng(1)
+    lons = rng.uniform(x_min, x_max, 300)
+    lats = rng.uniform(y_min, y_max, 300)
+    np.testing.assert_array_equal(index.locate(lons, lats), brute_locate(index, lons, lats))
+
+
+def test_validate_statuses():
+    index = DistrictIndex(NAMES, GEOMETRIES)
+    points = pd.DataFrame({
+        '行号': [2, 3, 4, 5, 6, 7, 8],
+        '名称': ['a', 'b', 'c', 'd', 'e', 'f', 'g'],
+        '区县': ['甲区', '甲区', '丙区', '乙区', '丁区', '甲区', '甲区'],
+        '经度': [1.0, 5.0, 1.0, 50.0, 1.0, np.nan, 15.0],
+        '纬度': [1.0, 5.0, 21.0, 50.0, 1.0, 1.0, 1.0],
+    })
+    result = validate(points, index, tolerance_km=0.5)
+    assert result['问题'].tolist() == [STATUS_OK, STATUS_MISMATCH, STATUS_OUTSIDE, STATUS_OUTSIDE,
+                                      STATUS_UNKNOWN, STATUS_MISSING, STATUS_OUTSIDE]
+    assert result['所在区县'].tolist()[:2] == ['甲区', '乙区']
+    assert result['建议'][2].startswith('交换经纬度（区县为丙区')
+    assert result['建议'][5] == '补充经纬度'
+    # 外包框外的点不计算最近边界；框内但不在区县内的点给出最近区县
+    assert result['建议'][3] == '坐标可能有误，请核对'
+    assert result['最近区县'][3] == '' and np.isnan(result['距离（公里）'][3])
+    assert result['建议'][6] == '坐标可能有误，请核对'
+    assert result['最近区县'][6] in ('甲区', '丙区') and result['距离（公里）'][6] > 0.5
+
+
+def test_near_boundary_point_outside_bbox_keeps_nearest_district():
+    index = DistrictIndex(NAMES, GEOMETRIES)
+    points = pd.DataFrame({'行号': [2], '名称': ['a'], '区县': ['甲区'], '经度': [-0.002], '纬度': [5.0]})
+    result = validate(points, index, tolerance_km=0.5)
+    assert result['建议'][0] == '区县无误，坐标在边界外侧'
+    assert result['最近区县'][0] == '甲区'
+    lower_bound = index.bbox_distance([-0.002, 5.0, 40.0], [5.0, 5.0, 5.0])
+    assert lower_bound[1] == 0 and 0 < lower_bound[0] <= index.nearest([-0.002], [5.0])[1][0]
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+校验园林名录中手工填写的“区县”与经纬度所在的区县边界是否一致
+
+1. 网格索引：把各区县多边形的边按纬度划分到等高的横向条带中，
+   每个条带只保存与之相交的边（CSR 结构：条带偏移 + 边编号）
+2. 点在多边形内判断：按条带对点分组，条带内的点与该条带的边做向量化射线法
+   （向东的射线与边相交次数按区县累计，奇数即在区县内），每个点只与少量边比较，
+   几十万个点也能在数秒内完成
+3. 对每条记录给出结果：
+   - 区县不符：坐标落在另一个区县内，建议把区县改为坐标所在区县
+   - 不在任何区县内：检查经纬度是否填反；否则给出最近的区县及距离，
+     距离在容差内（如落在湖面、江面的边界外侧）时建议该区县，否则提示坐标可能有误。
+     离全部区县的外包框已超过容差的点不计算最近边界（逐边比较），直接提示坐标可能有误
+   - 未知区县：填写的区县不在边界数据中
+   - 缺少坐标：经度或纬度为空、为 0 或无法解析（与地图的判断一致）
+
+用法：
+    python validate_districts.py
+    python validate_districts.py --input registry.csv --name-column 名称 --output issues.csv
+    python validate_districts.py --benchmark 500000    # 用随机点测试定位速度
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from build_aggregates import FLOAT_PREFIX, js_trim
+from dataset_io import DISTRICTS_GEOJSON, GARDEN_LIST_CSV, load_districts, read_table
+from district_topology import iter_polygons
+from spatial_index import EARTH_RADIUS_KM
+
+# 每次向量化比较的最大（点 x 边）数量，限制中间数组的内存
+MAX_PAIRS = 1 << 22
+# 每度对应的公里数
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+
+STATUS_OK = '一致'
+STATUS_MISMATCH = '区县不符'
+STATUS_OUTSIDE = '不在任何区县内'
+STATUS_UNKNOWN = '未知区县'
+STATUS_MISSING = '缺少坐标'
+
+
+class DistrictIndex:
+    """
+    区县边界的条带网格索引
+    edges 为全部边的 (x0, y0, x1, y1)，edge_district 为边所属区县的下标；
+    同一区县的所有环（含内环）一起计数，因此按奇偶规则自然支持洞和飞地
+    """
+
+    def __init__(self, names, geometries, bands: int = None):
+        self.names = list(names)
+        segments, owners = [], []
+        for district, geometry in enumerate(geometries):
+            for polygon in iter_polygons(geometry):
+                for ring in polygon:
+                    points = np.asarray([coord[:2] for coord in ring], dtype=np.float64)
+                    if len(points) < 3:
+                        continue
+                    if not np.array_equal(points[0], points[-1]):
+                        points = np.vstack([points, points[:1]])
+                    segments.append(np.hstack([points[:-1], points[1:]]))
+                    owners.append(np.full(len(points) - 1, district, dtype=np.int32))
+
+        self.edges = np.vstack(segments)
+        self.edge_district = np.concatenate(owners)
+        x = self.edges[:, [0, 2]]
+        y = self.edges[:, [1, 3]]
+        self.bbox = (x.min(), y.min(), x.max(), y.max())
+
+        # 条带数默认约为边数的 1/4，平均每个条带只有几条到几十条边
+        self.bands = bands or int(np.clip(len(self.edges) // 4, 1, 4096))
+        self.band_height = (self.bbox[3] - self.bbox[1]) / self.bands or 1.0
+        self._build_bands(y.min(axis=1), y.max(axis=1))
+
+    def _band_of(self, lats: np.ndarray) -> np.ndarray:
+        band = np.floor((lats - self.bbox[1]) / self.band_height).astype(np.int64)
+        return np.clip(band, 0, self.bands - 1)
+
+    def _build_bands(self, y_min: np.ndarray, y_max: np.ndarray):
+        """把每条边登记到它跨越的所有条带中"""
+        low = self._band_of(y_min)
+        counts = self._band_of(y_max) - low + 1
+        edge_ids = np.repeat(np.arange(len(self.edges)), counts)
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        band_ids = np.repeat(low, counts) + (np.arange(len(edge_ids)) - starts)
+
+        order = np.argsort(band_ids, kind='stable')
+        self.band_edges = edge_ids[order]
+        self.band_offsets = np.concatenate([[0], np.cumsum(np.bincount(band_ids, minlength=self.bands))])
+
+    def _crossings(self, px: np.ndarray, py: np.ndarray, edge_ids: np.ndarray) -> np.ndarray:
+        """一组点与一组边的射线法：返回每个点所在的区县下标，不在任何区县内为 -1"""
+        x0, y0, x1, y1 = (self.edges[edge_ids, k][None, :] for k in range(4))
+        px = px[:, None]
+        py = py[:, None]
+        straddle = (y0 > py) != (y1 > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cross_x = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+        hits = (straddle & (px < cross_x)).astype(np.int32)
+
+        # 按区县累计相交次数：(点 x 边) 与 (边 x 区县) 的独热矩阵相乘
+        owners = self.edge_district[edge_ids]
+        districts, columns = np.unique(owners, return_inverse=True)
+        one_hot = np.zeros((len(edge_ids), len(districts)), dtype=np.int32)
+        one_hot[np.arange(len(edge_ids)), columns] = 1
+        inside = ((hits @ one_hot) & 1).astype(bool)
+        return np.where(inside.any(axis=1), districts[inside.argmax(axis=1)], -1)
+
+    def locate(self, lons, lats) -> np.ndarray:
+        """返回每个点所在区县的下标；不在任何区县内或坐标无效时为 -1"""
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        result = np.full(len(lons), -1, dtype=np.int64)
+
+        x_min, y_min, x_max, y_max = self.bbox
+        candidates = np.flatnonzero((lons >= x_min) & (lons <= x_max) & (lats >= y_min) & (lats <= y_max))
+        if len(candidates) == 0:
+            return result
+
+        bands = self._band_of(lats[candidates])
+        order = np.argsort(bands, kind='stable')
+        candidates, bands = candidates[order], bands[order]
+        band_values, band_starts = np.unique(bands, return_index=True)
+        band_ends = np.append(band_starts[1:], len(bands))
+
+        for band, start, end in zip(band_values, band_starts, band_ends):
+            edge_ids = self.band_edges[self.band_offsets[band]:self.band_offsets[band + 1]]
+            if len(edge_ids) == 0:
+                continue
+            step = max(1, MAX_PAIRS // len(edge_ids))
+            for chunk_start in range(start, end, step):
+                points = candidates[chunk_start:min(chunk_start + step, end)]
+                result[points] = self._crossings(lons[points], lats[points], edge_ids)
+        return result
+
+    def _km_scale(self):
+        """经度、纬度每度对应的公里数（按外包框中心纬度换算经度）"""
+        return np.cos(np.radians((self.bbox[1] + self.bbox[3]) / 2)) * KM_PER_DEGREE, KM_PER_DEGREE
+
+    def bbox_distance(self, lons, lats) -> np.ndarray:
+        """每个点到全部区县外包框的距离（公里），框内为 0；是到任何区县边界距离的下界"""
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        kx, ky = self._km_scale()
+        x_min, y_min, x_max, y_max = self.bbox
+        dx = np.maximum(np.maximum(x_min - lons, lons - x_max), 0) * kx
+        dy = np.maximum(np.maximum(y_min - lats, lats - y_max), 0) * ky
+        return np.hypot(dx, dy)
+
+    def _nearest_edge(self, lons: np.ndarray, lats: np.ndarray, edge_ids: np.ndarray):
+        """每个点到一组边中最近一条的 (边编号, 距离公里)；按外包框中心纬度把经度差换算为公里"""
+        kx, ky = self._km_scale()
+        edges = self.edges[edge_ids]
+        ax, ay = edges[:, 0] * kx, edges[:, 1] * ky
+        dx, dy = edges[:, 2] * kx - ax, edges[:, 3] * ky - ay
+        length2 = dx * dx + dy * dy
+        length2[length2 == 0] = np.inf
+
+        closest = np.zeros(len(lons), dtype=np.int64)
+        distances = np.zeros(len(lons))
+        step = max(1, MAX_PAIRS // len(edges))
+        for start in range(0, len(lons), step):
+            px = lons[start:start + step, None] * kx
+            py = lats[start:start + step, None] * ky
+            t = np.clip(((px - ax) * dx + (py - ay) * dy) / length2, 0, 1)
+            distance2 = (ax + t * dx - px) ** 2 + (ay + t * dy - py) ** 2
+            nearest = distance2.argmin(axis=1)
+            closest[start:start + step] = nearest
+            distances[start:start + step] = np.sqrt(distance2[np.arange(len(nearest)), nearest])
+        return edge_ids[closest], distances
+
+    def nearest(self, lons, lats):
+        """每个点最近的区县边界，返回 (区县下标, 距离公里)"""
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        edge_ids, distances = self._nearest_edge(lons, lats, np.arange(len(self.edges)))
+        return self.edge_district[edge_ids], distances
+
+    def distance_to(self, lons, lats, districts) -> np.ndarray:
+        """每个点到指定区县（下标）边界的距离（公里）"""
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        districts = np.asarray(districts)
+        distances = np.full(len(lons), np.nan)
+        for district in np.unique(districts):
+            points = np.flatnonzero(districts == district)
+            edge_ids = np.flatnonzero(self.edge_district == district)
+            distances[points] = self._nearest_edge(lons[points], lats[points], edge_ids)[1]
+        return distances
+
+
+def load_district_index(path: Path = DISTRICTS_GEOJSON, bands: int = None) -> DistrictIndex:
+    districts = load_districts(path)
+    return DistrictIndex(districts['name'], districts['geometry'], bands)
+
+
+def parse_coordinate(series: pd.Series) -> pd.Series:
+    """与前端相同按 parseFloat 解析；空值、无法解析或为 0 时为 NaN"""
+    values = pd.to_numeric(series.str.extract(FLOAT_PREFIX, expand=False), errors='coerce')
+    return values.mask(values == 0)
+
+
+def load_points(csv_path: Path, district_column: str, lon_column: str, lat_column: str,
+                name_column: str) -> pd.DataFrame:
+    """读取名录中校验所需的列，行号为 CSV 中的行号（含表头）"""
+    raw = read_table(csv_path)
+    missing = [c for c in (district_column, lon_column, lat_column) if c not in raw.columns]
+    if missing:
+        raise ValueError(f"缺少列: {', '.join(missing)}")
+
+    return pd.DataFrame({
+        '行号': raw.index + 2,
+        '名称': js_trim(raw[name_column]) if name_column in raw.columns else '',
+        '区县': js_trim(raw[district_column]),
+        '经度': parse_coordinate(raw[lon_column]),
+        '纬度': parse_coordinate(raw[lat_column]),
+    })
+
+
+def validate(points: pd.DataFrame, index: DistrictIndex, tolerance_km: float = 0.5) -> pd.DataFrame:
+    """
+    校验每条记录，返回增加了 问题/所在区县/最近区县/距离（公里）/建议 列的 DataFrame
+    最近区县/距离：区县不符时为填写的区县及坐标到其边界的距离，不在任何区县内时为最近的区县
+    """
+    names = np.asarray(index.names + [''], dtype=object)  # 下标 -1 对应空字符串
+    lons = points['经度'].to_numpy()
+    lats = points['纬度'].to_numpy()
+    recorded = points['区县'].to_numpy(dtype=object)
+
+    located = index.locate(lons, lats)
+    has_coords = ~(np.isnan(lons) | np.isnan(lats))
+    known = np.isin(recorded, index.names)
+
+    result = points.copy()
+    result['所在区县'] = names[located]
+    result['最近区县'] = ''
+    result['距离（公里）'] = np.nan
+    result['建议'] = ''
+
+    status = np.full(len(points), STATUS_OK, dtype=object)
+    status[has_coords & (located >= 0) & (names[located] != recorded)] = STATUS_MISMATCH
+    status[has_coords & (located < 0)] = STATUS_OUTSIDE
+    status[~known] = STATUS_UNKNOWN
+    status[~has_coords] = STATUS_MISSING
+    result['问题'] = status
+
+    suggestion = np.full(len(points), '', dtype=object)
+    relocated = (status != STATUS_OK) & (located >= 0)
+    suggestion[relocated] = '区县改为' + names[located[relocated]]
+
+    # 区县不符时，坐标离填写的区县很近多半是定位误差，很远则可能是坐标本身有误
+    mismatched = np.flatnonzero(status == STATUS_MISMATCH)
+    if len(mismatched):
+        district_ids = {name: i for i, name in enumerate(index.names)}
+        targets = np.array([district_ids[name] for name in recorded[mismatched]])
+        distance = index.distance_to(lons[mismatched], lats[mismatched], targets)
+        result.loc[result.index[mismatched], '最近区县'] = recorded[mismatched]
+        result.loc[result.index[mismatched], '距离（公里）'] = np.round(distance, 3)
+        close = distance <= tolerance_km
+        suggestion[mismatched[close]] = '坐标在区县边界附近，核对后再决定是否修改区县'
+        suggestion[mismatched[~close]] = (suggestion[mismatched[~close]] + '，或核对坐标（距'
+                                          + recorded[mismatched[~close]] + ' '
+                                          + np.char.mod('%.1f', distance[~close]).astype(object) + ' 公里）')
+
+    outside = np.flatnonzero(has_coords & (located < 0))
+    if len(outside):
+        # 经纬度填反时交换后会落在区县内
+        swapped = index.locate(lats[outside], lons[outside])
+        is_swapped = swapped >= 0
+        suggestion[outside[is_swapped]] = '交换经纬度（区县为' + names[swapped[is_swapped]] + '）'
+
+        # 离外包框已超过容差的点不可能在任何区县的容差内，不再逐边计算最近距离
+        remaining = outside[~is_swapped]
+        far = index.bbox_distance(lons[remaining], lats[remaining]) > tolerance_km
+        suggestion[remaining[far]] = '坐标可能有误，请核对'
+        remaining = remaining[~far]
+        nearest, distance = index.nearest(lons[remaining], lats[remaining])
+        result.loc[result.index[remaining], '最近区县'] = names[nearest]
+        result.loc[result.index[remaining], '距离（公里）'] = np.round(distance, 3)
+        close = distance <= tolerance_km
+        suggestion[remaining[close]] = '区县改为' + names[nearest[close]] + '（坐标在边界外侧）'
+        suggestion[remaining[close & (names[nearest] == recorded[remaining])]] = '区县无误，坐标在边界外侧'
+        suggestion[remaining[~close]] = '坐标可能有误，请核对'
+
+    if (~has_coords).any():
+        suggestion[~has_coords] = '补充经纬度'
+    result['建议'] = suggestion
+    return result[[*points.columns, '问题', '所在区县', '最近区县', '距离（公里）', '建议']]
+
+
+def benchmark(index: DistrictIndex, count: int, seed: int = 0):
+    """在区县外包框内生成随机点，测试定位速度"""
+    rng = np.random.default_rng(seed)
+    x_min, y_min, x_max, y_max = index.bbox
+    lons = rng.uniform(x_min, x_max, count)
+    lats = rng.uniform(y_min, y_max, count)
+    start = time.perf_counter()
+    located = index.locate(lons, lats)
+    elapsed = time.perf_counter() - start
+    print(f"⏱️  {count} 个随机点定位耗时 {elapsed:.2f} 秒（{count / elapsed:,.0f} 点/秒），"
+          f"{(located >= 0).mean():.1%} 落在区县内")
+
+
+def print_summary(result: pd.DataFrame, limit: int):
+    counts = result['问题'].value_counts()
+    print(f"✅ 共校验 {len(result)} 条记录")
+    for status in [STATUS_OK, STATUS_MISMATCH, STATUS_OUTSIDE, STATUS_UNKNOWN, STATUS_MISSING]:
+        print(f"   {status}: {counts.get(status, 0)}")
+
+    issues = result[result['问题'] != STATUS_OK]
+    for _, row in issues.head(limit).iterrows():
+        if row['所在区县']:
+            where = f"，坐标位于{row['所在区县']}"
+        elif row['最近区县']:
+            where = f"，距最近的{row['最近区县']} {row['距离（公里）']:.1f} 公里"
+        else:
+            where = ''
+        print(f"   ⚠️  第 {row['行号']} 行 {row['名称']}（{row['区县']}，{row['经度']}, {row['纬度']}）"
+              f"{row['问题']}{where}：{row['建议']}")
+    if len(issues) > limit:
+        print(f"   ... 另有 {len(issues) - limit} 条，完整结果请用 --output 导出")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='校验园林名录的区县与经纬度是否一致')
+    parser.add_argument('--input', type=Path, default=GARDEN_LIST_CSV, help='园林名录 CSV')
+    parser.add_argument('--districts', type=Path, default=DISTRICTS_GEOJSON, help='区县边界 GeoJSON')
+    parser.add_argument('--output', type=Path, help='导出有问题的记录（CSV）')
+    parser.add_argument('--district-column', default='区县', help='区县列名')
+    parser.add_argument('--lon-column', default='经度', help='经度列名')
+    parser.add_argument('--lat-column', default='纬度', help='纬度列名')
+    parser.add_argument('--name-column', default='名称', help='名称列名')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='边界外侧的容差（公里），在此距离内建议最近的区县')
+    parser.add_argument('--bands', type=int, help='网格索引的条带数（默认按边数自动选择）')
+    parser.add_argument('--limit', type=int, default=20, help='终端最多显示的问题条数')
+    parser.add_argument('--benchmark', type=int, metavar='N', help='只测试 N 个随机点的定位速度')
+    args = parser.parse_args()
+
+    if not args.districts.exists():
+        print(f"❌ 文件不存在: {args.districts}")
+        return 1
+    index = load_district_index(args.districts, args.bands)
+    print(f"📐 {len(index.names)} 个区县，{len(index.edges)} 条边，{index.bands} 个条带")
+
+    if args.benchmark:
+        benchmark(index, args.benchmark)
+        return 0
+
+    if not args.input.exists():
+        print(f"❌ 文件不存在: {args.input}")
+        return 1
+    points = load_points(args.input, args.district_column, args.lon_column, args.lat_column, args.name_column)
+    result = validate(points, index, args.tolerance)
+    print_summary(result, args.limit)
+
+    if args.output:
+        issues = result[result['问题'] != STATUS_OK]
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        issues.to_csv(args.output, index=False, encoding='utf-8-sig')
+        print(f"💾 已导出 {len(issues)} 条问题记录到 {args.output}")
+
+    return 0 if (result['问题'] == STATUS_OK).all() else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
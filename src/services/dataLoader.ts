@@ -10,6 +10,11 @@ import type {
   EraCategoryConfig,
   DistrictRawData,
   DistrictData,
+  ImageManifest,
+  PrecomputedAggregates,
+  ColumnarColumn,
+  ColumnarManifest,
+  DatasetSource,
 } from '@/types';
 
 // ==================== 配置常量 ====================
@@ -40,6 +45,16 @@ const AREA_RANGES: AreaRangeConfig[] = [
   { label: '25000以上', min: 25000, max: Infinity },
 ];
 
+/**
+ * 预计算聚合文件版本（与 scripts/build_aggregates.py 中的 AGGREGATES_VERSION 一致）
+ */
+const AGGREGATES_VERSION = 1;
+
+/**
+ * 列式数据包版本（与 scripts/export_columnar.py 中的 COLUMNAR_VERSION 一致）
+ */
+const COLUMNAR_VERSION = 1;
+
 // ==================== 数据清洗函数 ====================
 
 /**
@@ -202,6 +217,25 @@ function transformGardenData(raw: GardenRawData): GardenData {
 
 // ==================== 数据加载主函数 ====================
 
+// 最近一次加载的园林数据对应的源 CSV（用于判断预计算结果是否与之对应）
+let loadedGardenSource: DatasetSource | null = null;
+
+/**
+ * 最近一次加载的园林数据对应的源 CSV，无法确定时为 null
+ */
+export function getLoadedGardenSource(): DatasetSource | null {
+  return loadedGardenSource;
+}
+
+/**
+ * 计算内容的 SHA-256（十六进制）；当前环境不支持 SubtleCrypto 时返回 null
+ */
+async function sha256Hex(buffer: ArrayBuffer): Promise<string | null> {
+  if (!globalThis.crypto?.subtle) return null;
+  const digest = await globalThis.crypto.subtle.digest('SHA-256', buffer);
+  return Array.from(new Uint8Array(digest), (byte) => byte.toString(16).padStart(2, '0')).join('');
+}
+
 /**
  * 加载并解析 CSV 数据
  * @param csvPath CSV 文件路径（默认为 /dataset/SuzhouGardenListFull.csv）
@@ -218,7 +252,10 @@ export async function loadGardenData(
       throw new Error(`Failed to fetch CSV: ${response.status} ${response.statusText}`);
     }
 
-    const csvText = await response.text();
+    const csvBuffer = await response.arrayBuffer();
+    const csvText = new TextDecoder().decode(csvBuffer);
+    const csvHash = await sha256Hex(csvBuffer);
+    loadedGardenSource = null;
 
     // 使用 PapaParse 解析 CSV
     return new Promise((resolve, reject) => {
@@ -230,6 +267,13 @@ export async function loadGardenData(
           try {
             // 清洗并转换数据
             const cleanedData = results.data.map(transformGardenData);
+            if (csvHash) {
+              loadedGardenSource = {
+                file: csvPath.slice(csvPath.lastIndexOf('/') + 1),
+                sha256: csvHash,
+                rows: cleanedData.length,
+              };
+            }
 
             console.log(`✅ 成功加载 ${cleanedData.length} 条园林数据`);
             resolve(cleanedData);
@@ -398,3 +442,205 @@ export async function loadDistrictData(
     throw error;
   }
 }
+
+// ==================== 图片清单加载 ====================
+
+let imageManifestPromise: Promise<ImageManifest | null> | null = null;
+
+/**
+ * 加载图片清单（只请求一次，结果在会话内复用）
+ * 清单不存在或加载失败时返回 null，调用方应退回到逐张探测图片的方式
+ * @param manifestPath 清单路径（默认为 /dataset/images/manifest.json）
+ * @returns Promise<ImageManifest | null>
+ */
+export function loadImageManifest(
+  manifestPath: string = '/dataset/images/manifest.json',
+): Promise<ImageManifest | null> {
+  if (!imageManifestPromise) {
+    imageManifestPromise = fetch(manifestPath)
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`Failed to fetch manifest: ${response.status} ${response.statusText}`);
+        }
+        return response.json() as Promise<ImageManifest>;
+      })
+      .catch((error) => {
+        console.warn('⚠️ 图片清单加载失败，将逐张探测图片:', error);
+        return null;
+      });
+  }
+  return imageManifestPromise;
+}
+
+// ==================== 预计算聚合加载 ====================
+
+let aggregatesPromise: Promise<PrecomputedAggregates | null> | null = null;
+
+/**
+ * 加载构建期预计算的全量聚合（只请求一次，结果在会话内复用）
+ * 文件不存在、加载失败或版本不符时返回 null，调用方应在前端计算聚合
+ * @param aggregatesPath 文件路径（默认为 /dataset/aggregates.json）
+ * @returns Promise<PrecomputedAggregates | null>
+ */
+export function loadAggregates(
+  aggregatesPath: string = '/dataset/aggregates.json',
+): Promise<PrecomputedAggregates | null> {
+  if (!aggregatesPromise) {
+    aggregatesPromise = fetch(aggregatesPath)
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`Failed to fetch aggregates: ${response.status} ${response.statusText}`);
+        }
+        return response.json() as Promise<PrecomputedAggregates>;
+      })
+      .then((result) => {
+        if (result.version !== AGGREGATES_VERSION) {
+          throw new Error(`Unsupported aggregates version: ${result.version}`);
+        }
+        return result;
+      })
+      .catch((error) => {
+        console.warn('⚠️ 预计算聚合加载失败，将在前端计算:', error);
+        return null;
+      });
+  }
+  return aggregatesPromise;
+}
+
+// ==================== 列式数据包加载 ====================
+
+const CODE_ARRAYS = {
+  uint8: Uint8Array,
+  uint16: Uint16Array,
+  uint32: Uint32Array,
+};
+
+/**
+ * 读取列式数据包中的各列
+ * 数值列直接作为 Float64Array 视图，文本列返回按行取值的函数（字典编码还原）
+ * 数据为小端序，与浏览器的 TypedArray 字节序一致
+ */
+function readColumns(manifest: ColumnarManifest, buffer: ArrayBuffer) {
+  const rows = manifest.rows;
+  const byName = new Map<string, ColumnarColumn>(manifest.columns.map((c) => [c.name, c]));
+
+  const getColumn = (name: keyof GardenData, type: ColumnarColumn['type']): ColumnarColumn => {
+    const column = byName.get(name);
+    if (!column || column.type !== type) {
+      throw new Error(`Columnar bundle is missing ${type} column: ${name}`);
+    }
+    return column;
+  };
+
+  return {
+    number: (name: keyof GardenData) =>
+      new Float64Array(buffer, getColumn(name, 'float64').offset, rows),
+    flag: (name: keyof GardenData) => new Uint8Array(buffer, getColumn(name, 'bool').offset, rows),
+    text: (name: keyof GardenData) => {
+      const column = getColumn(name, 'dictionary');
+      const codes = new CODE_ARRAYS[column.index || 'uint8'](buffer, column.offset, rows);
+      const dictionary = column.dictionary || [];
+      return (row: number): string => dictionary[codes[row]] ?? '';
+    },
+  };
+}
+
+/**
+ * 从列式数据包加载园林数据（由 scripts/export_columnar.py 生成，已按本文件的规则清洗）
+ * 描述不在首屏数据中，初始为空字符串，需要时用 loadGardenDescriptions 加载
+ * @param manifestPath 清单路径（默认为 /dataset/columnar/manifest.json）
+ * @returns Promise<GardenData[]>
+ */
+export async function loadGardenDataColumnar(
+  manifestPath: string = '/dataset/columnar/manifest.json',
+): Promise<GardenData[]> {
+  const manifestResponse = await fetch(manifestPath);
+  if (!manifestResponse.ok) {
+    throw new Error(
+      `Failed to fetch columnar manifest: ${manifestResponse.status} ${manifestResponse.statusText}`,
+    );
+  }
+
+  const manifest = (await manifestResponse.json()) as ColumnarManifest;
+  if (manifest.version !== COLUMNAR_VERSION) {
+    throw new Error(`Unsupported columnar version: ${manifest.version}`);
+  }
+
+  const baseUrl = manifestPath.slice(0, manifestPath.lastIndexOf('/') + 1);
+  const dataResponse = await fetch(baseUrl + manifest.data);
+  if (!dataResponse.ok) {
+    throw new Error(
+      `Failed to fetch columnar data: ${dataResponse.status} ${dataResponse.statusText}`,
+    );
+  }
+  const columns = readColumns(manifest, await dataResponse.arrayBuffer());
+
+  const publicationBatch = columns.text('publicationBatch');
+  const name = columns.text('name');
+  const district = columns.text('district');
+  const address = columns.text('address');
+  const constructionPeriod = columns.text('constructionPeriod');
+  const ownershipType = columns.text('ownershipType');
+  const managementUnit = columns.text('managementUnit');
+  const protectionStatus = columns.text('protectionStatus');
+  const openStatus = columns.text('openStatus');
+  const currentUse = columns.text('currentUse');
+  const heritageLevel = columns.text('heritageLevel');
+  const eraCategory = columns.text('eraCategory');
+  const areaRange = columns.text('areaRange');
+  const area = columns.number('area');
+  const longitude = columns.number('longitude');
+  const latitude = columns.number('latitude');
+  const isWorldHeritage = columns.flag('isWorldHeritage');
+
+  const data: GardenData[] = Array.from({ length: manifest.rows }, (_, row) => ({
+    publicationBatch: publicationBatch(row),
+    name: name(row),
+    district: district(row),
+    address: address(row),
+    constructionPeriod: constructionPeriod(row),
+    area: area[row],
+    ownershipType: ownershipType(row),
+    managementUnit: managementUnit(row),
+    protectionStatus: protectionStatus(row),
+    openStatus: openStatus(row),
+    currentUse: currentUse(row),
+    description: '',
+    longitude: longitude[row],
+    latitude: latitude[row],
+    heritageLevel: heritageLevel(row),
+    isWorldHeritage: isWorldHeritage[row] === 1,
+    eraCategory: eraCategory(row),
+    areaRange: areaRange(row),
+  }));
+
+  gardenDescriptionsPath = baseUrl + manifest.descriptions;
+  loadedGardenSource = manifest.source;
+  console.log(`✅ 成功加载 ${data.length} 条园林数据（列式数据包）`);
+  return data;
+}
+
+let gardenDescriptionsPath = '/dataset/columnar/descriptions.json';
+let gardenDescriptionsPromise: Promise<string[] | null> | null = null;
+
+/**
+ * 加载列式数据包的描述文本（按行排列，只请求一次）
+ * 加载失败时返回 null
+ * @returns Promise<string[] | null>
+ */
+export function loadGardenDescriptions(): Promise<string[] | null> {
+  if (!gardenDescriptionsPromise) {
+    gardenDescriptionsPromise = fetch(gardenDescriptionsPath)
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`Failed to fetch descriptions: ${response.status} ${response.statusText}`);
+        }
+        return response.json() as Promise<string[]>;
+      })
+      .catch((error) => {
+        console.warn('⚠️ 园林描述加载失败:', error);
+        return null;
+      });
+  }
+  return gardenDescriptionsPromise;
+}
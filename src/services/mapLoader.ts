@@ -4,6 +4,8 @@
  */
 
 import AMapLoader from '@amap/amap-jsapi-loader';
+import type { DistrictTopology, DistrictTopologyLevel } from '@/types';
+import { topologyToGeoJSON } from '@/utils/topology';
 
 // 扩展 Window 类型以包含高德地图安全配置
 declare global {
@@ -84,3 +86,31 @@ export const DEFAULT_MAP_CONFIG = {
   features: ['bg', 'road', 'building'] as const, // 显示背景、道路、建筑
   showLabel: true, // 显示文字标注
 };
+
+/**
+ * 加载区县边界
+ * 优先读取指定简化层级的共享弧段拓扑（public/dataset/topology/，由 scripts/district_topology.py 生成），
+ * 不存在或读取失败时退回到原始 GeoJSON
+ * @param level 简化层级（默认为 high，仅量化、不简化）
+ * @returns GeoJSON 数据，以及实际使用的层级（退回原始 GeoJSON 时为 null）
+ */
+export async function loadDistrictGeoJSON(
+  level: DistrictTopologyLevel = 'high',
+): Promise<{ geojson: any; level: DistrictTopologyLevel | null }> {
+  try {
+    const response = await fetch(`/dataset/topology/suzhou_districts.${level}.json`);
+    if (!response.ok) {
+      throw new Error(`Failed to load district topology: ${response.status}`);
+    }
+    const topology = (await response.json()) as DistrictTopology;
+    return { geojson: topologyToGeoJSON(topology), level };
+  } catch (error) {
+    console.warn(`⚠️ 区县边界拓扑（${level}）加载失败，改为读取原始 GeoJSON:`, error);
+  }
+
+  const response = await fetch('/dataset/suzhou_districts.json');
+  if (!response.ok) {
+    throw new Error(`Failed to load district data: ${response.status}`);
+  }
+  return { geojson: await response.json(), level: null };
+}
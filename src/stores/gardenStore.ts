@@ -3,7 +3,7 @@
  */
 
 import { defineStore } from 'pinia';
-import { computed, ref } from 'vue';
+import { computed, ref, shallowRef } from 'vue';
 import type {
   GardenData,
   Filters,
@@ -13,8 +13,21 @@ import type {
   Statistics,
   DistrictData,
   DistrictStatistics,
+  PrecomputedAggregates,
 } from '@/types';
-import { loadGardenData, loadDistrictData } from '@/services/dataLoader';
+import {
+  loadGardenData,
+  loadGardenDataColumnar,
+  loadGardenDescriptions,
+  loadDistrictData,
+  loadAggregates,
+  getLoadedGardenSource,
+} from '@/services/dataLoader';
+import {
+  OVERVIEW_AGGREGATES,
+  type OverviewAggregateKey,
+  type OverviewAggregates,
+} from '@/utils/chartDataProcessor';
 
 export const useGardenStore = defineStore('garden', () => {
   // ==================== 状态 ====================
@@ -25,6 +38,12 @@ export const useGardenStore = defineStore('garden', () => {
   // 行政区划数据
   const districtData = ref<DistrictData[]>([]);
 
+  // 构建期预计算的全量聚合（不存在时为 null）
+  const aggregates = shallowRef<PrecomputedAggregates | null>(null);
+
+  // 园林描述是否尚未加载（列式数据包不含描述，选中园林时再加载）
+  let descriptionsPending = false;
+
   // 加载状态
   const isLoading = ref(false);
   const loadError = ref<string | null>(null);
@@ -204,13 +223,24 @@ export const useGardenStore = defineStore('garden', () => {
 
     try {
       // 并行加载园林数据和区划数据
-      const [gardenDataResult, districtDataResult] = await Promise.all([
-        loadGardenData(),
+      // 优先使用列式数据包，不存在或读取失败时解析 CSV
+      let columnar = true;
+      const gardenDataPromise = loadGardenDataColumnar().catch((error) => {
+        console.warn('⚠️ 列式数据包加载失败，改为解析 CSV:', error);
+        columnar = false;
+        return loadGardenData();
+      });
+
+      const [gardenDataResult, districtDataResult, aggregatesResult] = await Promise.all([
+        gardenDataPromise,
         loadDistrictData(),
+        loadAggregates(),
       ]);
 
       rawData.value = gardenDataResult;
       districtData.value = districtDataResult;
+      aggregates.value = aggregatesResult;
+      descriptionsPending = columnar;
 
       console.log(`✅ Store: 加载了 ${gardenDataResult.length} 条园林数据`);
       console.log(`✅ Store: 加载了 ${districtDataResult.length} 条行政区划数据`);
@@ -254,11 +284,28 @@ export const useGardenStore = defineStore('garden', () => {
     filters.value = {};
   }
 
+  /**
+   * 补全园林描述（数据来自列式数据包时按需加载一次）
+   */
+  async function ensureDescriptions() {
+    if (!descriptionsPending) return;
+    descriptionsPending = false;
+
+    const descriptions = await loadGardenDescriptions();
+    if (!descriptions) return;
+    rawData.value.forEach((item, index) => {
+      item.description = descriptions[index] || '';
+    });
+  }
+
   /**
    * 选中园林
    */
   function selectGarden(garden: GardenData | undefined) {
     selection.value.selectedGarden = garden;
+    if (garden) {
+      ensureDescriptions();
+    }
     // 选中园林时，清除区县选中状态
     if (garden) {
       selection.value.selectedDistrict = undefined;
@@ -290,6 +337,27 @@ export const useGardenStore = defineStore('garden', () => {
     return filteredData.value.filter((item) => item.district === district);
   }
 
+  /**
+   * 获取概览图表的聚合数据
+   * 没有筛选条件且预计算结果与已加载数据对应（源 CSV 哈希与行数一致）时直接返回预计算结果，
+   * 否则基于筛选后的数据计算
+   */
+  function getAggregate<K extends OverviewAggregateKey>(key: K): OverviewAggregates[K] {
+    const data = filteredData.value;
+    const precomputed = aggregates.value;
+    const loadedSource = getLoadedGardenSource();
+    if (
+      precomputed &&
+      data === rawData.value &&
+      loadedSource !== null &&
+      precomputed.source.sha256 === loadedSource.sha256 &&
+      precomputed.source.rows === data.length
+    ) {
+      return precomputed.aggregates[key];
+    }
+    return OVERVIEW_AGGREGATES[key](data) as OverviewAggregates[K];
+  }
+
   /**
    * 按名称搜索园林
    */
@@ -305,6 +373,7 @@ export const useGardenStore = defineStore('garden', () => {
     // 状态
     rawData,
     districtData,
+    aggregates,
     isLoading,
     loadError,
     viewMode,
@@ -321,6 +390,7 @@ export const useGardenStore = defineStore('garden', () => {
 
     // 方法
     loadData,
+    ensureDescriptions,
     setViewMode,
     setOverviewNarrative,
     updateFilters,
@@ -329,6 +399,7 @@ export const useGardenStore = defineStore('garden', () => {
     selectDistrict,
     clearSelection,
     getGardensByDistrict,
+    getAggregate,
     searchGardenByName,
   };
 });
@@ -2,6 +2,8 @@
  * 苏州园林数据可视化项目 - TypeScript 类型定义
  */
 
+import type { OverviewAggregates } from '@/utils/chartDataProcessor';
+
 // ==================== 基础数据类型 ====================
 
 /**
@@ -229,3 +231,114 @@ export interface DistrictStatistics extends DistrictData {
   gardenDensity: number; // 园林密度（个/平方公里）
   openGardenPerCapita: number; // 人均开放园林数（个/万人）
 }
+
+// ==================== 图片清单 ====================
+
+/**
+ * 单张园林图片（对应 images/manifest.json 中的条目）
+ */
+export interface GardenImageEntry {
+  file: string; // 文件名，如 01.jpg
+  width: number; // 宽度（像素）
+  height: number; // 高度（像素）
+  bytes: number; // 文件大小（字节）
+  hash: string; // 内容哈希
+  derivatives: number[]; // 已生成的缩略图宽度（同时有 JPG 与 WebP 版本）
+  optimized?: number; // 压缩优化时使用的 SSIM 阈值（未优化时不存在）
+}
+
+/**
+ * 图片清单（由 scripts/normalize_images.py 生成）
+ */
+export interface ImageManifest {
+  version: number;
+  generated_at: string;
+  gardens: Record<
+    string,
+    {
+      signature: string | null;
+      derivative_widths: number[] | null;
+      images: GardenImageEntry[];
+    }
+  >;
+}
+
+// ==================== 预计算聚合 ====================
+
+/**
+ * 预计算的全量聚合（由 scripts/build_aggregates.py 生成 aggregates.json）
+ */
+export interface PrecomputedAggregates {
+  version: number;
+  generated_at: string;
+  source: DatasetSource;
+  aggregates: OverviewAggregates;
+}
+
+/**
+ * 构建期产物对应的源数据
+ */
+export interface DatasetSource {
+  file: string; // 源 CSV 文件名
+  sha256: string; // 源 CSV 内容哈希
+  rows: number; // 园林数量
+}
+
+// ==================== 列式数据包 ====================
+
+/**
+ * 列式数据包中的一列（数据位于 gardens.bin 的 [offset, offset + byteLength)）
+ */
+export interface ColumnarColumn {
+  name: keyof GardenData; // 对应的 GardenData 字段
+  type: 'float64' | 'bool' | 'dictionary';
+  offset: number; // 字节偏移（8 字节对齐）
+  byteLength: number; // 字节数
+  index?: 'uint8' | 'uint16' | 'uint32'; // 字典编码的整数类型
+  dictionary?: string[]; // 字典（编码 -> 文本）
+}
+
+/**
+ * 列式数据包清单（由 scripts/export_columnar.py 生成）
+ */
+export interface ColumnarManifest {
+  version: number;
+  generated_at: string;
+  source: DatasetSource;
+  rows: number;
+  endianness: 'little';
+  data: string; // 二进制数据文件名
+  descriptions: string; // 描述文本文件名（按需加载）
+  columns: ColumnarColumn[];
+}
+
+// ==================== 区县边界拓扑 ====================
+
+/**
+ * 区县边界的简化层级（对应 public/dataset/topology/ 下的文件）
+ */
+export type DistrictTopologyLevel = 'low' | 'medium' | 'high';
+
+/**
+ * 共享弧段拓扑（TopoJSON，由 scripts/district_topology.py 生成）
+ * arcs 为差分编码的量化坐标；几何体以弧段编号引用，~i 表示反向使用第 i 段
+ */
+export interface DistrictTopology {
+  type: 'Topology';
+  transform: {
+    scale: [number, number];
+    translate: [number, number];
+  };
+  objects: Record<
+    string,
+    {
+      type: 'GeometryCollection';
+      geometries: Array<{
+        type: 'MultiPolygon';
+        arcs: number[][][]; // 多边形 -> 环 -> 弧段编号
+        properties: Record<string, any>;
+      }>;
+    }
+  >;
+  arcs: number[][][];
+}
@@ -993,3 +993,73 @@ export function groupByDistrictAndProtectionStatus(data: GardenData[]): {
     series,
   };
 }
+
+/**
+ * 计算箱线图统计值（与 BoxPlotChart 的计算规则一致）
+ * @param values 数值数组（无需预先排序）
+ * @returns box 为 [最小值, 下四分位, 中位数, 上四分位, 最大值]，outliers 为超出 1.5 倍四分位距的值
+ */
+export function calculateBoxPlotStats(values: number[]): { box: number[]; outliers: number[] } {
+  const sorted = values
+    .filter((v) => !isNaN(v) && v !== null && v !== undefined)
+    .sort((a, b) => a - b);
+
+  if (sorted.length === 0) {
+    return { box: [0, 0, 0, 0, 0], outliers: [] };
+  }
+
+  const min = sorted[0];
+  const max = sorted[sorted.length - 1];
+  const q1Index = Math.floor(sorted.length * 0.25);
+  const q2Index = Math.floor(sorted.length * 0.5);
+  const q3Index = Math.floor(sorted.length * 0.75);
+
+  const q1 = sorted[q1Index] || min;
+  const median = sorted[q2Index] || min;
+  const q3 = sorted[q3Index] || max;
+
+  // 离群点的四分位距使用原始分位值（不以最值替代 0）
+  const iqr = sorted[q3Index] - sorted[q1Index];
+  const lowerBound = sorted[q1Index] - 1.5 * iqr;
+  const upperBound = sorted[q3Index] + 1.5 * iqr;
+
+  return {
+    box: [min, q1, median, q3, max],
+    outliers: sorted.filter((v) => v < lowerBound || v > upperBound),
+  };
+}
+
+/**
+ * ============================================
+ * 构建期预计算的全量聚合
+ * ============================================
+ */
+
+/**
+ * 概览页使用的聚合函数（只登记叙事场景实际读取的聚合）
+ * 键名与 public/dataset/aggregates.json（由 scripts/build_aggregates.py 生成）一致：
+ * 未筛选时直接读取预计算结果，有筛选条件时在前端用同一函数重新计算
+ */
+export const OVERVIEW_AGGREGATES = {
+  groupAreaByDistrict,
+  groupByEraCategory,
+  groupByEraCategoryAndHeritageLevel,
+  groupByBatchAndEraCategory,
+  groupByOwnershipAndOpenStatus,
+  groupByCurrentUseAndOpenStatus,
+  groupByDistrictAndOpenStatus,
+  groupByAreaRangeAndOwnership,
+  groupAverageAreaByDistrict,
+  groupByDistrictAndProtectionStatus,
+  generateDistrictHeritageLevelMatrix,
+  generateProtectionOpenStatusMatrix,
+  calculateCumulativeAreaByOpenStatus,
+  calculateHighLevelHeritageRatio,
+  buildEraAreaTreemap: (data: GardenData[]) => buildEraAreaTreemap(data, 6),
+};
+
+export type OverviewAggregateKey = keyof typeof OVERVIEW_AGGREGATES;
+
+export type OverviewAggregates = {
+  [K in OverviewAggregateKey]: ReturnType<(typeof OVERVIEW_AGGREGATES)[K]>;
+};
@@ -0,0 +1,65 @@
+/**
+ * 共享弧段拓扑（TopoJSON）解码工具
+ * 将 scripts/district_topology.py 生成的拓扑还原为 GeoJSON FeatureCollection
+ */
+
+import type { DistrictTopology } from '@/types';
+
+type Position = [number, number];
+
+/**
+ * 解码全部弧段：累加差分坐标并按 transform 还原为经纬度
+ */
+function decodeArcs(topology: DistrictTopology): Position[][] {
+  const [scaleX, scaleY] = topology.transform.scale;
+  const [translateX, translateY] = topology.transform.translate;
+
+  return topology.arcs.map((arc) => {
+    let x = 0;
+    let y = 0;
+    return arc.map(([dx, dy]) => {
+      x += dx;
+      y += dy;
+      return [x * scaleX + translateX, y * scaleY + translateY] as Position;
+    });
+  });
+}
+
+/**
+ * 按弧段编号拼接闭合环（~i 表示反向使用第 i 段，相邻弧段的公共端点只保留一次）
+ */
+function stitchRing(arcIndexes: number[], arcs: Position[][]): Position[] {
+  const ring: Position[] = [];
+  arcIndexes.forEach((index, k) => {
+    const arc = index >= 0 ? arcs[index] : [...arcs[~index]].reverse();
+    ring.push(...(k === 0 ? arc : arc.slice(1)));
+  });
+  return ring;
+}
+
+/**
+ * 将拓扑中的对象转换为 GeoJSON FeatureCollection（几何体均为 MultiPolygon）
+ * @param topology 拓扑数据
+ * @param objectName 对象名称（默认为 districts）
+ */
+export function topologyToGeoJSON(topology: DistrictTopology, objectName: string = 'districts') {
+  const object = topology.objects[objectName];
+  if (!object) {
+    throw new Error(`Topology object not found: ${objectName}`);
+  }
+
+  const arcs = decodeArcs(topology);
+  return {
+    type: 'FeatureCollection' as const,
+    features: object.geometries.map((geometry) => ({
+      type: 'Feature' as const,
+      properties: geometry.properties,
+      geometry: {
+        type: 'MultiPolygon' as const,
+        coordinates: geometry.arcs.map((polygon) =>
+          polygon.map((ring) => stitchRing(ring, arcs)),
+        ),
+      },
+    })),
+  };
+}